@@ -1,10 +1,8 @@
 import streamlit as st
 from collections import OrderedDict
-from utils.data_processing import parse_matches
 from utils.api_handler import ALL_TOURNAMENTS, load_tournament_data
-from utils.model_training import train_and_save_prediction_model
-from utils.data_processing import HERO_PROFILES, HERO_DAMAGE_TYPE
-from collections import OrderedDict
+from utils.dataset_registry import acquire_dataset, resident_datasets, process_memory_mb
+from utils.tracing import performance_panel
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -13,6 +11,7 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+perf = performance_panel("Home")
 
 # --- Title and Introduction ---
 st.title("MLBB Pro-Scene Analytics Dashboard")
@@ -46,21 +45,46 @@ with st.sidebar:
             if not selected_tournaments:
                 st.warning("Please select at least one tournament.")
             else:
-                # This logic remains the same
-                st.cache_data.clear()
+                # No global cache clear: page caches are keyed by the dataset fingerprint, so other sessions keep
+                # theirs, and the live loaders refresh on their own TTL
                 st.session_state['sim_results'] = None
+                st.session_state['dataset'] = None
                 st.session_state['pooled_matches'] = None
                 st.session_state['parsed_matches'] = None
                 st.session_state['selected_tournaments'] = selected_tournaments
-                all_matches_raw = []
+                # The session keeps a handle to the process-wide copy; other sessions with the same selection share it
                 with st.spinner("Loading tournament data..."):
-                    for name in selected_tournaments:
-                        matches = load_tournament_data(name)
-                        if matches: all_matches_raw.extend(matches)
-                if all_matches_raw:
-                    st.session_state['pooled_matches'] = all_matches_raw
-                    st.session_state['parsed_matches'] = parse_matches(all_matches_raw)
+                    dataset = acquire_dataset(selected_tournaments, load_tournament_data)
+                if dataset is not None:
+                    st.session_state['dataset'] = dataset
+                    st.session_state['pooled_matches'] = dataset.pooled_matches
+                    st.session_state['parsed_matches'] = dataset.parsed_matches
                     st.success(f"Loaded data for {len(selected_tournaments)} tournament(s).")
                 else:
                     st.error("Could not load any match data.")
-                st.success(f"Cleared cache for {cleared_count} live tournament(s). Click 'Load Data' to refresh.")
+
+    # --- Model Retraining ---
+    if st.session_state['pooled_matches']:
+        with st.expander("Prediction Models"):
+            st.caption("Retrain the draft and series predictors on the loaded matches. Only games not seen before are re-encoded.")
+            if st.button("Retrain Models", use_container_width=True):
+                # Training pulls in xgboost, scikit-learn and scipy; import them only when asked to
+                from utils.model_training import train_and_save_prediction_model
+                with st.spinner("Training models..."):
+                    summary = train_and_save_prediction_model(st.session_state['pooled_matches'])
+                trained = [f"{name} ({summary[name]['games']} games)" for name in ("draft", "series") if name in summary]
+                if trained:
+                    st.success(f"Saved version {summary['version']}: {', '.join(trained)}.")
+                else:
+                    st.warning("Not enough finished games with known sides to train on.")
+
+    # --- Memory Accounting ---
+    with st.expander("Memory"):
+        datasets = resident_datasets()
+        rss = process_memory_mb()
+        st.caption(f"{len(datasets)} dataset(s) shared by all sessions, {sum(d['Size (MB)'] for d in datasets):.1f} MB"
+                   + (f"; process resident size {rss:.0f} MB." if rss is not None else "."))
+        if datasets:
+            st.dataframe(datasets, use_container_width=True, hide_index=True)
+
+perf.finish()
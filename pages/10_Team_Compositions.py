@@ -0,0 +1,55 @@
+import streamlit as st
+import pandas as pd
+from utils.archetypes import ARCHETYPES, side_compositions, filter_sides, composition_win_rates, archetype_matchups, team_archetype_profile
+from utils.tracing import performance_panel
+
+st.set_page_config(layout="wide", page_title="Team Compositions")
+perf = performance_panel("Team Compositions")
+
+st.title("🧩 Team Compositions")
+st.write("Every drafted side is classified by its heroes' roles, tags and damage types. "
+         "Heroes with several builds count each build equally.")
+
+# --- Check for loaded data ---
+if 'pooled_matches' not in st.session_state or not st.session_state['pooled_matches']:
+    st.warning("Please select and load tournament data on the 'app.py' homepage first.")
+    st.stop()
+
+with st.spinner("Classifying drafts..."):
+    all_sides = side_compositions(st.session_state['pooled_matches'])
+
+if all_sides.empty:
+    st.warning("No games with hero picks in the loaded data.")
+    st.stop()
+
+# --- UI Controls ---
+st.sidebar.header("Composition Filters")
+team = st.sidebar.selectbox("Team:", ["All Teams"] + sorted(all_sides["Team"].unique()))
+tournaments = st.sidebar.multiselect("Tournaments:", sorted(all_sides["Tournament"].unique()))
+min_games = st.sidebar.slider("Minimum games:", 1, 30, 3)
+
+sides = filter_sides(all_sides, None if team == "All Teams" else team, tournaments)
+st.caption(f"{len(sides):,} drafted sides.")
+
+tab_arch, tab_matchups, tab_damage, tab_roles, tab_teams = st.tabs(["Archetypes", "Matchups", "Damage Mix", "Role Coverage", "Teams"])
+with tab_arch:
+    st.dataframe(composition_win_rates(sides, "Archetype", min_games), use_container_width=True, hide_index=True)
+    with st.expander("Archetype definitions"):
+        st.dataframe(pd.DataFrame([{"Archetype": a, "Tag Weights": ", ".join(f"{t} ×{w:g}" for t, w in tags.items())} for a, tags in ARCHETYPES.items()]),
+                     use_container_width=True, hide_index=True)
+with tab_matchups:
+    st.write("Win rate (%) of the row archetype against the column archetype.")
+    matchups = archetype_matchups(sides, min_games)
+    if matchups.empty:
+        st.info("Not enough games for any archetype matchup.")
+    else:
+        st.dataframe(matchups.style.format("{:.1f}", na_rep="").background_gradient(cmap="RdYlGn", vmin=30, vmax=70), use_container_width=True)
+with tab_damage:
+    st.dataframe(composition_win_rates(sides, "Damage Mix", min_games), use_container_width=True, hide_index=True)
+with tab_roles:
+    st.dataframe(composition_win_rates(sides, "Roles Covered", min_games), use_container_width=True, hide_index=True)
+    st.dataframe(composition_win_rates(sides, "Missing Roles", min_games), use_container_width=True, hide_index=True)
+with tab_teams:
+    st.dataframe(team_archetype_profile(sides), use_container_width=True, hide_index=True)
+
+perf.finish()
@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
-from utils.analysis_functions import calculate_hero_stats_for_team
+from utils.batch_reports import hero_stats_report
+from utils.dataset_registry import session_fingerprint
+from utils.tracing import performance_panel
 
 st.set_page_config(layout="wide", page_title="Statistics Breakdown")
+perf = performance_panel("Statistics Breakdown")
 
 st.title("📊 Statistics Breakdown")
 
@@ -13,9 +16,10 @@ if 'pooled_matches' not in st.session_state or not st.session_state['pooled_matc
 
 # --- Cache the calculation ---
 # This prevents re-calculating the entire dataframe every time a widget is changed.
+# Results also live in the result store, where nightly batch runs (utils/batch_reports.py) precompute them.
 @st.cache_data
-def get_stats_df(pooled_matches, team_filter):
-    return calculate_hero_stats_for_team(pooled_matches, team_filter)
+def get_stats_df(_pooled_matches, fingerprint, team_filter):
+    return hero_stats_report(_pooled_matches, team_filter, fingerprint)
 
 # --- UI Controls ---
 pooled_matches = st.session_state['pooled_matches']
@@ -41,7 +45,7 @@ st.info(f"Displaying hero statistics for **{selected_team}** in the selected tou
 
 # Calculate or retrieve cached stats
 with st.spinner(f"Calculating stats for {selected_team}..."):
-    df_stats = get_stats_df(pooled_matches, selected_team)
+    df_stats = get_stats_df(pooled_matches, session_fingerprint(), selected_team)
 
 if df_stats.empty:
     st.warning(f"No match data found for '{selected_team}' in the selected tournaments.")
@@ -81,3 +85,5 @@ else:
            file_name=f'hero_stats_{selected_team}.csv',
            mime='text/csv',
         )
+
+perf.finish()
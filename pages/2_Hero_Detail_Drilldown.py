@@ -1,8 +1,12 @@
 import streamlit as st
 import pandas as pd
-from utils.analysis_functions import process_hero_drilldown_data
+from utils.batch_reports import hero_drilldown_report
+from utils.dataset_registry import session_fingerprint
+from utils.job_runner import run_in_background, show_job, job_status
+from utils.tracing import performance_panel
 
 st.set_page_config(layout="wide", page_title="Hero Detail Drilldown")
+perf = performance_panel("Hero Detail Drilldown")
 
 st.title("🔎 Hero Detail Drilldown")
 
@@ -11,22 +15,21 @@ if 'pooled_matches' not in st.session_state or not st.session_state['pooled_matc
     st.warning("Please select and load tournament data on the homepage first.")
     st.stop()
 
-# --- Cache the heavy processing ---
-# We now pass the list of tournament names as a "key" to invalidate the cache.
-@st.cache_data
-def get_hero_drilldown_data(_pooled_matches, _tournament_names):
-    # The _tournament_names argument is only used to trigger the cache.
-    # The function itself still processes the full _pooled_matches data.
-    return process_hero_drilldown_data(_pooled_matches)
-
-# --- UI Controls and Display ---
+# --- Background processing ---
+# The content fingerprint of the loaded matches is the job key, so sessions with the same data share one run;
+# the result store behind hero_drilldown_report keeps the result across restarts and is filled ahead of time
+# by batch runs (utils/batch_reports.py).
 pooled_matches = st.session_state['pooled_matches']
-# Get the list of names to use as our cache key
-selected_tournament_names = st.session_state['selected_tournaments']
+fingerprint = session_fingerprint()
+drilldown_job = run_in_background("hero_drilldown", (fingerprint,), hero_drilldown_report, pooled_matches, fingerprint,
+                                  label="Processing all matches for hero details")
+if drilldown_job.state != "done":
+    show_job(drilldown_job, job_status)
+    perf.finish()
+    st.stop()
 
-with st.spinner("Processing all matches for hero details..."):
-    # Call the function with both arguments
-    all_heroes, hero_stats_map = get_hero_drilldown_data(pooled_matches, selected_tournament_names)
+# --- UI Controls and Display ---
+all_heroes, hero_stats_map = drilldown_job.result
 
 st.sidebar.header("Hero Filters")
 selected_hero = st.sidebar.selectbox(
@@ -52,3 +55,5 @@ if selected_hero and selected_hero in hero_stats_map:
     st.dataframe(df_matchups, use_container_width=True)
 else:
     st.warning("No data available for the selected hero.")
+
+perf.finish()
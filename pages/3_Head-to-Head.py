@@ -1,10 +1,13 @@
 # beruangbatubata/mlbb-new/MLBB-new-44d3b1513eb1b302f1f96286fcccc3d4374561ec/pages/3_Head-to-Head.py
 import streamlit as st
-from utils import data_processing, analysis_functions
+from utils.batch_reports import team_h2h_report, counter_report, FULL_POOL_TOP_N
+from utils.dataset_registry import session_fingerprint
 import pandas as pd
 from collections import Counter
+from utils.tracing import performance_panel
 
 st.set_page_config(layout="wide", page_title="Head-to-Head")
+perf = performance_panel("Head-to-Head")
 
 if 'pooled_matches' not in st.session_state or not st.session_state['pooled_matches']:
     st.info("Please select and load tournament data from the '🏠 Home' page first.")
@@ -17,9 +20,8 @@ st.title("⚔️ Head-to-Head Comparison")
 st.info(f"**Tournaments loaded:** {', '.join(tournaments_shown)}")
 
 # --- Data Preparation ---
-team_norm2disp, all_teams_norm = data_processing.get_all_teams_from_matches(pooled_matches)
-all_heroes = data_processing.get_all_heroes_from_matches(pooled_matches)
-team_options = [team_norm2disp.get(n, n) for n in sorted(all_teams_norm)]
+# Team names as they appear in the match data, which is what the head-to-head report matches on
+team_options = sorted({opp.get('name', '').strip() for m in pooled_matches for opp in m.get("match2opponents", []) if opp.get('name', '').strip()})
 
 # --- UI Controls ---
 mode = st.radio("Select Comparison Mode:", ['Team vs. Team', 'Hero vs. Hero'], horizontal=True)
@@ -35,37 +37,35 @@ if mode == 'Team vs. Team':
         if team1_disp == team2_disp:
             st.error("Please select two different teams.")
         else:
-            # Find normalized names
-            team1_norm = next((norm for norm, disp in team_norm2disp.items() if disp == team1_disp), None)
-            team2_norm = next((norm for norm, disp in team_norm2disp.items() if disp == team2_disp), None)
+            results = team_h2h_report(pooled_matches, team1_disp, team2_disp, fingerprint=session_fingerprint())
 
-            if team1_norm and team2_norm:
-                results = analysis_functions.do_team_h2h(pooled_matches, team1_norm, team2_norm, team_norm2disp)
-                
-                if not results['h2h_matches']:
-                    st.warning(f"No direct matches found between {team1_disp} and {team2_disp}.")
-                else:
-                    st.subheader(f"{team1_disp} vs {team2_disp} Head-to-Head")
-                    st.markdown(f"**Total Games:** {results['total_games']}")
-                    st.markdown(f"**{team1_disp} Wins:** **<span style='color:green;'>{results['win_counts'][team1_norm']}</span>**", unsafe_allow_html=True)
-                    st.markdown(f"**{team2_disp} Wins:** **<span style='color:green;'>{results['win_counts'][team2_norm']}</span>**", unsafe_allow_html=True)
-                    st.markdown("---")
+            if not results['total_games']:
+                st.warning(f"No direct matches found between {team1_disp} and {team2_disp}.")
+            else:
+                st.subheader(f"{team1_disp} vs {team2_disp} Head-to-Head")
+                st.markdown(f"**Total Games:** {results['total_games']}")
+                st.markdown(f"**{team1_disp} Wins:** **<span style='color:green;'>{results['win_counts'][team1_disp]}</span>**", unsafe_allow_html=True)
+                st.markdown(f"**{team2_disp} Wins:** **<span style='color:green;'>{results['win_counts'][team2_disp]}</span>**", unsafe_allow_html=True)
+                st.markdown("---")
 
-                    # Display paired tables using columns
-                    st.subheader("Head-to-Head Statistics")
-                    col_a, col_b = st.columns(2)
-                    with col_a:
-                        st.write(f"**Top picks by {team1_disp} (vs {team2_disp})**")
-                        st.dataframe(results['t1_heroes'], use_container_width=True)
-                        st.write(f"**Target bans by {team1_disp} (vs {team2_disp})**")
-                        st.dataframe(results['t1_bans'], use_container_width=True)
-                    with col_b:
-                        st.write(f"**Top picks by {team2_disp} (vs {team1_disp})**")
-                        st.dataframe(results['t2_heroes'], use_container_width=True)
-                        st.write(f"**Target bans by {team2_disp} (vs {team1_disp})**")
-                        st.dataframe(results['t2_bans'], use_container_width=True)
+                # Display paired tables using columns
+                st.subheader("Head-to-Head Statistics")
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    st.write(f"**Top picks by {team1_disp} (vs {team2_disp})**")
+                    st.dataframe(results['t1_picks_df'], use_container_width=True)
+                    st.write(f"**Target bans by {team1_disp} (vs {team2_disp})**")
+                    st.dataframe(results['t1_bans_df'], use_container_width=True)
+                with col_b:
+                    st.write(f"**Top picks by {team2_disp} (vs {team1_disp})**")
+                    st.dataframe(results['t2_picks_df'], use_container_width=True)
+                    st.write(f"**Target bans by {team2_disp} (vs {team1_disp})**")
+                    st.dataframe(results['t2_bans_df'], use_container_width=True)
 
 else: # Hero vs. Hero
+    # Every ally-vs-enemy pairing that was played at least once; the same table feeds the full-pool counter heatmap
+    matchups = counter_report(pooled_matches, 1, FULL_POOL_TOP_N, fingerprint=session_fingerprint())
+    all_heroes = sorted(set(matchups["Ally Hero"]) | set(matchups["Enemy Hero"])) if not matchups.empty else []
     col1, col2 = st.columns(2)
     with col1:
         hero1 = st.selectbox("Select Hero 1:", all_heroes, index=0)
@@ -76,7 +76,10 @@ else: # Hero vs. Hero
         if hero1 == hero2:
             st.error("Please select two different heroes.")
         else:
-            results = analysis_functions.do_hero_h2h(pooled_matches, hero1, hero2)
+            pairing = lambda ally, enemy: matchups[(matchups["Ally Hero"] == ally) & (matchups["Enemy Hero"] == enemy)]
+            h1_row, h2_row = pairing(hero1, hero2), pairing(hero2, hero1)
+            results = {"games_with_both": int(h1_row["Games Against"].sum()),
+                       "win_h1": int(h1_row["Wins"].sum()), "win_h2": int(h2_row["Wins"].sum())}
 
             if results['games_with_both'] == 0:
                 st.warning(f"No games found where {hero1} and {hero2} were on opposing teams.")
@@ -87,3 +90,5 @@ else: # Hero vs. Hero
                 win_rate_h2 = (results['win_h2'] / results['games_with_both'] * 100)
                 st.markdown(f"**{hero1} Wins:** **<span style='color:green;'>{results['win_h1']} ({win_rate_h1:.2f}%)</span>**", unsafe_allow_html=True)
                 st.markdown(f"**{hero2} Wins:** **<span style='color:green;'>{results['win_h2']} ({win_rate_h2:.2f}%)</span>**", unsafe_allow_html=True)
+
+perf.finish()
@@ -1,9 +1,13 @@
 # beruangbatubata/mlbb-new/MLBB-new-44d3b1513eb1b302f1f96286fcccc3d4374561ec/pages/4_Synergy_Counter_Analysis.py
 import streamlit as st
-from utils import data_processing, analysis_functions, plotting
+from utils import plotting
+from utils.batch_reports import synergy_report, counter_report, FULL_POOL_TOP_N
+from utils.dataset_registry import session_fingerprint
 import pandas as pd
+from utils.tracing import performance_panel
 
 st.set_page_config(layout="wide", page_title="Synergy & Counter Analysis")
+perf = performance_panel("Synergy & Counter Analysis")
 
 if 'pooled_matches' not in st.session_state or not st.session_state['pooled_matches']:
     st.info("Please select and load tournament data from the '🏠 Home' page first.")
@@ -16,9 +20,8 @@ st.title("🤝 Synergy & Counter Analysis")
 st.info(f"**Tournaments loaded:** {', '.join(tournaments_shown)}")
 
 # --- Data Preparation ---
-team_norm2disp, all_teams_norm = data_processing.get_all_teams_from_matches(pooled_matches)
-all_heroes = data_processing.get_all_heroes_from_matches(pooled_matches)
-team_options = [("All Teams", "all")] + [(team_norm2disp.get(n, n), n) for n in sorted(all_teams_norm)]
+# The analysis functions filter on the team names exactly as they appear in the match data
+all_teams = sorted({opp.get('name', '').strip() for m in pooled_matches for opp in m.get("match2opponents", []) if opp.get('name', '').strip()})
 
 # --- UI Controls ---
 mode = st.selectbox("Select Analysis Mode:", ["Synergy Combos", "Anti-Synergy Combos", "Counter Combos"])
@@ -29,29 +32,30 @@ with cols[0]:
 with cols[1]:
     top_n = st.slider("Top N Results:", 3, 30, 10)
 with cols[2]:
-    selected_team_norm = st.selectbox(
-        "Filter by Team:", 
-        options=team_options, 
-        format_func=lambda x: x[0]
-    )[1]
+    selected_team = st.selectbox("Filter by Team:", options=["All Teams"] + all_teams)
 
 # --- Analysis Logic ---
 df = pd.DataFrame()
 
 if mode == "Synergy Combos":
     st.subheader("Best Performing Hero Duos (Highest Win Rate)")
-    df = analysis_functions.analyze_synergy(pooled_matches, selected_team_norm, min_games, top_n, anti=False, team_norm_to_display_map=team_norm2disp)
-    fig = plotting.plot_synergy_bar(df, "Win Rate of Top Hero Duos")
+    df = synergy_report(pooled_matches, selected_team, min_games, top_n, anti=False, fingerprint=session_fingerprint())
+    image = plotting.cached_plot(plotting.plot_synergy_bar, df, "Win Rate of Top Hero Duos")
 
 elif mode == "Anti-Synergy Combos":
     st.subheader("Worst Performing Hero Duos (Lowest Win Rate)")
-    df = analysis_functions.analyze_synergy(pooled_matches, selected_team_norm, min_games, top_n, anti=True, team_norm_to_display_map=team_norm2disp)
-    fig = plotting.plot_synergy_bar(df, "Win Rate of Bottom Hero Duos")
+    df = synergy_report(pooled_matches, selected_team, min_games, top_n, anti=True, fingerprint=session_fingerprint())
+    image = plotting.cached_plot(plotting.plot_synergy_bar, df, "Win Rate of Bottom Hero Duos")
 
 elif mode == "Counter Combos":
     st.subheader("Hero vs. Hero Matchups (Ally vs. Enemy)")
-    df = analysis_functions.analyze_counter(pooled_matches, min_games, top_n)
-    fig = plotting.plot_counter_heatmap(df, "Win Rate: Ally Hero vs Enemy Hero")
+    full_pool = st.checkbox("Heatmap of the whole hero pool", value=False)
+    df = counter_report(pooled_matches, min_games, top_n, fingerprint=session_fingerprint())
+    if full_pool:
+        heatmap_df = counter_report(pooled_matches, min_games, FULL_POOL_TOP_N, fingerprint=session_fingerprint())
+        image = plotting.cached_plot(plotting.plot_counter_heatmap, heatmap_df, "Win Rate: Ally Hero vs Enemy Hero", max_heroes=None)
+    else:
+        image = plotting.cached_plot(plotting.plot_counter_heatmap, df, "Win Rate: Ally Hero vs Enemy Hero")
 
 # --- Display Results ---
 if df.empty:
@@ -60,5 +64,7 @@ else:
     st.dataframe(df, use_container_width=True)
     plotting.offer_csv_download(df, f"{mode.replace(' ', '_').lower()}.csv")
     
-    if fig:
-        st.pyplot(fig)
+    if image:
+        plotting.show_figure(image)
+
+perf.finish()
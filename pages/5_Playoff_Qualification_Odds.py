@@ -1,15 +1,24 @@
 import streamlit as st
 import pandas as pd
 from collections import defaultdict
-import random
 from utils.simulation import (
-    get_series_outcome_options, build_standings_table, run_monte_carlo_simulation,
+    get_series_outcome_options, build_standings_table, simulate_season_batch,
+    summarize_bracket_odds, build_leverage_report, TIEBREAK_RULES, simulate_playoffs,
+    build_clinch_table,
     load_bracket_config, save_bracket_config, build_week_blocks,
-    load_group_config, save_group_config, run_monte_carlo_simulation_groups,
-    load_tournament_format, save_tournament_format
+    load_group_config, save_group_config,
+    load_tournament_format, save_tournament_format,
+    split_played, season_scenario, run_season_scenario_chunked
 )
+from utils.result_store import cached_result
+from utils.job_runner import run_in_background, show_job, job_status
+from utils.prediction import predict_series_outcome_probs
+from utils.ratings import cached_ratings, rating_outcome_probs, series_win_prob_matrix
+from utils.dataset_registry import session_fingerprint
+from utils.tracing import performance_panel
 
 st.set_page_config(layout="wide", page_title="Playoff Qualification Odds")
+perf = performance_panel("Playoff Qualification Odds")
 
 # --- Page State Initialization ---
 if 'page_view' not in st.session_state:
@@ -28,16 +37,106 @@ if not regular_season_matches:
     st.stop()
 teams = sorted(list(set(m["teamA"] for m in regular_season_matches) | set(m["teamB"] for m in regular_season_matches)))
 
-# --- Cached Simulation Functions ---
-@st.cache_data(show_spinner="Running single-table simulation...")
-def cached_single_table_sim(teams, current_wins, current_diff, unplayed_matches, forced_outcomes, brackets, n_sim):
-    return run_monte_carlo_simulation(list(teams), dict(current_wins), dict(current_diff), list(unplayed_matches), dict(forced_outcomes), [dict(b) for b in brackets], n_sim)
+# --- Background Simulation ---
+# The season batch holds every sampled outcome, so bracket edits and the leverage report reuse it without re-simulating.
+# It runs as a background job in chunks: the odds table fills in while it works, changing an input cancels a run
+# nobody else is waiting on, and sessions asking for the same scenario share one run. Finished batches are kept
+# in the on-disk result store, so the same scenario is not re-simulated after a restart or in another session.
+def season_sim_job(sim_key, label):
+    return run_in_background("season_sim", (sim_key,), run_season_scenario_chunked, sim_key, label=label, reports_progress=True)
 
-@st.cache_data(show_spinner="Running group stage simulation...")
-def cached_group_sim(groups, current_wins, current_diff, unplayed_matches, forced_outcomes, brackets, n_sim):
-    return run_monte_carlo_simulation_groups(groups, dict(current_wins), dict(current_diff), list(unplayed_matches), dict(forced_outcomes), [dict(b) for b in brackets], n_sim)
+def job_samples(job):
+    """The finished batch, or the simulations done so far while the job runs."""
+    return job.result if job.state == "done" else job.partial
+
+def probabilities_heading(title, job, n_sim):
+    samples = job_samples(job)
+    if job.state == "done" or samples is None: return f"**{title}**"
+    return f"**{title}** (partial: {len(samples['wins']):,} of {n_sim:,} simulations)"
+
+@st.cache_data(show_spinner="Predicting series outcomes...")
+def cached_outcome_probs(_pooled_matches, fingerprint, unplayed_matches):
+    # The dataset fingerprint stands in for the raw match pool in the cache key.
+    return tuple(sorted(predict_series_outcome_probs(_pooled_matches, list(unplayed_matches)).items()))
+
+OUTCOME_WEIGHTINGS = ["Coin flip", "Series model", "Elo ratings"]
+
+def current_ratings():
+    tournaments = tuple(st.session_state['selected_tournaments'])
+    return cached_ratings(st.session_state['parsed_matches'], tournaments, session_fingerprint())
+
+def weighted_outcome_probs(weighting, unplayed):
+    matchups = tuple((m["teamA"], m["teamB"], m["date"], m["bestof"]) for m in unplayed)
+    if weighting == "Series model":
+        return cached_outcome_probs(st.session_state['pooled_matches'], session_fingerprint(), matchups)
+    if weighting == "Elo ratings":
+        return tuple(sorted(rating_outcome_probs(current_ratings(), matchups).items()))
+    return ()
+
+@st.cache_data(show_spinner="Simulating playoff bracket...")
+def cached_playoff_sim(_samples, samples_key, seeding, bracket_format, _win_prob=None, win_prob_key=None):
+    # The season batch and win matrix are not hashed; samples_key and win_prob_key identify them instead.
+    return cached_result("playoff_sim", (samples_key, seeding, bracket_format, win_prob_key), lambda: simulate_playoffs(_samples, list(seeding), bracket_format, win_prob=_win_prob))
+
+@st.cache_data(show_spinner=False)
+def cached_clinch_table(teams, current_wins, unplayed_matches, forced_outcomes, brackets, groups=None, _progress=None):
+    # The exact solver is search-based, so the table is worked out once per standings/bracket combination.
+    return build_clinch_table(teams, current_wins, unplayed_matches, forced_outcomes, brackets, groups=groups, progress=_progress)
+
+def clinch_table_with_progress(teams, current_wins, unplayed_matches, forced_outcomes, brackets, groups=None, progress=None):
+    # The job's progress callback is also its cancellation point, so it reaches the solver's search loops
+    return cached_clinch_table(teams, current_wins, unplayed_matches, forced_outcomes, brackets, groups, _progress=progress)
+
+def clinch_job(teams, current_wins, unplayed_matches, forced_outcomes, brackets, groups=None):
+    # Runs next to the season simulation instead of holding up the script on a first visit or a bracket edit
+    return run_in_background("clinch", (teams, current_wins, unplayed_matches, forced_outcomes, brackets, groups), clinch_table_with_progress,
+                             teams, current_wins, unplayed_matches, forced_outcomes, brackets, groups=groups,
+                             label="Checking clinched and eliminated teams", reports_progress=True)
+
+def clinch_view(job):
+    st.write("**Clinched / Eliminated (exact, from current standings)**")
+    job_status(job)
+    if job.state == "done": st.dataframe(job.result, use_container_width=True, hide_index=True)
 
 # --- UI Functions ---
+def playoff_ui(samples, samples_key, key_prefix):
+    with st.expander("Playoff Bracket Simulation"):
+        bracket_format = st.radio("Bracket format:", ["single", "double"], format_func=lambda f: f"{f.title()} Elimination", horizontal=True, key=f"{key_prefix}_po_format")
+        groups = samples["groups"]
+        if groups:
+            max_pos = max(len(g_teams) for g_teams in groups.values())
+            slots = [(g, p) for p in range(1, max_pos + 1) for g in sorted(groups)]
+            per_group = st.number_input("Qualifiers per group:", 1, max_pos, min(2, max_pos), key=f"{key_prefix}_po_per_group")
+            default = [s for s in slots if s[1] <= per_group]
+        else:
+            slots = [(None, p) for p in range(1, len(samples["teams"]) + 1)]
+            n_playoff = st.number_input("Playoff teams:", 2, len(slots), min(6, len(slots)), key=f"{key_prefix}_po_teams")
+            default = slots[:n_playoff]
+        slot_label = lambda s: f"{s[0]} #{s[1]}" if s[0] else f"#{s[1]}"
+        seeding = st.multiselect("Seed order (first = top seed):", slots, default=default, format_func=slot_label, key=f"{key_prefix}_po_seeding_{len(default)}")
+        use_elo = st.checkbox("Weight playoff series with Elo ratings", value=False, key=f"{key_prefix}_po_elo")
+        win_prob, win_prob_key = None, None
+        if use_elo:
+            bestof = st.selectbox("Playoff series length:", [3, 5, 7], index=1, format_func=lambda n: f"Best of {n}", key=f"{key_prefix}_po_bestof")
+            ratings = current_ratings()
+            win_prob = series_win_prob_matrix(ratings, samples["teams"], bestof)
+            win_prob_key = (bestof, len(ratings["seen"]), ratings["last_date"])
+        if len(seeding) < 2:
+            st.info("Pick at least two seeds.")
+        else:
+            st.dataframe(cached_playoff_sim(samples, samples_key, tuple(seeding), bracket_format, win_prob, win_prob_key), use_container_width=True, hide_index=True)
+
+def leverage_ui(samples, brackets, key_prefix):
+    with st.expander("Match Leverage (which upcoming series matter most)"):
+        bracket_names = [b["name"] for b in brackets]
+        qualify = st.multiselect("Counts as qualifying:", bracket_names, default=bracket_names[:-1], key=f"{key_prefix}_lev_brackets")
+        focus_team = st.selectbox("Team:", samples["teams"], key=f"{key_prefix}_lev_team")
+        report = build_leverage_report(samples, brackets, qualify)
+        if report.empty:
+            st.info("No undecided matches left to evaluate.")
+        else:
+            st.dataframe(report[report["Team"] == focus_team].drop(columns=["Team"]), use_container_width=True, hide_index=True)
+
 def group_setup_ui():
     st.header(f"Group Configuration for {tournament_name}"); st.write("Assign the teams into their respective groups.")
     if 'group_config' not in st.session_state or not isinstance(st.session_state.group_config, dict):
@@ -77,6 +176,8 @@ def single_table_dashboard():
     cutoff_week_label = st.sidebar.select_slider("Select Cutoff Week:", options=[opt[0] for opt in sorted_week_options], value=sorted_week_options[-1][0])
     cutoff_week_idx = week_options[cutoff_week_label]
     n_sim = st.sidebar.number_input("Simulations:", 1000, 100000, 10000, 1000, key="single_sim_count")
+    tiebreakers = st.sidebar.multiselect("Tiebreakers after Wins and Game Diff (in order):", list(TIEBREAK_RULES), default=list(TIEBREAK_RULES), key="single_tiebreakers")
+    weighting = st.sidebar.selectbox("Weight random outcomes with:", OUTCOME_WEIGHTINGS, key="single_weighting")
     
     if 'current_brackets' not in st.session_state or st.session_state.get('bracket_tournament') != tournament_name:
         st.session_state.current_brackets = load_bracket_config(tournament_name)['brackets']
@@ -97,12 +198,10 @@ def single_table_dashboard():
         if st.button("Save Brackets", type="primary"):
             save_bracket_config(tournament_name, {"brackets": st.session_state.current_brackets})
             st.success("Brackets saved!")
-            st.cache_data.clear()
             
     # --- Data Processing ---
     cutoff_dates = set(d for i in range(cutoff_week_idx + 1) for d in week_blocks[i]) if cutoff_week_idx >= 0 else set()
-    played = [m for m in regular_season_matches if m["date"] in cutoff_dates and m.get("winner") in ("1", "2")]
-    unplayed = [m for m in regular_season_matches if m not in played]
+    played, unplayed = split_played(regular_season_matches, cutoff_dates)
 
     # --- "What-If" Scenarios UI (with Weekly Grouping Restored) ---
     st.subheader("Upcoming Matches (What-If Scenarios)")
@@ -129,33 +228,38 @@ def single_table_dashboard():
                     forced_outcomes[match_key] = outcome[1]
 
     # --- Simulation Call ---
-    current_wins, current_diff = defaultdict(int), defaultdict(int)
-    for m in played:
-        winner_idx = int(m["winner"]) - 1
-        teams_in_match = [m["teamA"], m["teamB"]]
-        winner, loser = teams_in_match[winner_idx], teams_in_match[1 - winner_idx]
-        current_wins[winner] += 1
-        s_w, s_l = (m["scoreA"], m["scoreB"]) if winner_idx == 0 else (m["scoreB"], m["scoreA"])
-        current_diff[winner] += s_w - s_l
-        current_diff[loser] += s_l - s_w
-        
-    sim_results = cached_single_table_sim(tuple(teams), tuple(sorted(current_wins.items())), tuple(sorted(current_diff.items())), tuple((m["teamA"], m["teamB"], m["date"], m["bestof"]) for m in unplayed), tuple(sorted(forced_outcomes.items())), tuple(frozenset(b.items()) for b in st.session_state.current_brackets), n_sim)
+    scenario = season_scenario(tuple(teams), played, unplayed, forced_outcomes, n_sim, tiebreakers, weighted_outcome_probs(weighting, unplayed))
+    current_wins, sim_key = scenario["current_wins"], scenario["key"]
+    sim_job = season_sim_job(sim_key, "Running single-table simulation")
+    brackets = st.session_state.current_brackets
+    clinch = clinch_job(teams, current_wins, sim_key[3], forced_outcomes, brackets)
     
     # --- Display Results ---
     st.markdown("---")
     st.subheader("Results")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.write("**Current Standings**")
-        standings_df = build_standings_table(teams, played)
-        st.dataframe(standings_df, use_container_width=True)
-    with col2:
-        st.write("**Playoff Probabilities**")
-        if sim_results is not None and not sim_results.empty:
-            if 'Team' in standings_df.columns and not standings_df.empty:
-                st.dataframe(sim_results.set_index('Team').loc[standings_df['Team']].reset_index(), use_container_width=True, hide_index=True)
-            else:
-                st.dataframe(sim_results, use_container_width=True, hide_index=True)
+    standings_df = build_standings_table(teams, played)
+    def results_view(job):
+        job_status(job)
+        samples = job_samples(job)
+        sim_results = summarize_bracket_odds(samples, brackets) if samples is not None else None
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Current Standings**")
+            st.dataframe(standings_df, use_container_width=True)
+        with col2:
+            st.write(probabilities_heading("Playoff Probabilities", job, n_sim))
+            if sim_results is not None and not sim_results.empty:
+                if 'Team' in standings_df.columns and not standings_df.empty:
+                    st.dataframe(sim_results.set_index('Team').loc[standings_df['Team']].reset_index(), use_container_width=True, hide_index=True)
+                else:
+                    st.dataframe(sim_results, use_container_width=True, hide_index=True)
+    show_job(sim_job, results_view)
+    show_job(clinch, clinch_view)
+    if sim_job.state == "done":
+        leverage_ui(sim_job.result, brackets, "s")
+        playoff_ui(sim_job.result, sim_key, "s")
+    else:
+        st.caption("Match leverage and the playoff bracket simulation appear once the season simulation finishes.")
 
 def group_dashboard():
     st.header(f"Simulation for {tournament_name} (Group Stage)")
@@ -171,6 +275,8 @@ def group_dashboard():
     cutoff_week_label = st.sidebar.select_slider("Select Cutoff Week:", options=[f"Week {i+1}" for i in range(len(week_blocks))], value=f"Week {len(week_blocks)}")
     cutoff_week_idx = int(cutoff_week_label.split(" ")[1]) - 1
     n_sim = st.sidebar.number_input("Simulations:", 1000, 100000, 10000, 1000, key="group_sim_count")
+    tiebreakers = st.sidebar.multiselect("Tiebreakers after Wins and Game Diff (in order):", list(TIEBREAK_RULES), default=list(TIEBREAK_RULES), key="group_tiebreakers")
+    weighting = st.sidebar.selectbox("Weight random outcomes with:", OUTCOME_WEIGHTINGS, key="group_weighting")
     
     # --- ADD THIS ENTIRE BLOCK TO ADD THE MISSING FEATURE ---
     if 'current_brackets' not in st.session_state or st.session_state.get('bracket_tournament') != tournament_name:
@@ -192,7 +298,6 @@ def group_dashboard():
         if st.button("Save Brackets", type="primary", key="g_save_brackets"):
             save_bracket_config(tournament_name, {"brackets": st.session_state.current_brackets})
             st.success("Brackets saved!")
-            st.cache_data.clear()
     # --- END OF ADDITION ---
 
     with st.sidebar.expander("Configure Groups"):
@@ -205,14 +310,12 @@ def group_dashboard():
             st.session_state.group_config['groups'] = editable_groups
             save_group_config(tournament_name, st.session_state.group_config)
             st.success("Group configuration updated!")
-            st.cache_data.clear()
             st.rerun()
 
     # --- Data Processing & "What-If" (The rest of the function remains the same) ---
     brackets = st.session_state.current_brackets # Use the potentially edited brackets
     cutoff_dates = set(d for i in range(cutoff_week_idx + 1) for d in week_blocks[i]) if cutoff_week_idx >= 0 else set()
-    played = [m for m in regular_season_matches if m["date"] in cutoff_dates and m.get("winner") in ("1", "2")]
-    unplayed = [m for m in regular_season_matches if m not in played]
+    played, unplayed = split_played(regular_season_matches, cutoff_dates)
     
     st.subheader("Upcoming Matches (What-If Scenarios)")
     forced_outcomes = {}
@@ -225,43 +328,48 @@ def group_dashboard():
                 outcome = st.selectbox(f"{teamA} vs {teamB} ({date})", options, format_func=lambda x: x[0], key=f"g_match_{date}_{teamA}_{teamB}")
                 forced_outcomes[match_key] = outcome[1]
     
-    current_wins, current_diff = defaultdict(int), defaultdict(int)
-    for m in played:
-        winner_idx = int(m["winner"]) - 1
-        teams_in_match = [m["teamA"], m["teamB"]]
-        winner, loser = teams_in_match[winner_idx], teams_in_match[1 - winner_idx]
-        current_wins[winner] += 1
-        s_w, s_l = (m["scoreA"], m["scoreB"]) if winner_idx == 0 else (m["scoreB"], m["scoreA"])
-        current_diff[winner] += s_w - s_l
-        current_diff[loser] += s_l - s_w
-    sim_results = cached_group_sim(groups, tuple(sorted(current_wins.items())), tuple(sorted(current_diff.items())), tuple((m["teamA"], m["teamB"], m["date"], m["bestof"]) for m in unplayed), tuple(sorted(forced_outcomes.items())), tuple(frozenset(b.items()) for b in brackets), n_sim)
+    scenario = season_scenario(groups, played, unplayed, forced_outcomes, n_sim, tiebreakers, weighted_outcome_probs(weighting, unplayed))
+    current_wins, sim_key = scenario["current_wins"], scenario["key"]
+    sim_job = season_sim_job(sim_key, "Running group stage simulation")
+    clinch = clinch_job(teams, current_wins, sim_key[3], forced_outcomes, brackets, groups=groups)
     
     st.markdown("---"); st.subheader("Results")
-    result_tabs = st.tabs(["Overall"] + sorted(groups.keys()))
-    with result_tabs[0]:
-        col1, col2 = st.columns(2)
-        with col1:
-            st.write("**Current Standings by Group**")
-            for group_name in sorted(groups.keys()):
-                st.write(f"**{group_name}**"); standings_df = build_standings_table(groups[group_name], played)
-                st.dataframe(standings_df, use_container_width=True)
-        with col2:
-            st.write("**Playoff Probabilities by Group**")
-            if sim_results is not None and not sim_results.empty:
-                for group_name in sorted(groups.keys()):
-                    st.write(f"**{group_name}**"); group_probs = sim_results[sim_results['Group'] == group_name].drop(columns=['Group'])
-                    st.dataframe(group_probs, use_container_width=True, hide_index=True)
-    for i, group_name in enumerate(sorted(groups.keys())):
-        with result_tabs[i+1]:
+    def results_view(job):
+        job_status(job)
+        samples = job_samples(job)
+        sim_results = summarize_bracket_odds(samples, brackets) if samples is not None else None
+        result_tabs = st.tabs(["Overall"] + sorted(groups.keys()))
+        with result_tabs[0]:
             col1, col2 = st.columns(2)
             with col1:
-                st.write(f"**Current Standings ({group_name})**"); standings_df = build_standings_table(groups[group_name], played)
-                st.dataframe(standings_df, use_container_width=True)
+                st.write("**Current Standings by Group**")
+                for group_name in sorted(groups.keys()):
+                    st.write(f"**{group_name}**"); standings_df = build_standings_table(groups[group_name], played)
+                    st.dataframe(standings_df, use_container_width=True)
             with col2:
-                st.write(f"**Playoff Probabilities ({group_name})**")
+                st.write(probabilities_heading("Playoff Probabilities by Group", job, n_sim))
                 if sim_results is not None and not sim_results.empty:
-                    group_probs = sim_results[sim_results['Group'] == group_name].drop(columns=['Group'])
-                    st.dataframe(group_probs, use_container_width=True, hide_index=True)
+                    for group_name in sorted(groups.keys()):
+                        st.write(f"**{group_name}**"); group_probs = sim_results[sim_results['Group'] == group_name].drop(columns=['Group'])
+                        st.dataframe(group_probs, use_container_width=True, hide_index=True)
+        for i, group_name in enumerate(sorted(groups.keys())):
+            with result_tabs[i+1]:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write(f"**Current Standings ({group_name})**"); standings_df = build_standings_table(groups[group_name], played)
+                    st.dataframe(standings_df, use_container_width=True)
+                with col2:
+                    st.write(probabilities_heading(f"Playoff Probabilities ({group_name})", job, n_sim))
+                    if sim_results is not None and not sim_results.empty:
+                        group_probs = sim_results[sim_results['Group'] == group_name].drop(columns=['Group'])
+                        st.dataframe(group_probs, use_container_width=True, hide_index=True)
+    show_job(sim_job, results_view)
+    show_job(clinch, clinch_view)
+    if sim_job.state == "done":
+        leverage_ui(sim_job.result, brackets, "g")
+        playoff_ui(sim_job.result, sim_key, "g")
+    else:
+        st.caption("Match leverage and the playoff bracket simulation appear once the season simulation finishes.")
 
 # --- Page Router ---
 # On first load for a tournament, try to load the saved format
@@ -305,3 +413,5 @@ elif st.session_state.page_view == 'single_table_sim':
 
 elif st.session_state.page_view == 'group_sim':
     group_dashboard()
+
+perf.finish()
@@ -0,0 +1,88 @@
+import streamlit as st
+import pandas as pd
+from utils.draft_assistant import DRAFT_ORDER, draft_state, legal_heroes, suggest_next, score_states
+from utils.prediction import draft_tables
+from utils.draft_search import build_draft_index, find_similar_drafts
+from utils.tracing import performance_panel
+
+st.set_page_config(layout="wide", page_title="Draft Assistant")
+perf = performance_panel("Draft Assistant")
+
+st.title("🧠 Draft Assistant")
+st.write("Enter the draft as it happens. Every legal hero is scored for the next action, and the best candidates are checked a few actions ahead.")
+
+# --- Draft State ---
+if 'draft_actions' not in st.session_state:
+    st.session_state['draft_actions'] = []
+actions = st.session_state['draft_actions']
+
+# --- Sidebar Controls ---
+st.sidebar.header("Draft Settings")
+model_teams = sorted(draft_tables()["team_col"])
+blue_team = st.sidebar.selectbox("Blue side team:", ["(Unknown)"] + model_teams)
+red_team = st.sidebar.selectbox("Red side team:", ["(Unknown)"] + model_teams)
+blue_team = None if blue_team == "(Unknown)" else blue_team
+red_team = None if red_team == "(Unknown)" else red_team
+depth = st.sidebar.slider("Lookahead (draft actions):", 1, 4, 3)
+beam_width = st.sidebar.slider("Beam width:", 1, 8, 4)
+top_n = st.sidebar.slider("Suggestions shown:", 5, 30, 10)
+
+# --- Current Draft ---
+state = draft_state(actions, blue_team, red_team)
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("🔵 Blue Side")
+    st.write(f"**Bans:** {', '.join(state['blue_bans']) or '-'}")
+    st.write(f"**Picks:** {', '.join(state['blue']) or '-'}")
+with col2:
+    st.subheader("🔴 Red Side")
+    st.write(f"**Bans:** {', '.join(state['red_bans']) or '-'}")
+    st.write(f"**Picks:** {', '.join(state['red']) or '-'}")
+if actions:
+    st.metric("Blue win probability (current draft)", f"{score_states([state])[0] * 100:.1f}%")
+
+# --- Similar Historical Drafts ---
+@st.cache_resource(show_spinner=False)
+def cached_draft_index(_pooled_matches, tournaments):
+    return build_draft_index(_pooled_matches)
+
+if st.session_state.get('pooled_matches') and (state['blue'] or state['red']):
+    with st.expander("🔍 Similar historical drafts"):
+        index = cached_draft_index(st.session_state['pooled_matches'], tuple(st.session_state.get('selected_tournaments', [])))
+        for side, label in (("blue", "🔵 Blue"), ("red", "🔴 Red")):
+            if not state[side]: continue
+            similar = find_similar_drafts(index, state[side], k=10)
+            st.write(f"**{label} picks so far:** {', '.join(state[side])}")
+            if similar.empty:
+                st.caption("No similar sides in the loaded matches.")
+                continue
+            decided = similar[similar["Result"] != "-"]
+            if not decided.empty:
+                st.caption(f"Top {len(similar)} matches won {(decided['Result'] == 'Win').mean() * 100:.0f}% of decided games.")
+            st.dataframe(similar, use_container_width=True, hide_index=True)
+
+st.markdown("---")
+
+# --- Next Action ---
+if len(actions) >= len(DRAFT_ORDER):
+    st.success("Draft complete.")
+else:
+    side, action = DRAFT_ORDER[len(actions)]
+    st.subheader(f"Step {len(actions) + 1}: {side.title()} {action}")
+    with st.spinner("Scoring candidates..."):
+        suggestions = suggest_next(actions, blue_team, red_team, top_n=top_n, depth=depth, beam_width=beam_width)
+    st.dataframe(suggestions, use_container_width=True, hide_index=True)
+
+    options = legal_heroes(actions)
+    default = options.index(suggestions.iloc[0]["Hero"]) if not suggestions.empty else 0
+    choice = st.selectbox(f"{side.title()} {action}s:", options, index=default, key=f"draft_choice_{len(actions)}")
+    if st.button("Lock In", type="primary"):
+        st.session_state['draft_actions'] = actions + [choice]; st.rerun()
+
+c1, c2 = st.columns(2)
+if c1.button("↩️ Undo", use_container_width=True, disabled=not actions):
+    st.session_state['draft_actions'] = actions[:-1]; st.rerun()
+if c2.button("🔄 Reset Draft", use_container_width=True, disabled=not actions):
+    st.session_state['draft_actions'] = []; st.rerun()
+
+perf.finish()
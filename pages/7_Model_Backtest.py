@@ -0,0 +1,60 @@
+import streamlit as st
+import pandas as pd
+from utils.backtest import run_backtest
+from utils.tracing import performance_panel
+
+st.set_page_config(layout="wide", page_title="Model Backtest")
+perf = performance_panel("Model Backtest")
+
+st.title("📈 Model Backtest")
+st.write("Replay the loaded matches week by week to check whether the prediction models still hold up in the current meta.")
+
+# --- Check for loaded data ---
+if 'pooled_matches' not in st.session_state or not st.session_state['pooled_matches']:
+    st.warning("Please select and load tournament data on the 'app.py' homepage first.")
+    st.stop()
+
+# --- UI Controls ---
+st.sidebar.header("Backtest Settings")
+target = st.sidebar.radio("Model:", ["draft", "series"], format_func=lambda t: {"draft": "Draft predictor", "series": "Series predictor"}[t])
+mode = st.sidebar.radio(
+    "Evaluation:", ["walk_forward", "shipped"],
+    format_func=lambda m: {"walk_forward": "Walk-forward (retrain every week)", "shipped": "Shipped model file"}[m],
+)
+min_train_weeks = st.sidebar.slider("Weeks before the first test week:", 1, 12, 4)
+
+if st.sidebar.button("Run Backtest", type="primary", use_container_width=True):
+    with st.spinner("Running backtest folds..."):
+        st.session_state['backtest_results'] = run_backtest(st.session_state['pooled_matches'], target, mode, min_train_weeks)
+        st.session_state['backtest_settings'] = (target, mode, min_train_weeks)
+
+results = st.session_state.get('backtest_results')
+if 'backtest_settings' not in st.session_state:
+    st.info("Choose a model and click 'Run Backtest'.")
+    st.stop()
+if results is None:
+    st.warning("Not enough weeks of games with known outcomes to build a test fold.")
+    st.stop()
+
+# --- Results ---
+overall = results["overall"]
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Games Scored", f"{overall['Games']:,}")
+col2.metric("Log Loss", f"{overall['Log Loss']:.4f}")
+col3.metric("Brier Score", f"{overall['Brier']:.4f}")
+col4.metric("Calibration Error", f"{overall['ECE'] * 100:.2f} pp")
+
+st.subheader("Per Week")
+folds = results["folds"]
+st.line_chart(folds.set_index("Test Week")[["Log Loss", "Base Rate Log Loss"]])
+st.dataframe(folds, use_container_width=True, hide_index=True)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("Per Tournament")
+    st.dataframe(results["tournaments"], use_container_width=True, hide_index=True)
+with col2:
+    st.subheader("Calibration")
+    st.dataframe(results["calibration"], use_container_width=True, hide_index=True)
+
+perf.finish()
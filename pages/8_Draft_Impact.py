@@ -0,0 +1,44 @@
+import streamlit as st
+import pandas as pd
+from utils.draft_contributions import hero_contribution_report
+from utils.tracing import performance_panel
+
+st.set_page_config(layout="wide", page_title="Draft Impact")
+perf = performance_panel("Draft Impact")
+
+st.title("🎯 Draft Impact")
+st.write("How much each pick, ban and team moved the draft model's win probability across every loaded game. "
+         "Values are the model's feature contributions in log-odds, from the point of view of the team that drafted; "
+         "the swing columns show the equivalent change from an even 50% game.")
+
+# --- Check for loaded data ---
+if 'pooled_matches' not in st.session_state or not st.session_state['pooled_matches']:
+    st.warning("Please select and load tournament data on the 'app.py' homepage first.")
+    st.stop()
+
+with st.spinner("Scoring every historical draft..."):
+    try:
+        report = hero_contribution_report(st.session_state['pooled_matches'])
+    except RuntimeError as e:
+        st.error(str(e))
+        st.stop()
+
+if report is None:
+    st.warning("No games with known sides and a winner in the loaded data.")
+    st.stop()
+
+st.caption(f"{report['games']:,} games analyzed.")
+
+# --- UI Controls ---
+min_picks = st.sidebar.slider("Minimum picks per hero:", 1, 50, 5)
+
+tab_heroes, tab_teams, tab_sides = st.tabs(["Heroes", "Teams", "Sides"])
+with tab_heroes:
+    heroes = report["heroes"][report["heroes"]["Picks"] >= min_picks]
+    st.dataframe(heroes, use_container_width=True, hide_index=True)
+with tab_teams:
+    st.dataframe(report["teams"], use_container_width=True, hide_index=True)
+with tab_sides:
+    st.dataframe(report["sides"], use_container_width=True, hide_index=True)
+
+perf.finish()
@@ -0,0 +1,48 @@
+import streamlit as st
+import pandas as pd
+from utils.ratings import cached_ratings, rating_table, rating_history, game_win_probability, series_win_probability
+from utils.dataset_registry import session_fingerprint
+from utils.tracing import performance_panel
+
+st.set_page_config(layout="wide", page_title="Team Ratings")
+perf = performance_panel("Team Ratings")
+
+st.title("🏅 Team Ratings")
+st.write("Elo ratings built from every finished series in the loaded tournaments. "
+         "Each series moves both teams by the games won against the games the ratings expected.")
+
+# --- Check for loaded data ---
+if 'parsed_matches' not in st.session_state or not st.session_state['parsed_matches']:
+    st.warning("Please select and load tournament data on the 'app.py' homepage first.")
+    st.stop()
+
+ratings = cached_ratings(st.session_state['parsed_matches'], tuple(st.session_state['selected_tournaments']), session_fingerprint())
+if not ratings["ratings"]:
+    st.info("No finished series in the loaded data yet.")
+    st.stop()
+
+table = rating_table(ratings)
+col1, col2 = st.columns([1, 2])
+with col1:
+    st.subheader("Current Ratings")
+    st.dataframe(table, use_container_width=True, hide_index=True)
+with col2:
+    st.subheader("Rating History")
+    shown = st.multiselect("Teams:", table["Team"].tolist(), default=table["Team"].tolist()[:5])
+    if shown:
+        history = rating_history(ratings, shown)
+        st.line_chart(history.pivot_table(index="Date", columns="Team", values="Rating", aggfunc="last").ffill())
+
+# --- Matchup Calculator ---
+st.markdown("---")
+st.subheader("Matchup Calculator")
+c1, c2, c3 = st.columns(3)
+team_a = c1.selectbox("Team A:", table["Team"], index=0)
+team_b = c2.selectbox("Team B:", table["Team"], index=min(1, len(table) - 1))
+bestof = c3.selectbox("Series:", [1, 2, 3, 5, 7], index=2, format_func=lambda n: f"Best of {n}")
+p_game = game_win_probability(ratings["ratings"][team_a], ratings["ratings"][team_b], ratings["params"]["scale"])
+m1, m2 = st.columns(2)
+m1.metric(f"{team_a} wins a game", f"{p_game * 100:.1f}%")
+m2.metric(f"{team_a} wins the series", f"{series_win_probability(p_game, bestof) * 100:.1f}%")
+
+perf.finish()
@@ -0,0 +1,93 @@
+import itertools
+import random
+from collections import defaultdict
+
+import pandas as pd
+import pytest
+
+from utils.simulation import build_clinch_table, get_series_outcome_options
+
+# build_clinch_table is checked against every completion of small random leagues.
+# A tie on wins counts in the team's favour for its best finish and against it for its worst.
+N_LEAGUES = 300
+
+def completions(wins, unplayed):
+    choices = []
+    for a, b, _, bo in unplayed:
+        draw = any(c == "DRAW" for _, c in get_series_outcome_options(a, b, bo))
+        choices.append([a, b, None] if draw else [a, b])
+    for picks in itertools.product(*choices):
+        final = defaultdict(int, wins)
+        for winner in picks:
+            if winner is not None: final[winner] += 1
+        yield final, picks
+
+def brute_force(teams, wins, unplayed, brackets, groups=None):
+    tables = groups or {None: list(teams)}
+    ends = sorted({b.get("end") or len(t) for b in brackets for t in tables.values()})
+    best, worst, by_extra = {}, {}, defaultdict(lambda: defaultdict(int))
+    for final, picks in completions(wins, unplayed):
+        for table in tables.values():
+            for x in table:
+                above = sum(final[t] > final[x] for t in table if t != x)
+                level_or_above = sum(final[t] >= final[x] for t in table if t != x)
+                best[x] = min(best.get(x, len(table)), above + 1)
+                worst[x] = max(worst.get(x, 1), level_or_above + 1)
+                extra = sum(p == x for p in picks)
+                by_extra[x][extra] = max(by_extra[x][extra], level_or_above + 1)
+    expected = {}
+    for table in tables.values():
+        for x in table:
+            row = {"Best Finish": best[x], "Worst Finish": worst[x]}
+            left = sum(x in (a, b) for a, b, _, _ in unplayed)
+            for end in ends:
+                if end >= len(table): continue
+                if worst[x] <= end: magic = 0
+                elif best[x] > end: magic = None
+                else:
+                    # Winning more never hurts, so the magic number is the fewest wins after which every outcome is safe
+                    magic = next((m for m in range(left + 1) if max(by_extra[x][e] for e in range(m, left + 1) if e in by_extra[x]) <= end), None)
+                row[f"Top {end} Magic #"] = magic
+            expected[x] = row
+    return expected
+
+def random_league(rng):
+    n = rng.randint(3, 7)
+    teams = [f"T{i}" for i in range(n)]
+    groups = None
+    if n >= 5 and rng.random() < 0.3:
+        split = rng.randint(2, n - 2)
+        groups = {"A": teams[:split], "B": teams[split:]}
+    pairs = [(a, b) for a, b in itertools.combinations(teams, 2)]
+    unplayed = [(a, b, f"2024-01-{k + 1:02d}", rng.choice([3, 3, 2])) for k, (a, b) in enumerate(rng.sample(pairs, min(len(pairs), rng.randint(1, 8))))]
+    wins = {t: rng.randint(0, 4) for t in teams}
+    brackets = [{"name": "Upper", "start": 1, "end": rng.randint(1, 2)}, {"name": "Playoffs", "start": 1, "end": rng.randint(2, n - 1)}]
+    return teams, wins, unplayed, brackets, groups
+
+@pytest.mark.parametrize("seed", range(N_LEAGUES))
+def test_clinch_table_matches_brute_force(seed):
+    teams, wins, unplayed, brackets, groups = random_league(random.Random(seed))
+    table = build_clinch_table(teams, wins, unplayed, {}, brackets, groups=groups)
+    expected = brute_force(teams, wins, unplayed, brackets, groups)
+    for row in table.to_dict("records"):
+        for col, value in expected[row["Team"]].items():
+            got = None if pd.isna(row[col]) else int(row[col])
+            assert got == value, (row["Team"], col, row, expected[row["Team"]])
+
+class Stop(Exception):
+    pass
+
+def test_clinch_table_reports_progress_and_stops_inside_the_search():
+    teams, wins, unplayed, brackets, groups = random_league(random.Random(1))
+    reported = []
+    table = build_clinch_table(teams, wins, unplayed, {}, brackets, groups=groups, progress=reported.append)
+    assert reported[-1] == 1.0 and reported == sorted(reported)
+    assert table.equals(build_clinch_table(teams, wins, unplayed, {}, brackets, groups=groups))
+
+    def cancel(fraction):
+        reported.append(fraction); raise Stop()
+    reported.clear()
+    with pytest.raises(Stop):
+        build_clinch_table(teams, wins, unplayed, {}, brackets, groups=groups, progress=cancel)
+    # The first report comes from the search for the first team, before any team is finished
+    assert reported == [0.0]
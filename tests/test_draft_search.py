@@ -0,0 +1,74 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils import result_store
+from utils.hero_index import hero_index
+from utils.draft_search import build_draft_index, lsh_candidates, find_similar_drafts
+
+# MinHash LSH candidates checked against an exact scan of the same index.
+N_MATCHES = 600
+
+@pytest.fixture(autouse=True)
+def fresh_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_store, "STORE_PATH", str(tmp_path / "store.sqlite"))
+
+@pytest.fixture(scope="module")
+def heroes():
+    return sorted(hero_index()["profiles"])
+
+def random_matches(heroes, seed=0, n_matches=N_MATCHES):
+    rng = random.Random(seed)
+    matches = []
+    for i in range(n_matches):
+        picks = rng.sample(heroes, 10)
+        games = [{"winner": rng.choice(["1", "2"]), "opponents": [
+            {"players": [{"champion": h} for h in picks[:5]]}, {"players": [{"champion": h} for h in picks[5:]]}]}]
+        matches.append({"match2id": f"m{i}", "date": f"2024-{1 + i // 100:02d}-{1 + i % 28:02d}", "tournament": "Test",
+                        "match2opponents": [{"name": f"T{i % 8}"}, {"name": f"T{(i + 3) % 8}"}], "match2games": games})
+    return matches
+
+def side_ids(index, side):
+    ids = [index["hero_idx"][h] for h in side]
+    return np.array(ids + [-1] * (5 - len(ids)), dtype=np.int64)
+
+def exact_shared(index, query_ids):
+    sides = [set(s.split(", ")) for s in index["sides"]["Heroes"]]
+    query = {index["heroes"][i] for i in query_ids if i >= 0}
+    return np.array([len(s & query) for s in sides])
+
+def queries(index, heroes, n=60, seed=1):
+    """Indexed sides with up to two heroes swapped out, so each has near neighbours at known overlaps."""
+    rng = random.Random(seed)
+    for row in rng.sample(range(len(index["sides"])), n):
+        side = index["sides"]["Heroes"].iloc[row].split(", ")
+        for _ in range(rng.randint(0, 2)):
+            side[rng.randrange(5)] = rng.choice([h for h in heroes if h not in side])
+        yield side
+
+def test_lsh_finds_every_side_sharing_four_heroes(heroes):
+    index = build_draft_index(random_matches(heroes))
+    for side in queries(index, heroes):
+        query_ids = side_ids(index, side)
+        found = set(lsh_candidates(index, query_ids).tolist())
+        assert set(np.flatnonzero(exact_shared(index, query_ids) >= 4).tolist()) <= found
+
+def test_lsh_recall_on_sides_sharing_three_heroes(heroes):
+    index = build_draft_index(random_matches(heroes))
+    hits = total = 0
+    for side in queries(index, heroes):
+        query_ids = side_ids(index, side)
+        found = set(lsh_candidates(index, query_ids).tolist())
+        near = np.flatnonzero(exact_shared(index, query_ids) == 3)
+        hits += sum(int(i) in found for i in near); total += len(near)
+    assert total > 0 and hits / total >= 0.99
+
+def test_lsh_top_matches_agree_with_exact_search(heroes):
+    index = build_draft_index(random_matches(heroes))
+    for side in queries(index, heroes, n=20):
+        exact = find_similar_drafts(index, side, k=5, method="exact")
+        lsh = find_similar_drafts(index, side, k=5, method="lsh")
+        # Ties may be ordered differently, so compare the similarity profile of the close matches
+        close = exact[exact["Shared Heroes"] >= 3]
+        assert len(close) and list(lsh["Similarity (%)"][:len(close)]) == list(close["Similarity (%)"])
@@ -0,0 +1,68 @@
+import datetime
+import random
+
+import pytest
+
+from utils import result_store
+from utils.ratings import update_ratings, new_rating_state, apply_match, RATING_PARAMS
+
+# Incremental rating updates against the stored state must match a full recompute from scratch.
+
+@pytest.fixture(autouse=True)
+def fresh_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_store, "STORE_PATH", str(tmp_path / "store.sqlite"))
+
+def random_season(seed, n_matches=120, teams=("ONIC", "RRQ", "EVOS", "AE", "BTR", "GEEK")):
+    rng = random.Random(seed)
+    day, matches = datetime.date(2024, 1, 1), []
+    for i in range(n_matches):
+        # A long break halfway through exercises the pull back towards the initial rating
+        day += datetime.timedelta(days=90 if i == n_matches // 2 else rng.choice([0, 1, 3]))
+        a, b = rng.sample(teams, 2)
+        bo = rng.choice([3, 3, 5])
+        winner_games = bo // 2 + 1
+        loser_games = rng.randint(0, winner_games - 1)
+        score_a, score_b = (winner_games, loser_games) if rng.random() < 0.5 else (loser_games, winner_games)
+        matches.append({"match_id": f"m{i}", "date": day, "teamA": a, "teamB": b, "scoreA": score_a, "scoreB": score_b})
+    return matches
+
+def full_recompute(matches):
+    state = new_rating_state()
+    for m in sorted(matches, key=lambda m: m["date"]): apply_match(state, m)
+    return state
+
+def same_state(got, expected):
+    assert got["ratings"].keys() == expected["ratings"].keys()
+    for team, rating in expected["ratings"].items():
+        assert got["ratings"][team] == pytest.approx(rating, abs=1e-9)
+    assert got["games"] == expected["games"] and got["last_played"] == expected["last_played"]
+    assert got["seen"] == expected["seen"] and got["history"] == expected["history"]
+
+def test_first_match_moves_both_teams_by_k_times_game_surplus():
+    m = {"match_id": "m0", "date": datetime.date(2024, 1, 1), "teamA": "ONIC", "teamB": "RRQ", "scoreA": 2, "scoreB": 0}
+    state = update_ratings([m])
+    # Even teams expect one game each of two, so a 2-0 is worth K * (2 - 1)
+    assert state["ratings"] == {"ONIC": RATING_PARAMS["initial"] + RATING_PARAMS["k"], "RRQ": RATING_PARAMS["initial"] - RATING_PARAMS["k"]}
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_updates_match_full_recompute(seed):
+    matches = random_season(seed)
+    for end in (10, 40, 60, 61, 100, len(matches)):
+        state = update_ratings(matches[:end], name="incremental")
+    same_state(state, full_recompute(matches))
+    # The state read back from the store carries on the same way
+    same_state(update_ratings(matches, name="incremental"), full_recompute(matches))
+
+def test_unfinished_matches_are_skipped_until_played():
+    matches = random_season(0, n_matches=30)
+    pending = dict(matches[-1], scoreA=0, scoreB=0)
+    state = update_ratings(matches[:-1] + [pending], name="pending")
+    same_state(state, full_recompute(matches[:-1]))
+    same_state(update_ratings(matches, name="pending"), full_recompute(matches))
+
+def test_backdated_match_triggers_full_rebuild():
+    matches = random_season(1, n_matches=50)
+    late, early = matches[:25] + matches[26:], matches[25]
+    update_ratings(late, name="backdated")
+    same_state(update_ratings(matches, name="backdated"), full_recompute(matches))
+    assert early["match_id"] in update_ratings(matches, name="backdated")["seen"]
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from utils.simulation import (
+    build_head_to_head, table_head_to_head, label_tie_groups, rank_simulated_table,
+    simulate_season_batch, merge_samples, summarize_bracket_odds, simulate_playoffs,
+)
+
+# Small hand-built tables whose final order is known, plus structural checks on merged batches and brackets.
+N_SIM = 200
+TEAMS = ["A", "B", "C", "D"]
+
+def rank_table(wins, diff, played_results, tiebreakers, n_sim=N_SIM, seed=0):
+    team_idx = {t: i for i, t in enumerate(TEAMS)}
+    h2h = build_head_to_head(team_idx, played_results)
+    cols = np.arange(len(TEAMS))
+    table_h2h = table_head_to_head(h2h, cols, np.zeros((n_sim, 0), dtype=np.int16))
+    wins = np.tile(np.array(wins, dtype=np.int32), (n_sim, 1))
+    diff = np.tile(np.array(diff, dtype=np.int32), (n_sim, 1))
+    return rank_simulated_table(wins, diff, np.random.default_rng(seed), table_h2h, tiebreakers)
+
+def test_label_tie_groups_splits_on_every_key():
+    wins = np.array([[3, 2, 2, 1], [2, 2, 2, 2]])
+    assert label_tie_groups([wins, np.array([[1, 0, 0, -1], [0, 0, 0, 0]])]).tolist() == [[1, 2, 2, 3], [1, 1, 1, 1]]
+    assert label_tie_groups([wins, np.array([[1, 1, 0, -1], [3, 0, 0, -3]])]).tolist() == [[1, 2, 3, 4], [1, 2, 2, 3]]
+
+def test_tie_on_wins_and_diff_without_tiebreakers_is_random():
+    positions = rank_table([3, 2, 2, 1], [4, 1, 1, -6], [("C", "B", "1", 2, 0)], ())
+    assert (positions[:, 0] == 1).all() and (positions[:, 3] == 4).all()
+    assert set(positions[:, 1]) == {2, 3}
+
+def test_head_to_head_record_breaks_two_way_tie():
+    # B and C are level on wins and game diff; C won their series
+    positions = rank_table([3, 2, 2, 1], [4, 1, 1, -6], [("C", "B", "1", 2, 0)], ("Head-to-head record",))
+    assert (positions == [1, 3, 2, 4]).all()
+
+def test_head_to_head_game_diff_after_split_record():
+    # A and B split their two series, but B won its series 2-0 and lost 1-2
+    played = [("A", "B", "1", 2, 1), ("A", "B", "2", 0, 2)]
+    positions = rank_table([2, 2, 1, 0], [0, 0, 0, 0], played, ("Head-to-head record",))
+    assert set(positions[:, 0]) == {1, 2}
+    positions = rank_table([2, 2, 1, 0], [0, 0, 0, 0], played, ("Head-to-head record", "Head-to-head game diff"))
+    assert (positions == [2, 1, 3, 4]).all()
+
+def test_head_to_head_mini_table_of_three_way_tie():
+    # A, B and C are level; A beat both, B beat C. D's results against them must not count.
+    played = [("A", "B", "1", 2, 0), ("A", "C", "1", 2, 1), ("B", "C", "1", 2, 1), ("D", "A", "1", 2, 0), ("D", "B", "1", 2, 0)]
+    positions = rank_table([2, 2, 2, 3], [0, 0, 0, 0], played, ("Head-to-head record",))
+    assert (positions == [2, 3, 4, 1]).all()
+
+def test_head_to_head_uses_sampled_unplayed_series():
+    # B and C finish level only by meeting each other; the sampled winner of that series must rank above
+    unplayed = [("B", "C", "2024-01-01", 3)]
+    samples = simulate_season_batch(TEAMS, {"A": 5, "B": 2, "C": 3, "D": 0}, {}, unplayed, {}, N_SIM, seed=1,
+                                    tiebreakers=("Head-to-head record",))
+    b_won = samples["wins"][:, 1] == 3
+    assert b_won.any() and (~b_won).any()
+    assert (samples["positions"][b_won, 1] == 2).all() and (samples["positions"][b_won, 2] == 3).all()
+    assert (samples["positions"][~b_won, 2] == 2).all() and (samples["positions"][~b_won, 1] == 3).all()
+
+# --- CHUNKED MERGE ---
+def batch(seed, n_sim):
+    unplayed = [("A", "B", "2024-01-01", 3), ("C", "D", "2024-01-01", 3), ("A", "C", "2024-01-02", 2)]
+    return simulate_season_batch(TEAMS, {"A": 1, "B": 1}, {"A": 1, "B": 1}, unplayed, {}, n_sim, seed=seed)
+
+def test_merge_samples_stacks_batches():
+    parts = [batch(0, 300), batch(1, 200), batch(2, 100)]
+    merged = merge_samples(parts)
+    for k in ("outcomes", "wins", "diff", "positions"):
+        assert np.array_equal(merged[k], np.concatenate([p[k] for p in parts]))
+    assert merged["teams"] == TEAMS and merged["outcome_codes"] == parts[0]["outcome_codes"]
+    assert all(p["wins"].shape[0] == n for p, n in zip(parts, (300, 200, 100)))
+    assert merge_samples(parts[:1]) is parts[0]
+
+def test_merged_odds_are_weighted_average_of_chunks():
+    brackets = [{"name": "Top 2", "start": 1, "end": 2}, {"name": "Rest", "start": 3, "end": 4}]
+    parts = [batch(0, 300), batch(1, 100)]
+    merged = summarize_bracket_odds(merge_samples(parts), brackets).set_index("Team")
+    first, second = (summarize_bracket_odds(p, brackets).set_index("Team") for p in parts)
+    col = [c for c in merged.columns if c.startswith("Top 2")][0]
+    assert np.allclose(merged[col], (3 * first[col] + second[col]) / 4, atol=0.01)
+
+# --- DOUBLE ELIMINATION ---
+def fixed_samples(n_teams, n_sim=50):
+    teams = [f"T{i}" for i in range(n_teams)]
+    positions = np.tile(np.arange(1, n_teams + 1, dtype=np.int16), (n_sim, 1))
+    return {"teams": teams, "groups": None, "positions": positions}
+
+def favourite_wins(n_teams):
+    """P(row beats column) = 1 when the row team is seeded higher."""
+    idx = np.arange(n_teams)
+    return (idx[:, None] < idx[None, :]).astype(float)
+
+def test_double_elimination_four_teams_known_path():
+    table = simulate_playoffs(fixed_samples(4), [(None, s) for s in range(1, 5)], "double", favourite_wins(4), seed=0).set_index("Team")
+    reached = {t: {c[:-4] for c in table.columns if table.loc[t, c] == 100} for t in table.index}
+    assert reached["T0"] == {"Make Playoffs", "Upper Final", "Grand Final", "Champion"}
+    # The upper-final loser drops into the lower final and wins it
+    assert reached["T1"] == {"Make Playoffs", "Upper Final", "Lower Final", "Grand Final"}
+    assert reached["T2"] == {"Make Playoffs", "Lower Round 1", "Lower Final"}
+    assert reached["T3"] == {"Make Playoffs", "Lower Round 1"}
+
+def test_double_elimination_second_seed_only_loses_to_first():
+    table = simulate_playoffs(fixed_samples(8), [(None, s) for s in range(1, 9)], "double", favourite_wins(8), seed=0).set_index("Team")
+    assert table.loc["T0", "Champion (%)"] == 100
+    assert table.loc["T1", "Grand Final (%)"] == 100 and table.loc["T1", "Lower Final (%)"] == 100
+
+@pytest.mark.parametrize("n_seeds", [4, 6, 8])
+def test_double_elimination_stage_totals(n_seeds):
+    samples = fixed_samples(8, n_sim=500)
+    table = simulate_playoffs(samples, [(None, s) for s in range(1, n_seeds + 1)], "double", seed=3)
+    # Every simulation crowns one champion from two grand finalists, one per side of the bracket
+    assert table["Champion (%)"].sum() == pytest.approx(100, abs=0.1)
+    assert table["Grand Final (%)"].sum() == pytest.approx(200, abs=0.1)
+    assert table["Make Playoffs (%)"].sum() == pytest.approx(100 * n_seeds, abs=0.1)
+    assert (table["Champion (%)"] <= table["Grand Final (%)"]).all()
+    assert (table.set_index("Team").loc[[f"T{i}" for i in range(n_seeds, 8)]] == 0).all().all()
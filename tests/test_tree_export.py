@@ -0,0 +1,50 @@
+import numpy as np
+import xgboost
+from scipy import sparse
+from sklearn.preprocessing import LabelEncoder
+
+from utils.tree_export import save_compiled, load_compiled, verify_compiled, compiled_path
+
+# The NumPy tree evaluator must reproduce XGBoost's probabilities for the bundle layouts the app serves.
+TOLERANCE = 1e-5
+
+def training_data(seed, n_rows=400, n_features=12):
+    rng = np.random.default_rng(seed)
+    X = rng.choice(np.array([0, 0, 1, -1, 0.25], dtype=np.float32), size=(n_rows, n_features))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return X, np.nan_to_num(X[:, 0] + X[:, 1] - X[:, 2])
+
+def round_trip(bundle, tmp_path):
+    return load_compiled(save_compiled(bundle, compiled_path(str(tmp_path / "model.joblib"))))
+
+def test_binary_model_matches_xgboost(tmp_path):
+    X, score = training_data(0)
+    model = xgboost.XGBClassifier(n_estimators=30, max_depth=4, learning_rate=0.3, tree_method="hist")
+    model.fit(X, (score > 0).astype(int))
+    bundle = {"model": model, "feature_list": [f"f{i}" for i in range(X.shape[1])]}
+    compiled = round_trip(bundle, tmp_path)
+    assert verify_compiled(bundle, compiled) < TOLERANCE
+    assert np.abs(model.predict_proba(X) - compiled["model"].predict_proba(X)).max() < TOLERANCE
+    assert compiled["feature_to_idx"] == {f"f{i}": i for i in range(X.shape[1])}
+
+def test_multiclass_model_matches_xgboost(tmp_path):
+    X, score = training_data(1)
+    labels = np.select([score > 0.5, score < -0.5], ["1-0", "0-1"], "0-0")
+    encoder = LabelEncoder().fit(labels)
+    model = xgboost.XGBClassifier(objective="multi:softprob", n_estimators=20, max_depth=3, learning_rate=0.3, tree_method="hist")
+    model.fit(X, encoder.transform(labels))
+    bundle = {"model": model, "label_encoder": encoder, "all_heroes": ["a", "b"]}
+    compiled = round_trip(bundle, tmp_path)
+    assert verify_compiled(bundle, compiled) < TOLERANCE
+    assert list(compiled["label_encoder"].classes_) == list(encoder.classes_)
+    assert compiled["all_heroes"] == ["a", "b"]
+
+def test_sparse_trained_model_treats_zeros_as_missing(tmp_path):
+    X, score = training_data(2)
+    X = np.nan_to_num(X)
+    model = xgboost.XGBClassifier(n_estimators=30, max_depth=4, learning_rate=0.3, tree_method="hist")
+    model.fit(sparse.csr_matrix(X), (score > 0).astype(int))
+    bundle = {"model": model, "feature_list": [f"f{i}" for i in range(X.shape[1])], "sparse_input": True}
+    compiled = round_trip(bundle, tmp_path)
+    assert compiled["model"].sparse_input
+    assert verify_compiled(bundle, compiled) < TOLERANCE
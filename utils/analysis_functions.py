@@ -1,7 +1,9 @@
 import pandas as pd
 from collections import defaultdict, Counter
 import itertools
+from utils.tracing import traced
 
+@traced("analysis")
 def calculate_hero_stats_for_team(pooled_matches, team_filter="All Teams"):
     """
     Calculates hero statistics for a specific team or all teams from a pool of matches.
@@ -102,6 +104,7 @@ def calculate_hero_stats_for_team(pooled_matches, team_filter="All Teams"):
     return pd.DataFrame(df_rows)
 
 
+@traced("analysis")
 def process_hero_drilldown_data(pooled_matches):
     """
     Processes all matches to create a cache of hero-specific stats.
@@ -189,6 +192,7 @@ def process_hero_drilldown_data(pooled_matches):
     return sorted_heroes, hero_stats_map
 
 
+@traced("analysis")
 def process_head_to_head_teams(t1_norm, t2_norm, pooled_matches):
     """
     Analyzes the head-to-head record between two specific teams.
@@ -244,6 +248,7 @@ def process_head_to_head_teams(t1_norm, t2_norm, pooled_matches):
         "t2_bans_df": pd.DataFrame(t2_bans.most_common(8), columns=['Hero', 'Bans']),
     }
 
+@traced("analysis")
 def analyze_synergy_combos(pooled_matches, team_filter, min_games, top_n, find_anti_synergy=False, focus_hero=None):
     """Calculates hero pair synergies (or anti-synergies)"""
     duo_counter = defaultdict(lambda: {"games": 0, "wins": 0})
@@ -283,6 +288,7 @@ def analyze_synergy_combos(pooled_matches, team_filter, min_games, top_n, find_a
     return df.sort_values("Win Rate (%)", ascending=find_anti_synergy).head(top_n)
 
 
+@traced("analysis")
 def analyze_counter_combos(pooled_matches, min_games, top_n, team_filter, focus_on_team_picks):
     """Calculates hero counter matchups."""
     counter_stats = defaultdict(lambda: {"games": 0, "wins": 0})
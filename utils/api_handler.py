@@ -2,6 +2,7 @@ import streamlit as st
 import requests
 import os
 import json
+from utils.tracing import traced, traced_cached
 
 # --- CONSTANTS (Moved from your notebook) ---
 # NOTE: It's better practice to store API keys as Streamlit secrets,
@@ -29,7 +30,7 @@ ALL_TOURNAMENTS = {
 }
 
 
-@st.cache_data(ttl=3600)
+@traced_cached("load", st.cache_data(ttl=3600))
 def fetch_live_tournament_matches(tournament_path):
     """
     This function is ONLY for fetching LIVE data and is cached for 1 hour.
@@ -46,7 +47,7 @@ def fetch_live_tournament_matches(tournament_path):
         return []
 
 # --- UNIFIED, CACHED API FETCHER ---
-@st.cache_data(ttl=3600) # Cache live data for 1 hour
+@traced_cached("load", st.cache_data(ttl=3600)) # Cache live data for 1 hour
 def fetch_from_api(tournament_path):
     """
     This is now the ONLY function that talks to the Liquipedia API.
@@ -64,7 +65,27 @@ def fetch_from_api(tournament_path):
         # Return the error message to be displayed in the UI
         return {'error': str(e)}
 
+def notify(level, message, icon=None):
+    """
+    Report loader progress: a toast or message box when running inside the Streamlit app,
+    a plain line on stdout for headless runs (batch reports, scripts).
+    """
+    if not st.runtime.exists():
+        print(f"[{level}] {message}")
+    elif level == "toast":
+        st.toast(message, icon=icon)
+    elif level == "warning":
+        st.warning(message)
+    else:
+        st.error(message)
+
+def tournament_filepath(tournament_name):
+    """Local JSON file an archived tournament is saved to."""
+    filename = f"{tournament_name.replace(' ', '_').replace('/', '_')}.json"
+    return os.path.join("data", filename)
+
 # --- NEW MASTER DATA LOADER with Fetch-and-Save Logic ---
+@traced("load")
 def load_tournament_data(tournament_name):
     """
     Decides whether to load data from a local file (archived) or fetch from API (live).
@@ -75,47 +96,45 @@ def load_tournament_data(tournament_name):
     path = tournament_info['path']
     
     # Create a filename-safe version of the tournament name
-    filename = f"{tournament_name.replace(' ', '_').replace('/', '_')}.json"
-    data_dir = "data"
-    filepath = os.path.join(data_dir, filename)
+    filepath = tournament_filepath(tournament_name)
 
     # Ensure the 'data' directory exists
-    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
     if not is_live:
         # --- STRATEGY 1: Try to load from local file first ---
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                st.toast(f"Loaded {len(data)} matches for {tournament_name} from file.", icon="📄")
+                notify("toast", f"Loaded {len(data)} matches for {tournament_name} from file.", icon="📄")
                 return data
         except FileNotFoundError:
             # --- File not found, so we fetch AND save it ---
-            st.toast(f"Local file for {tournament_name} not found. Fetching from API...", icon="☁️")
+            notify("toast", f"Local file for {tournament_name} not found. Fetching from API...", icon="☁️")
             data = fetch_from_api(path)
             
             if isinstance(data, dict) and 'error' in data:
-                st.error(f"Failed to fetch {tournament_name}: {data['error']}")
+                notify("error", f"Failed to fetch {tournament_name}: {data['error']}")
                 return []
             
             # Save the fetched data to a file for next time
             try:
                 with open(filepath, 'w', encoding='utf-8') as f:
                     json.dump(data, f, indent=4)
-                st.toast(f"Saved API data for {tournament_name} locally.", icon="💾")
+                notify("toast", f"Saved API data for {tournament_name} locally.", icon="💾")
             except Exception as e:
-                st.warning(f"Could not save data for {tournament_name}: {e}")
+                notify("warning", f"Could not save data for {tournament_name}: {e}")
             return data
         except Exception as e:
-            st.error(f"Error reading local file for {tournament_name}: {e}")
+            notify("error", f"Error reading local file for {tournament_name}: {e}")
             return []
             
     else:
         # --- STRATEGY 2: Fetch live data using the cached function ---
         data = fetch_from_api(path)
         if isinstance(data, dict) and 'error' in data:
-            st.error(f"Failed to fetch live data for {tournament_name}: {data['error']}")
+            notify("error", f"Failed to fetch live data for {tournament_name}: {data['error']}")
             return []
 
-        st.toast(f"Fetched {len(data)} live matches for {tournament_name} from API.", icon="📡")
+        notify("toast", f"Fetched {len(data)} live matches for {tournament_name} from API.", icon="📡")
         return data
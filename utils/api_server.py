@@ -0,0 +1,260 @@
+import sys
+import json
+import math
+import asyncio
+import inspect
+import argparse
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import pandas as pd
+from utils.api_handler import ALL_TOURNAMENTS, load_tournament_data
+from utils.batch_reports import DEFAULT_MIN_GAMES, DEFAULT_TOP_N, load_selection, compute_report, _init_worker
+from utils.dataset_registry import matches_fingerprint
+
+# --- SERVICE SETTINGS ---
+# A JSON API over one tournament selection, loaded at startup; restart it to pick up new data.
+# Reports are computed in a process pool (and kept in the result store like the pages' and the batch engine's);
+# encoded responses are kept in an in-memory LRU, and identical requests arriving while one is being computed
+# wait for that computation instead of starting their own.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+RESPONSE_CACHE_SIZE = 2048  # encoded responses kept in memory
+KEEPALIVE_S = 15  # idle seconds before a kept-alive connection is closed
+
+class ApiError(Exception):
+    """A client error answered with its HTTP status and message."""
+    def __init__(self, status, message):
+        super().__init__(status, message)
+        self.status, self.message = status, message
+
+# --- JSON ENCODING ---
+def to_jsonable(value):
+    """DataFrames become lists of records; NumPy scalars and NaN become plain JSON values."""
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient="records", date_format="iso"))
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(v) for v in value]
+    if hasattr(value, "item"):  # NumPy scalars
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def encode(payload):
+    return json.dumps(to_jsonable(payload), separators=(",", ":")).encode("utf-8")
+
+# --- ENDPOINTS ---
+# Each endpoint runs in a worker process over the dataset loaded by batch_reports._init_worker. Query parameters
+# are its keyword arguments: a parameter without a default is required, and values are parsed to the default's type.
+_SELECTION = []
+
+def _init_api_worker(pooled_matches, fingerprint, tournaments):
+    _init_worker(pooled_matches, fingerprint)
+    _SELECTION[:] = tournaments
+
+def hero_stats_endpoint(team="All Teams"):
+    return compute_report("hero_stats", (team,))
+
+def heroes_endpoint():
+    heroes, _ = compute_report("hero_drilldown", ())
+    return heroes
+
+def hero_endpoint(hero):
+    _, stats = compute_report("hero_drilldown", ())
+    if hero not in stats: raise ApiError(404, f"no picks of hero '{hero}' in the loaded data")
+    return {"hero": hero, "per_team": stats[hero]["per_team_df"], "matchups": stats[hero]["matchups_df"]}
+
+def synergy_endpoint(team="All Teams", min_games=DEFAULT_MIN_GAMES, top_n=DEFAULT_TOP_N, anti=False, hero=None):
+    return compute_report("synergy", (team, min_games, top_n, anti, hero))
+
+def counters_endpoint(min_games=DEFAULT_MIN_GAMES, top_n=DEFAULT_TOP_N, team="All Teams", focus_on_team_picks=True):
+    return compute_report("counters", (min_games, top_n, team, focus_on_team_picks))
+
+def head_to_head_endpoint(team1, team2):
+    h2h = compute_report("team_h2h", (team1, team2))
+    return {
+        "teams": [team1, team2], "total_games": h2h["total_games"], "wins": h2h["win_counts"],
+        "picks": {team1: h2h["t1_picks_df"], team2: h2h["t2_picks_df"]},
+        "bans": {team1: h2h["t1_bans_df"], team2: h2h["t2_bans_df"]},
+    }
+
+def playoff_odds_endpoint(tournament=None):
+    tournament = tournament or _SELECTION[0]
+    if tournament not in _SELECTION: raise ApiError(404, f"tournament '{tournament}' is not loaded")
+    odds = compute_report("playoff_odds", (tournament,))
+    if odds is None: raise ApiError(404, f"no regular season matches for '{tournament}'")
+    return odds
+
+ROUTES = {
+    "/hero-stats": hero_stats_endpoint,
+    "/heroes": heroes_endpoint,
+    "/hero": hero_endpoint,
+    "/synergy": synergy_endpoint,
+    "/counters": counters_endpoint,
+    "/head-to-head": head_to_head_endpoint,
+    "/playoff-odds": playoff_odds_endpoint,
+}
+
+def _serve(path, params):
+    """(status, body) of one endpoint call. Runs in a worker process; client errors are answers, not failures."""
+    try:
+        return 200, encode(ROUTES[path](**params))
+    except ApiError as e:
+        return e.status, encode({"error": e.message})
+
+def _parse_bool(raw):
+    if raw.lower() in ("1", "true", "yes"): return True
+    if raw.lower() in ("0", "false", "no"): return False
+    raise ValueError(raw)
+
+_PARSERS = {str: str, int: int, bool: _parse_bool}
+
+def parse_params(endpoint, query):
+    """Keyword arguments for an endpoint from a parsed query string, with defaults filled in."""
+    signature = inspect.signature(endpoint).parameters
+    unknown = sorted(set(query) - set(signature))
+    if unknown: raise ApiError(400, f"unknown parameter(s): {', '.join(unknown)}")
+    params = {}
+    for name, p in signature.items():
+        if name not in query:
+            if p.default is inspect.Parameter.empty: raise ApiError(400, f"missing parameter '{name}'")
+            params[name] = p.default
+            continue
+        kind = str if p.default in (inspect.Parameter.empty, None) else type(p.default)
+        try:
+            params[name] = _PARSERS[kind](query[name][-1])
+        except ValueError:
+            raise ApiError(400, f"parameter '{name}' must be {kind.__name__}")
+    return params
+
+# --- SERVER ---
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+class ApiServer:
+    def __init__(self, tournaments, n_workers=None, cache_size=RESPONSE_CACHE_SIZE, load_tournament=load_tournament_data):
+        self.tournaments = sorted(set(tournaments))
+        pooled = load_selection(self.tournaments, load_tournament)
+        if not pooled: raise ValueError(f"no match data loaded for {', '.join(self.tournaments)}")
+        self.n_matches, self.fingerprint = len(pooled), matches_fingerprint(pooled)
+        self.pool = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_api_worker,
+                                        initargs=(pooled, self.fingerprint, self.tournaments))
+        self.cache, self.cache_size = OrderedDict(), cache_size
+        self.inflight = {}
+        self.stats = Counter()
+
+    def info(self):
+        return {"tournaments": self.tournaments, "matches": self.n_matches, "fingerprint": self.fingerprint,
+                "endpoints": sorted(ROUTES)}
+
+    def cache_stats(self):
+        return {**self.stats, "cached_responses": len(self.cache), "in_flight": len(self.inflight)}
+
+    def _settle(self, key, future):
+        """Drop a finished computation from the in-flight table and keep its response unless it failed."""
+        self.inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None: return
+        self.cache[key] = future.result()
+        while len(self.cache) > self.cache_size: self.cache.popitem(last=False)
+
+    async def respond(self, target):
+        """(status, body, source) for a request target; source is 'hit', 'miss', 'coalesced' or 'local'."""
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        self.stats["requests"] += 1
+        if path in ("/", "/health"): return 200, encode(self.info()), "local"
+        if path == "/stats": return 200, encode(self.cache_stats()), "local"
+        endpoint = ROUTES.get(path)
+        if endpoint is None: return 404, encode({"error": f"unknown endpoint '{path}'"}), "local"
+        try:
+            params = parse_params(endpoint, parse_qs(url.query, keep_blank_values=True))
+        except ApiError as e:
+            return e.status, encode({"error": e.message}), "local"
+        key = (path, tuple(sorted(params.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return (*cached, "hit")
+        future = self.inflight.get(key)
+        source = "coalesced" if future is not None else "miss"
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.pool, _serve, path, params)
+            future.add_done_callback(lambda f: self._settle(key, f))
+            self.inflight[key] = future
+        self.stats[source] += 1
+        try:
+            status, body = await asyncio.shield(future)
+        except Exception as e:
+            self.stats["errors"] += 1
+            return 500, encode({"error": f"{type(e).__name__}: {e}"}), source
+        return status, body, source
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 GET and HEAD requests on one connection, keeping it alive between requests."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line: break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if int(headers.get("content-length", 0) or 0): await reader.readexactly(int(headers["content-length"]))
+                parts = request_line.decode("latin-1").split()
+                connection = headers.get("connection", "").lower()
+                if len(parts) != 3:
+                    status, body, source, keep_alive = 400, encode({"error": "malformed request line"}), "local", False
+                else:
+                    method, target, version = parts
+                    keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+                    if method in ("GET", "HEAD"):
+                        status, body, source = await self.respond(target)
+                    else:
+                        status, body, source = 405, encode({"error": f"method {method} not allowed"}), "local"
+                head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                        f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(body)}\r\n"
+                        f"Access-Control-Allow-Origin: *\r\nX-Cache: {source}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1")
+                writer.write(head if parts[:1] == ["HEAD"] else head + body)
+                await writer.drain()
+                if not keep_alive: break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving {self.n_matches} matches from {', '.join(self.tournaments)} on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve hero stats, matchups and playoff odds as JSON.")
+    parser.add_argument("tournaments", nargs="*", help="Tournament names from ALL_TOURNAMENTS (default: all).")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-size", type=int, default=RESPONSE_CACHE_SIZE)
+    args = parser.parse_args()
+    unknown = [t for t in args.tournaments if t not in ALL_TOURNAMENTS]
+    if unknown: parser.error(f"unknown tournament(s): {', '.join(unknown)}")
+    try:
+        api = ApiServer(args.tournaments or list(ALL_TOURNAMENTS), args.workers, args.cache_size)
+    except ValueError as e:
+        sys.exit(str(e))
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
@@ -0,0 +1,155 @@
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from utils.hero_index import hero_index, INDEX_PATH
+from utils.model_training import extract_games, dataset_fingerprint
+from utils.result_store import cached_result
+
+# --- ARCHETYPES ---
+# Tag weights per composition archetype. A side's archetype scores are its summed tag weights divided by those of
+# an average five-hero side, so common tags (Burst, Sustain) do not drown out rare ones (Dive, Split Push);
+# the side is labelled with its highest-scoring archetype.
+ARCHETYPES = {
+    "Dive": {"Dive": 1.0, "Initiator": 1.0, "High Mobility": 0.5, "Burst": 0.5},
+    "Poke": {"Poke": 1.0, "Long Range": 1.0, "AoE Damage": 0.5},
+    "Pick-off": {"Pick-off": 1.0, "Conceal": 1.0, "Single Target CC": 0.5, "Burst": 0.5},
+    "Teamfight": {"AoE Damage": 1.0, "Set-up": 1.0, "Control": 0.5, "Front-line": 0.5},
+    "Protect the Carry": {"Late Game": 1.0, "Peel": 1.0, "Carry": 0.5, "Heal": 0.5, "Shield": 0.5},
+    "Split Push": {"Split Push": 1.0, "Push": 1.0, "Global Presence": 0.5},
+    "Early Aggression": {"Early Game": 1.0, "Objective Control": 0.5, "Map Control": 0.5, "Vision": 0.5},
+}
+ROLE_COVERAGE_MIN = 0.5  # a role counts as covered once the side's build weights for it reach this
+# Bump when the side table's columns or labels change so stored tables are rebuilt.
+COMPOSITION_VERSION = 2
+
+# --- HERO x ATTRIBUTE MATRIX ---
+@lru_cache(maxsize=1)
+def attribute_matrix():
+    """
+    (n_heroes, n_columns) float32 matrix of roles, sub-roles, tags, damage types and archetype scores.
+    Heroes with several builds get each build at weight 1 / n_builds; a hero with several damage types
+    splits one unit between them. 'blocks' maps each attribute kind to its column slice.
+    """
+    index = hero_index()
+    heroes = list(index["profiles"])
+    vocab = {"role": index["roles"], "sub_role": index["sub_roles"], "tag": index["tags"], "damage": index["damage_type_names"]}
+    offsets, start = {}, 0
+    for kind, names in vocab.items():
+        offsets[kind] = start; start += len(names)
+    pos = {kind: {name: offsets[kind] + i for i, name in enumerate(names)} for kind, names in vocab.items()}
+    attrs = np.zeros((len(heroes), start), dtype=np.float32)
+    for h, hero in enumerate(heroes):
+        builds = index["profiles"][hero]
+        for b in builds:
+            w = 1.0 / len(builds)
+            attrs[h, pos["role"][b["primary_role"]]] += w
+            for s in b["sub_role"]: attrs[h, pos["sub_role"][s]] += w
+            for t in b["tags"]: attrs[h, pos["tag"][t]] += w
+        damage = index["damage_types"].get(hero, [])
+        for d in damage: attrs[h, pos["damage"][d]] += 1.0 / len(damage)
+    weights = np.zeros((start, len(ARCHETYPES)), dtype=np.float32)
+    for a, tags in enumerate(ARCHETYPES.values()):
+        for t, w in tags.items():
+            if t in pos["tag"]: weights[pos["tag"][t], a] = w
+    archetype = attrs @ weights
+    archetype /= np.maximum(5 * archetype.mean(axis=0), 1e-6)
+    blocks = {kind: slice(offsets[kind], offsets[kind] + len(names)) for kind, names in vocab.items()}
+    blocks["archetype"] = slice(start, start + len(ARCHETYPES))
+    return {
+        "heroes": heroes, "hero_idx": {h: i for i, h in enumerate(heroes)},
+        "columns": {**vocab, "archetype": list(ARCHETYPES)}, "blocks": blocks,
+        "matrix": np.hstack([attrs, archetype]).astype(np.float32),
+    }
+
+def _definition_key():
+    """Changes whenever the hero index or the archetype definitions change, so cached side tables are rebuilt."""
+    h = hashlib.sha256()
+    with open(INDEX_PATH, "rb") as f: h.update(f.read())
+    h.update(json.dumps(ARCHETYPES, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+# --- PER-SIDE COMPOSITIONS ---
+def whole_counts(shares):
+    """
+    Round each row of fractional counts to integers that keep the row's (whole) total: floor every entry,
+    then hand the remainder to the largest fractional parts, earlier columns first on ties.
+    """
+    floors = np.floor(shares + 1e-6)
+    remainder = np.rint(shares.sum(axis=1)) - floors.sum(axis=1)
+    order = np.argsort(-(shares - floors), axis=1, kind="stable")
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(shares.shape[1]), axis=1)
+    return (floors + (rank < remainder[:, None])).astype(int)
+
+def side_compositions(pooled_matches):
+    """
+    One row per side of every played game with its archetype, archetype scores, damage mix and role coverage.
+    All sides are mapped through the attribute matrix with a single (n_sides, n_heroes) @ (n_heroes, n_columns)
+    product; the table is cached by dataset fingerprint.
+    """
+    games = extract_games(pooled_matches)
+    def build():
+        table = attribute_matrix()
+        hero_idx, blocks, names = table["hero_idx"], table["blocks"], table["columns"]
+        counts = np.zeros((2 * len(games), len(hero_idx)), dtype=np.float32)
+        rows = []
+        for g_i, g in enumerate(games):
+            for idx in range(2):
+                for hero in g["picks"][idx]:
+                    if hero in hero_idx: counts[2 * g_i + idx, hero_idx[hero]] += 1
+                won = g["winner"] == str(idx + 1) if g["winner"] in ("1", "2") else None
+                rows.append({
+                    "Date": g["date"], "Tournament": g["tournament"], "Team": g["teams"][idx], "Opponent": g["teams"][1 - idx],
+                    "Side": g["sides"][idx].title() or "-", "Heroes": ", ".join(g["picks"][idx]), "Won": won,
+                })
+        vectors = counts @ table["matrix"]
+        sides = pd.DataFrame(rows, columns=["Date", "Tournament", "Team", "Opponent", "Side", "Heroes", "Won"])
+        if sides.empty: return sides
+        scores = vectors[:, blocks["archetype"]]
+        archetypes = np.array(names["archetype"])[scores.argmax(axis=1)]
+        sides["Archetype"] = archetypes
+        sides["Opponent Archetype"] = archetypes.reshape(-1, 2)[:, ::-1].ravel()
+        for a, name in enumerate(names["archetype"]): sides[f"{name} Score"] = scores[:, a].round(2)
+        damage = vectors[:, blocks["damage"]]
+        n_picks = counts.sum(axis=1).astype(int)
+        # Heroes with several damage types split their pick between them; the label shows whole heroes
+        sides["Damage Mix"] = [" / ".join(f"{c} {name}" for c, name in zip(row, names["damage"]) if c) or "-" for row in whole_counts(damage)]
+        for d, name in enumerate(names["damage"]): sides[f"{name} Damage Share"] = (damage[:, d] / np.maximum(n_picks, 1)).round(2)
+        roles = vectors[:, blocks["role"]] >= ROLE_COVERAGE_MIN
+        sides["Roles Covered"] = roles.sum(axis=1)
+        sides["Missing Roles"] = [", ".join(r for r, has in zip(names["role"], covered) if not has) or "-" for covered in roles]
+        return sides
+    return cached_result("composition_sides", (dataset_fingerprint(games), _definition_key(), COMPOSITION_VERSION), build)
+
+# --- AGGREGATES ---
+def filter_sides(sides, team=None, tournaments=None):
+    if sides.empty: return sides
+    mask = np.ones(len(sides), dtype=bool)
+    if team: mask &= (sides["Team"] == team).to_numpy()
+    if tournaments: mask &= sides["Tournament"].isin(tournaments).to_numpy()
+    return sides[mask]
+
+def composition_win_rates(sides, by, min_games=1):
+    """Games, wins and win rate per value of one or more composition columns, over sides with a known result."""
+    by = [by] if isinstance(by, str) else list(by)
+    played = sides[sides["Won"].notna()]
+    if played.empty: return pd.DataFrame(columns=by + ["Games", "Wins", "Win Rate (%)"])
+    stats = played.groupby(by).agg(Games=("Won", "size"), Wins=("Won", "sum")).reset_index()
+    stats["Wins"] = stats["Wins"].astype(int)
+    stats["Win Rate (%)"] = (stats["Wins"] / stats["Games"] * 100).round(2)
+    return stats[stats["Games"] >= min_games].sort_values(["Games", "Win Rate (%)"], ascending=False).reset_index(drop=True)
+
+def archetype_matchups(sides, min_games=1):
+    """Archetype x opponent archetype matrix of win rates (%), blank below min_games."""
+    stats = composition_win_rates(sides, ["Archetype", "Opponent Archetype"], min_games)
+    if stats.empty: return pd.DataFrame()
+    return stats.pivot(index="Archetype", columns="Opponent Archetype", values="Win Rate (%)")
+
+def team_archetype_profile(sides):
+    """Share of each team's drafts (%) falling in each archetype."""
+    if sides.empty: return pd.DataFrame()
+    shares = (pd.crosstab(sides["Team"], sides["Archetype"], normalize="index") * 100).round(1)
+    shares.insert(0, "Games", sides.groupby("Team").size())
+    return shares.sort_values("Games", ascending=False).reset_index()
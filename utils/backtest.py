@@ -0,0 +1,162 @@
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from utils.data_processing import parse_matches
+from utils.model_training import extract_games, dataset_fingerprint, feature_rows, rows_to_matrix, LAYOUTS, DRAFT_PARAMS, SERIES_PARAMS, FEATURE_VERSION
+from utils.model_registry import get_model, get_model_metadata
+from utils.prediction import model_proba
+from utils.result_store import cached_result
+
+# Every prediction is reduced to one probability: blue wins the game (draft) or team A wins the game (series).
+EPS = 1e-15
+
+# --- METRICS ---
+def log_loss(y, p):
+    p = np.clip(p, EPS, 1 - EPS)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+def brier_score(y, p):
+    return float(np.mean((p - y) ** 2))
+
+def calibration_table(y, p, n_bins=10):
+    """Reliability table: mean predicted vs observed win rate in equal-width probability bins."""
+    bins = np.minimum((p * n_bins).astype(int), n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    pred = np.bincount(bins, weights=p, minlength=n_bins) / np.maximum(counts, 1)
+    obs = np.bincount(bins, weights=y, minlength=n_bins) / np.maximum(counts, 1)
+    return pd.DataFrame({
+        "Bin": [f"{i * 100 // n_bins}-{(i + 1) * 100 // n_bins}%" for i in range(n_bins)],
+        "Games": counts, "Mean Predicted (%)": pred * 100, "Observed (%)": obs * 100,
+    })[counts > 0].reset_index(drop=True)
+
+def expected_calibration_error(y, p, n_bins=10):
+    table = calibration_table(y, p, n_bins)
+    if table.empty: return np.nan
+    return float(np.sum(table["Games"] * np.abs(table["Mean Predicted (%)"] - table["Observed (%)"]) / 100) / table["Games"].sum())
+
+def score_block(y, p):
+    return {"Games": len(y), "Log Loss": log_loss(y, p), "Brier": brier_score(y, p), "ECE": expected_calibration_error(y, p),
+            "Mean Predicted (%)": float(np.mean(p) * 100), "Observed (%)": float(np.mean(y) * 100)}
+
+# --- WALK-FORWARD FOLDS ---
+def walk_forward_weeks(parsed_matches):
+    """Monday of every week that has a match, from the date-sorted parse_matches output."""
+    dates = np.array([m["date"] for m in parsed_matches], dtype="datetime64[D]")
+    # 1970-01-01 was a Thursday, so day 4 of the epoch week is Monday
+    return np.unique(dates - (dates.astype(np.int64) - 4) % 7)
+
+def build_folds(dates, weeks, min_train_weeks=4):
+    """Fold k trains on every game before week k and predicts the games of week k."""
+    folds = []
+    for week in weeks[min_train_weeks:]:
+        test = np.flatnonzero((dates >= week) & (dates < week + np.timedelta64(7, "D")))
+        if len(test): folds.append({"fold": len(folds) + 1, "week": week, "train_idx": np.flatnonzero(dates < week), "test_idx": test})
+    return folds
+
+# --- DATASET ---
+def backtest_dataset(pooled_matches, target, feature_list=None):
+    """Feature matrix, outcomes, dates and tournaments for every game the target model can score."""
+    games = extract_games(pooled_matches)
+    rows = feature_rows(games, target)
+    # Series games without a recorded winner carry no outcome to score
+    keep = [g for g in games if g["key"] in rows and rows[g["key"]]["label"] != "0-0"]
+    keys = [g["key"] for g in keep]
+    labels = np.array([rows[k]["label"] for k in keys], dtype=object)
+    return {
+        "X": rows_to_matrix(rows, keys, feature_list or LAYOUTS[target](games)["feature_list"]),
+        "labels": labels,
+        "y": np.array([l == "1-0" if target == "series" else bool(l) for l in labels], dtype=float),
+        "dates": np.array([g["date"] for g in keep], dtype="datetime64[D]"),
+        "tournaments": np.array([g["tournament"] or "(Unknown)" for g in keep], dtype=object),
+        "fingerprint": dataset_fingerprint(games),
+    }
+
+def positive_probability(target, proba, classes):
+    """Reduce predict_proba output to the blue / team A game-win probability."""
+    if target == "draft": return proba[:, list(classes).index("1")]
+    a, b = proba[:, list(classes).index("1-0")], proba[:, list(classes).index("0-1")]
+    return np.where(a + b > 0, a / np.maximum(a + b, EPS), 0.5)
+
+# --- FOLD WORKERS ---
+_WORKER = {}
+
+def _init_worker(X, labels, target, n_threads):
+    _WORKER.update(X=X, labels=labels, target=target, n_threads=n_threads)
+
+def _fit_predict_fold(fold):
+    """Fit a fresh model on the fold's training games and predict its test week. Runs in a worker process."""
+    from xgboost import XGBClassifier
+    from sklearn.preprocessing import LabelEncoder
+    X, labels, target = _WORKER["X"], _WORKER["labels"], _WORKER["target"]
+    train, test = fold["train_idx"], fold["test_idx"]
+    encoder = LabelEncoder().fit(labels[train].astype(str))
+    classes = list(encoder.classes_)
+    if target == "draft" and len(classes) < 2: return None
+    if target == "series" and not {"1-0", "0-1"} <= set(classes): return None
+    params = DRAFT_PARAMS if target == "draft" else {**SERIES_PARAMS, "num_class": len(classes)}
+    model = XGBClassifier(**params, n_jobs=_WORKER["n_threads"])
+    model.fit(X[train], encoder.transform(labels[train].astype(str)))
+    return positive_probability(target, model.predict_proba(X[test]), classes)
+
+# --- BACKTEST ---
+def run_backtest(pooled_matches, target="draft", mode="walk_forward", min_train_weeks=4, n_workers=None):
+    """
+    Replay the loaded matches week by week. 'walk_forward' refits the model on every game before each
+    test week, running the folds in parallel worker processes; 'shipped' scores the current model file
+    on the same weeks. Returns per-fold, per-tournament and calibration tables plus the raw predictions.
+    """
+    weeks = walk_forward_weeks(parse_matches(pooled_matches))
+    if mode == "shipped":
+        metadata = get_model_metadata(target)
+        data = backtest_dataset(pooled_matches, target, metadata["feature_names"])
+        key = (data["fingerprint"], target, mode, min_train_weeks, FEATURE_VERSION, metadata["artifact_sha256"])
+    else:
+        data = backtest_dataset(pooled_matches, target)
+        key = (data["fingerprint"], target, mode, min_train_weeks, FEATURE_VERSION)
+    return cached_result("backtest", key, lambda: _run_folds(data, weeks, target, mode, min_train_weeks, n_workers))
+
+def _run_folds(data, weeks, target, mode, min_train_weeks, n_workers):
+    folds = build_folds(data["dates"], weeks, min_train_weeks)
+    if not folds: return None
+    if mode == "shipped":
+        bundle, metadata = get_model(target), get_model_metadata(target)
+        proba = model_proba(bundle, data["X"])
+        p_all = positive_probability(target, proba, metadata["class_labels"])
+        fold_preds = [p_all[f["test_idx"]] for f in folds]
+    else:
+        cpus = os.cpu_count() or 1
+        n_workers = max(1, min(n_workers or cpus, len(folds)))
+        initargs = (data["X"], data["labels"], target, max(1, cpus // n_workers))
+        if n_workers == 1:
+            _init_worker(*initargs)
+            fold_preds = [_fit_predict_fold(f) for f in folds]
+        else:
+            # Spawned, not forked: a fork copies the Streamlit server's threads and locks mid-flight into the workers
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker, initargs=initargs) as pool:
+                fold_preds = list(pool.map(_fit_predict_fold, folds))
+
+    fold_rows, predictions = [], []
+    y = data["y"]
+    for fold, p in zip(folds, fold_preds):
+        if p is None: continue
+        test, train = fold["test_idx"], fold["train_idx"]
+        base_rate = np.full(len(test), np.clip(y[train].mean() if len(train) else 0.5, 0.01, 0.99))
+        fold_rows.append({"Fold": fold["fold"], "Test Week": pd.Timestamp(fold["week"]).date(), "Train Games": len(train),
+                          **score_block(y[test], p), "Base Rate Log Loss": log_loss(y[test], base_rate)})
+        predictions.append(pd.DataFrame({"Fold": fold["fold"], "Date": data["dates"][test], "Tournament": data["tournaments"][test], "Predicted": p, "Outcome": y[test]}))
+    if not fold_rows: return None
+    predictions = pd.concat(predictions, ignore_index=True)
+    by_tournament = pd.DataFrame([
+        {"Tournament": name, **score_block(group["Outcome"].to_numpy(), group["Predicted"].to_numpy())}
+        for name, group in predictions.groupby("Tournament", sort=False)
+    ])
+    return {
+        "folds": pd.DataFrame(fold_rows),
+        "tournaments": by_tournament,
+        "calibration": calibration_table(predictions["Outcome"].to_numpy(), predictions["Predicted"].to_numpy()),
+        "overall": score_block(predictions["Outcome"].to_numpy(), predictions["Predicted"].to_numpy()),
+        "predictions": predictions,
+    }
@@ -0,0 +1,140 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from utils import analysis_functions
+from utils.api_handler import ALL_TOURNAMENTS, load_tournament_data
+from utils.data_processing import parse_matches
+from utils.dataset_registry import matches_fingerprint
+from utils.result_store import cached_result
+from utils.simulation import (
+    build_week_blocks, split_played, season_scenario, run_season_scenario, summarize_bracket_odds,
+    load_bracket_config, load_tournament_format, load_group_config,
+)
+
+# --- STORED REPORTS ---
+# Every report is kept in the result store under the content fingerprint of the raw matches plus its parameters.
+# The pages call these same functions, so a batch run leaves exactly the entries they look up.
+DEFAULT_MIN_GAMES = 5  # defaults of the synergy / counter page sliders
+DEFAULT_TOP_N = 10
+FULL_POOL_TOP_N = 10 ** 6  # counter rows for the full hero-pool heatmap
+
+def hero_stats_report(pooled_matches, team_filter="All Teams", fingerprint=None):
+    return cached_result("hero_stats", (fingerprint or matches_fingerprint(pooled_matches), team_filter),
+                         lambda: analysis_functions.calculate_hero_stats_for_team(pooled_matches, team_filter))
+
+def hero_drilldown_report(pooled_matches, fingerprint=None):
+    return cached_result("hero_drilldown", (fingerprint or matches_fingerprint(pooled_matches),),
+                         lambda: analysis_functions.process_hero_drilldown_data(pooled_matches))
+
+def synergy_report(pooled_matches, team_filter="All Teams", min_games=DEFAULT_MIN_GAMES, top_n=DEFAULT_TOP_N, anti=False, focus_hero=None, fingerprint=None):
+    return cached_result("synergy", (fingerprint or matches_fingerprint(pooled_matches), team_filter, min_games, top_n, anti, focus_hero),
+                         lambda: analysis_functions.analyze_synergy_combos(pooled_matches, team_filter, min_games, top_n, anti, focus_hero))
+
+def counter_report(pooled_matches, min_games=DEFAULT_MIN_GAMES, top_n=DEFAULT_TOP_N, team_filter="All Teams", focus_on_team_picks=True, fingerprint=None):
+    return cached_result("counters", (fingerprint or matches_fingerprint(pooled_matches), min_games, top_n, team_filter, focus_on_team_picks),
+                         lambda: analysis_functions.analyze_counter_combos(pooled_matches, min_games, top_n, team_filter, focus_on_team_picks))
+
+def team_h2h_report(pooled_matches, team1, team2, fingerprint=None):
+    return cached_result("team_h2h", (fingerprint or matches_fingerprint(pooled_matches), team1, team2),
+                         lambda: analysis_functions.process_head_to_head_teams(team1, team2, pooled_matches))
+
+def playoff_odds_report(parsed_matches, tournament_name):
+    """
+    Bracket odds for the playoff odds page's opening scenario: every week played so far, all remaining
+    matches random, default simulation size and tiebreakers. Uses the tournament's saved format and groups.
+    """
+    regular_season_matches = [m for m in parsed_matches if m.get("is_regular_season", False)]
+    if not regular_season_matches: return None
+    teams = sorted(set(m["teamA"] for m in regular_season_matches) | set(m["teamB"] for m in regular_season_matches))
+    week_blocks = build_week_blocks(sorted(set(m["date"] for m in regular_season_matches)))
+    played, unplayed = split_played(regular_season_matches, set(d for week in week_blocks for d in week))
+    groups = (load_group_config(tournament_name) or {}).get("groups") if load_tournament_format(tournament_name) == "group" else None
+    scenario = season_scenario(groups or tuple(teams), played, unplayed)
+    return summarize_bracket_odds(run_season_scenario(scenario["key"]), load_bracket_config(tournament_name)["brackets"])
+
+# --- BATCH JOBS ---
+def plan_jobs(pooled_matches, tournament_name, min_games=DEFAULT_MIN_GAMES, top_n=DEFAULT_TOP_N):
+    """(report, args) pairs covering the pages' default views for one dataset."""
+    teams = sorted({opp.get('name', '').strip() for m in pooled_matches for opp in m.get("match2opponents", []) if opp.get('name')})
+    pairs = sorted({tuple(sorted(names)) for m in pooled_matches
+                    if len(names := [opp.get("name", "").strip() for opp in m.get("match2opponents", [])]) == 2 and all(names) and names[0] != names[1]})
+    jobs = [("hero_stats", (team,)) for team in ["All Teams"] + teams]
+    jobs += [("hero_drilldown", ()), ("synergy", ("All Teams", min_games, top_n, False)), ("synergy", ("All Teams", min_games, top_n, True))]
+    jobs += [("counters", (min_games, top_n)), ("counters", (min_games, FULL_POOL_TOP_N))]
+    jobs += [("team_h2h", pair) for pair in pairs]
+    jobs.append(("playoff_odds", (tournament_name,)))
+    return jobs
+
+_WORKER = {}
+
+def _init_worker(pooled_matches, fingerprint):
+    _WORKER.update(pooled=pooled_matches, parsed=parse_matches(pooled_matches), fingerprint=fingerprint)
+
+def compute_report(report, args):
+    """One report over the worker's dataset, from the result store when it was computed before."""
+    if report == "playoff_odds": return playoff_odds_report(_WORKER["parsed"], *args)
+    return REPORTS[report](_WORKER["pooled"], *args, fingerprint=_WORKER["fingerprint"])
+
+def _run_job(job):
+    """Compute (or find) one report in the result store. Runs in a worker process."""
+    report, args = job
+    start = time.perf_counter()
+    try:
+        compute_report(report, args)
+        status = "ok"
+    except Exception as e:
+        status = f"failed: {e}"
+    return {"Report": report, "Arguments": ", ".join(map(str, args)), "Seconds": round(time.perf_counter() - start, 2), "Status": status}
+
+REPORTS = {
+    "hero_stats": hero_stats_report, "hero_drilldown": hero_drilldown_report, "synergy": synergy_report,
+    "counters": counter_report, "team_h2h": team_h2h_report,
+}
+
+def load_selection(tournaments, load_tournament=load_tournament_data):
+    """Raw matches of a tournament selection, pooled in the dataset registry's order so fingerprints match the app's."""
+    pooled = []
+    for name in sorted(set(tournaments)):
+        pooled.extend(load_tournament(name) or [])
+    return pooled
+
+def run_batch(tournaments, n_workers=None, min_games=DEFAULT_MIN_GAMES, top_n=DEFAULT_TOP_N, load_tournament=load_tournament_data):
+    """
+    Load a tournament selection without the UI and write every default report for it to the result store,
+    fanning the jobs out over worker processes. Returns one status row per job, or None if nothing loaded.
+    """
+    pooled = load_selection(tournaments, load_tournament)
+    if not pooled: return None
+    fingerprint = matches_fingerprint(pooled)
+    jobs = plan_jobs(pooled, tournaments[0], min_games, top_n)
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(jobs)))
+    if n_workers == 1:
+        _init_worker(pooled, fingerprint)
+        return [_run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(pooled, fingerprint)) as pool:
+        return list(pool.map(_run_job, jobs))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute dashboard reports into the local result store.")
+    parser.add_argument("tournaments", nargs="*", help="Tournament names from ALL_TOURNAMENTS (default: all).")
+    parser.add_argument("--each", action="store_true", help="Treat every tournament as its own selection instead of one pooled dataset.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--min-games", type=int, default=DEFAULT_MIN_GAMES)
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N)
+    args = parser.parse_args()
+    unknown = [t for t in args.tournaments if t not in ALL_TOURNAMENTS]
+    if unknown: parser.error(f"unknown tournament(s): {', '.join(unknown)}")
+    selected = args.tournaments or list(ALL_TOURNAMENTS)
+    failed = False
+    for selection in ([[t] for t in selected] if args.each else [selected]):
+        start = time.perf_counter()
+        rows = run_batch(selection, args.workers, args.min_games, args.top_n)
+        if rows is None:
+            print(f"{', '.join(selection)}: no match data loaded"); failed = True; continue
+        bad = [r for r in rows if r["Status"] != "ok"]
+        print(f"{', '.join(selection)}: {len(rows) - len(bad)}/{len(rows)} reports in {time.perf_counter() - start:.1f}s")
+        for r in bad: print(f"  {r['Report']}({r['Arguments']}): {r['Status']}")
+        failed |= bool(bad)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+from utils.startup import ROOT
+from utils.synthetic_data import generate_matches
+
+# --- BENCHMARK SUITE ---
+# Times the hot paths on synthetic data (utils/synthetic_data.py) of several sizes and compares them with a saved
+# JSON baseline. Every case calls the uncached function directly, so result-store and figure caches never hide a
+# regression. Baselines are machine specific: save one on the machine you compare on.
+BENCHMARK_SIZES = (1_000, 10_000)  # games; pass --sizes up to 1_000_000 for scaling runs
+BASELINE_PATH = os.path.join(ROOT, "benchmark_baseline.json")
+REPEATS = 3
+SLOW_CASE_S = 5.0  # cases slower than this run once
+REGRESSION_TOLERANCE = 1.25  # a case regresses when it is this many times slower than its baseline...
+REGRESSION_MIN_S = 0.01  # ...and at least this many seconds slower
+N_SIM = 10000  # Monte Carlo size of the playoff odds page
+UNPLAYED_WEEKS = 3  # weeks at the end of the first season left to simulate
+
+def prepare_data(n_games, seed=0):
+    """Synthetic matches plus the derived inputs the cases need."""
+    from utils.data_processing import parse_matches
+    from utils.analysis_functions import analyze_synergy_combos, analyze_counter_combos
+    from utils.simulation import build_week_blocks, split_played, season_scenario
+    raw = generate_matches(n_games, seed=seed)
+    parsed = parse_matches(raw)
+    season = [m for m in parsed if m["tournament"] == parsed[0]["tournament"] and m["is_regular_season"]]
+    teams = sorted({m["teamA"] for m in season} | {m["teamB"] for m in season})
+    weeks = build_week_blocks(sorted({m["date"] for m in season}))
+    played, unplayed = split_played(season, {d for week in weeks[:max(len(weeks) - UNPLAYED_WEEKS, 1)] for d in week})
+    scenario = season_scenario(tuple(teams), played, unplayed)
+    return {
+        "raw": raw, "parsed": parsed, "teams": teams, "unplayed": unplayed, "scenario": scenario,
+        "groups": {"Group A": teams[::2], "Group B": teams[1::2]},
+        "synergy": analyze_synergy_combos(raw, "All Teams", 1, 10),
+        "counters": analyze_counter_combos(raw, 1, 10, "All Teams", True),
+        "counters_full": analyze_counter_combos(raw, 1, 10 ** 6, "All Teams", True),
+    }
+
+def _render(plot_fn, df, *args, **kwargs):
+    """Draw and encode a figure, the work the pages do on a figure cache miss."""
+    from utils.plotting import render_figure
+    fig = plot_fn(df, *args, **kwargs)
+    return render_figure(fig) if fig is not None else None
+
+def benchmark_cases():
+    """Case name -> function of the prepared data. Imports are deferred so listing cases stays cheap."""
+    import matplotlib.pyplot, seaborn  # import cost is the startup budget's concern, not the plot cases'
+    from utils import analysis_functions as af, plotting
+    from utils.data_processing import parse_matches
+    from utils.simulation import run_monte_carlo_simulation, run_monte_carlo_simulation_groups, DEFAULT_BRACKETS
+
+    def monte_carlo(d, groups):
+        s = d["scenario"]
+        unplayed = [(m["teamA"], m["teamB"], m["date"], m["bestof"]) for m in d["unplayed"]]
+        run = run_monte_carlo_simulation_groups if groups else run_monte_carlo_simulation
+        return run(d["groups"] if groups else d["teams"], dict(s["current_wins"]), dict(s["current_diff"]), unplayed,
+                   dict(s["forced_outcomes"]), DEFAULT_BRACKETS, N_SIM)
+
+    return {
+        "parse_matches": lambda d: parse_matches(d["raw"]),
+        "calculate_hero_stats_for_team": lambda d: af.calculate_hero_stats_for_team(d["raw"], "All Teams"),
+        "calculate_hero_stats_for_team[team]": lambda d: af.calculate_hero_stats_for_team(d["raw"], d["teams"][0]),
+        "process_hero_drilldown_data": lambda d: af.process_hero_drilldown_data(d["raw"]),
+        "process_head_to_head_teams": lambda d: af.process_head_to_head_teams(d["teams"][0], d["teams"][1], d["raw"]),
+        "analyze_synergy_combos": lambda d: af.analyze_synergy_combos(d["raw"], "All Teams", 5, 10),
+        "analyze_counter_combos": lambda d: af.analyze_counter_combos(d["raw"], 5, 10, "All Teams", True),
+        "run_monte_carlo_simulation": lambda d: monte_carlo(d, groups=False),
+        "run_monte_carlo_simulation_groups": lambda d: monte_carlo(d, groups=True),
+        "plot_synergy_bar": lambda d: _render(plotting.plot_synergy_bar, d["synergy"], "Synergy"),
+        "plot_counter_heatmap": lambda d: _render(plotting.plot_counter_heatmap, d["counters"], "Counters"),
+        "plot_counter_heatmap_full": lambda d: _render(plotting.plot_counter_heatmap_full, d["counters_full"], "Counters"),
+    }
+
+def time_case(fn, data, repeats=REPEATS):
+    """Wall-clock seconds of each run; a run slower than SLOW_CASE_S ends the series."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(data)
+        times.append(time.perf_counter() - start)
+        if times[-1] > SLOW_CASE_S: break
+    return times
+
+def environment():
+    import numpy, pandas, matplotlib
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+        "cpu_count": os.cpu_count(), "numpy": numpy.__version__, "pandas": pandas.__version__,
+        "matplotlib": matplotlib.__version__, "commit": commit,
+    }
+
+def run_benchmarks(sizes=BENCHMARK_SIZES, only=None, repeats=REPEATS, seed=0, progress=print):
+    """{'created', 'environment', 'results'}; results are keyed 'case@games' with min/median seconds of the runs."""
+    cases = {name: fn for name, fn in benchmark_cases().items() if not only or any(o in name for o in only)}
+    results = {}
+    for size in sizes:
+        data = prepare_data(size, seed)
+        for name, fn in cases.items():
+            times = time_case(fn, data, repeats)
+            results[f"{name}@{size}"] = {
+                "case": name, "games": size, "matches": len(data["raw"]), "runs": len(times),
+                "min_s": round(min(times), 6), "median_s": round(statistics.median(times), 6),
+            }
+            if progress: progress(f"{name:38} {size:>9,} games  {min(times):9.4f}s")
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "seed": seed, "environment": environment(), "results": results}
+
+def save_results(results, path=BASELINE_PATH):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def load_results(path=BASELINE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def compare_results(baseline, current, tolerance=REGRESSION_TOLERANCE, min_seconds=REGRESSION_MIN_S):
+    """Rows of (key, baseline s, current s, ratio, status) for every case present in both runs, by fastest run."""
+    rows = []
+    for key, cur in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None: continue
+        ratio = cur["min_s"] / base["min_s"] if base["min_s"] > 0 else float("inf")
+        if ratio > tolerance and cur["min_s"] - base["min_s"] > min_seconds: status = "regressed"
+        elif ratio < 1 / tolerance and base["min_s"] - cur["min_s"] > min_seconds: status = "improved"
+        else: status = "ok"
+        rows.append((key, base["min_s"], cur["min_s"], ratio, status))
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the hot paths on synthetic data and compare with a baseline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES), help="Dataset sizes in games.")
+    parser.add_argument("--only", nargs="+", help="Run only cases whose name contains one of these strings.")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare with (and to write with --save).")
+    parser.add_argument("--save", action="store_true", help="Write this run as the new baseline.")
+    args = parser.parse_args()
+    current = run_benchmarks(args.sizes, args.only, args.repeats, args.seed)
+    baseline = load_results(args.baseline)
+    rows = compare_results(baseline, current) if baseline else []
+    if baseline and baseline.get("environment", {}).get("machine") != current["environment"]["machine"]:
+        print("Note: the baseline was recorded on a different machine.")
+    for key, base, cur, ratio, status in rows:
+        print(f"{key:48} {base:9.4f}s -> {cur:9.4f}s  x{ratio:5.2f}  {status}")
+    if args.save:
+        save_results(current, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+    sys.exit(1 if any(status == "regressed" for *_, status in rows) else 0)
@@ -0,0 +1,159 @@
+import streamlit as st
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+import weakref
+from utils.api_handler import ALL_TOURNAMENTS, tournament_filepath
+from utils.data_processing import parse_matches
+from utils.tracing import traced, mark_cache
+
+# --- SHARED DATASETS ---
+# Loaded tournament data is held once per process, keyed by the selected tournaments and their data versions.
+# A session keeps a DatasetHandle; its 'pooled_matches'/'parsed_matches' entries are references to the shared
+# tuples, never copies, and must be treated as read-only. A dataset is dropped when the last handle to it is
+# garbage collected (a new selection is loaded or the session ends), so memory follows distinct datasets, not users.
+LIVE_VERSION_SECONDS = 3600  # matches the API cache ttl in api_handler
+
+@st.cache_resource(show_spinner=False)
+def _registry():
+    return {"lock": threading.RLock(), "datasets": {}, "loading": {}}
+
+def tournament_version(name):
+    """Archived tournaments are versioned by their data file, live ones by the API cache window."""
+    if ALL_TOURNAMENTS[name].get("live", False):
+        return f"live-{int(time.time() // LIVE_VERSION_SECONDS)}"
+    try:
+        stat = os.stat(tournament_filepath(name))
+        return f"file-{stat.st_mtime_ns}-{stat.st_size}"
+    except FileNotFoundError:
+        return "unfetched"
+
+def dataset_key(tournaments):
+    return tuple((name, tournament_version(name)) for name in sorted(set(tournaments)))
+
+def matches_fingerprint(pooled_matches):
+    """Content hash of raw matches; stored reports are keyed by it, so any copy of the same data finds them."""
+    h = hashlib.sha256()
+    for m in pooled_matches:
+        h.update(json.dumps(m, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+def session_fingerprint():
+    """Fingerprint of the session's loaded matches, precomputed by the registry when the session holds a handle."""
+    dataset = st.session_state.get('dataset')
+    return dataset.fingerprint if dataset is not None else matches_fingerprint(st.session_state['pooled_matches'])
+
+def deep_size(*objs):
+    """Bytes held by nested dicts, lists and tuples, counting each shared object once."""
+    seen, stack, total = set(), list(objs), 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen: continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys()); stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return total
+
+class DatasetHandle:
+    """A session's reference to a shared dataset; the registry's count drops when the handle is collected."""
+    __slots__ = ("key", "__weakref__")
+
+    def __init__(self, key):
+        self.key = key
+        weakref.finalize(self, _release, key)
+
+    def _entry(self):
+        return _registry()["datasets"].get(self.key)
+
+    @property
+    def tournaments(self):
+        return [name for name, _ in self.key]
+
+    @property
+    def pooled_matches(self):
+        entry = self._entry()
+        return entry["pooled"] if entry else ()
+
+    @property
+    def parsed_matches(self):
+        entry = self._entry()
+        return entry["parsed"] if entry else ()
+
+    @property
+    def fingerprint(self):
+        entry = self._entry()
+        return entry["fingerprint"] if entry else matches_fingerprint(())
+
+def _release(key):
+    registry = _registry()
+    with registry["lock"]:
+        entry = registry["datasets"].get(key)
+        if entry is None: return
+        entry["refs"] -= 1
+        if entry["refs"] <= 0: del registry["datasets"][key]
+
+@traced("load")
+def acquire_dataset(tournaments, load_tournament):
+    """
+    Handle to the shared dataset for a tournament selection, loading it with load_tournament(name) -> raw matches
+    only if no session holds it yet. Concurrent requests for the same dataset wait for a single load.
+    Returns None when nothing could be loaded.
+    """
+    registry, key = _registry(), dataset_key(tournaments)
+    with registry["lock"]:
+        entry = registry["datasets"].get(key)
+        if entry is not None:
+            entry["refs"] += 1
+            mark_cache("hit")
+            return DatasetHandle(key)
+        key_lock = registry["loading"].setdefault(key, threading.Lock())
+    with key_lock:
+        with registry["lock"]:
+            entry = registry["datasets"].get(key)
+            if entry is not None:
+                entry["refs"] += 1
+                mark_cache("hit")
+                return DatasetHandle(key)
+        mark_cache("miss")
+        pooled = []
+        for name, _ in key:
+            pooled.extend(load_tournament(name) or [])
+        if not pooled:
+            with registry["lock"]: registry["loading"].pop(key, None)
+            return None
+        pooled = tuple(pooled)
+        parsed = tuple(parse_matches(pooled))
+        entry = {"pooled": pooled, "parsed": parsed, "refs": 1, "loaded_at": time.time(),
+                 "bytes": deep_size(pooled, parsed), "fingerprint": matches_fingerprint(pooled)}
+        with registry["lock"]:
+            registry["datasets"][key] = entry
+            registry["loading"].pop(key, None)
+        return DatasetHandle(key)
+
+# --- MEMORY ACCOUNTING ---
+def resident_datasets():
+    """One row per dataset in memory: tournaments, versions, sizes and the number of sessions holding it."""
+    registry = _registry()
+    with registry["lock"]:
+        items = list(registry["datasets"].items())
+    return [{
+        "Tournaments": ", ".join(name for name, _ in key),
+        "Versions": ", ".join(version for _, version in key),
+        "Matches": len(entry["pooled"]), "Sessions": entry["refs"],
+        "Size (MB)": round(entry["bytes"] / 2**20, 2),
+        "Loaded": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["loaded_at"])),
+    } for key, entry in items]
+
+def process_memory_mb():
+    """Current resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
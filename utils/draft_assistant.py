@@ -0,0 +1,110 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import threading
+from collections import OrderedDict
+from utils.hero_index import hero_index
+from utils.prediction import score_drafts
+
+# --- DRAFT ORDER ---
+# MPL tournament draft: 3 bans each, picks B-RR-BB-R, 2 more bans each, picks R-BB-R.
+DRAFT_ORDER = [
+    ("blue", "ban"), ("red", "ban"), ("blue", "ban"), ("red", "ban"), ("blue", "ban"), ("red", "ban"),
+    ("blue", "pick"), ("red", "pick"), ("red", "pick"), ("blue", "pick"), ("blue", "pick"), ("red", "pick"),
+    ("red", "ban"), ("blue", "ban"), ("red", "ban"), ("blue", "ban"),
+    ("red", "pick"), ("blue", "pick"), ("blue", "pick"), ("red", "pick"),
+]
+MEMO_LIMIT = 200_000  # scored drafts kept; the least recently used are dropped beyond this
+
+def draft_state(actions, blue_team=None, red_team=None):
+    """Build a draft dict (the format score_drafts takes) from the heroes chosen so far, in DRAFT_ORDER."""
+    state = {"blue": [], "red": [], "blue_bans": [], "red_bans": [], "blue_team": blue_team, "red_team": red_team}
+    for (side, action), hero in zip(DRAFT_ORDER, actions):
+        state[side if action == "pick" else f"{side}_bans"].append(hero)
+    return state
+
+def legal_heroes(actions):
+    taken = set(actions)
+    return [h for h in hero_index()["profiles"] if h not in taken]
+
+# --- MEMOISED SCORING ---
+@st.cache_resource(show_spinner=False)
+def _score_memo():
+    """Blue win probability of recently scored partial drafts (LRU order), shared across sessions."""
+    return {"lock": threading.Lock(), "values": OrderedDict()}
+
+def _state_key(state):
+    return tuple(tuple(sorted(state[k])) for k in ("blue", "red", "blue_bans", "red_bans")) + (state["blue_team"], state["red_team"])
+
+def score_states(states):
+    """Blue win probabilities for many partial drafts; only drafts never seen before reach the model, in one batch."""
+    memo = _score_memo()
+    keys = [_state_key(s) for s in states]
+    with memo["lock"]:
+        known = {}
+        for k in keys:
+            if k in memo["values"] and k not in known:
+                memo["values"].move_to_end(k); known[k] = memo["values"][k]
+    missing = {k: s for k, s in zip(keys, states) if k not in known}
+    if missing:
+        scored = dict(zip(missing.keys(), score_drafts(list(missing.values())).tolist()))
+        with memo["lock"]:
+            memo["values"].update(scored)
+            while len(memo["values"]) > MEMO_LIMIT: memo["values"].popitem(last=False)
+        known.update(scored)
+    return np.array([known[k] for k in keys])
+
+# --- SUGGESTIONS ---
+def suggest_next(actions, blue_team=None, red_team=None, top_n=10, depth=3, beam_width=4):
+    """
+    Rank every legal hero for the next draft action. 'Now' is the blue win probability right after the
+    action; 'Lookahead' backs up the value of a beam search over the next 'depth' actions, where each
+    side keeps its 'beam_width' best replies. Each search level is scored with one batched call.
+    """
+    step = len(actions)
+    if step >= len(DRAFT_ORDER): return pd.DataFrame()
+    side = DRAFT_ORDER[step][0]
+    candidates = legal_heroes(actions)
+    immediate = score_states([draft_state(actions + [h], blue_team, red_team) for h in candidates])
+    # Higher is better for blue, lower for red
+    sign = 1 if side == "blue" else -1
+    ranked = np.argsort(-sign * immediate)
+
+    # Level-wise beam search from the root's best candidates
+    roots = [[candidates[i]] for i in ranked[:beam_width]]
+    tree = {tuple(r): [] for r in roots}
+    frontier = roots
+    for level in range(1, depth):
+        if step + level >= len(DRAFT_ORDER) or not frontier: break
+        level_side = DRAFT_ORDER[step + level][0]
+        children = [(path, h) for path in frontier for h in legal_heroes(actions + path)]
+        values = score_states([draft_state(actions + path + [h], blue_team, red_team) for path, h in children])
+        by_parent = {}
+        for (path, h), v in zip(children, values): by_parent.setdefault(tuple(path), []).append((v, h))
+        frontier = []
+        for parent, options in by_parent.items():
+            options.sort(key=lambda o: o[0], reverse=(level_side == "blue"))
+            for v, h in options[:beam_width]:
+                child = list(parent) + [h]
+                tree[parent].append(tuple(child)); tree[tuple(child)] = []; frontier.append(child)
+
+    leaf_values = dict(zip(
+        [p for p, kids in tree.items() if not kids],
+        score_states([draft_state(actions + list(p), blue_team, red_team) for p, kids in tree.items() if not kids]),
+    ))
+    def backed_up(path):
+        kids = tree[path]
+        if not kids: return leaf_values[path]
+        child_values = [backed_up(k) for k in kids]
+        return max(child_values) if DRAFT_ORDER[step + len(path)][0] == "blue" else min(child_values)
+    lookahead = {r[0]: backed_up(tuple(r)) for r in roots}
+
+    rows = [{
+        "Hero": candidates[i],
+        "Role": hero_index()["primary_role"][candidates[i]],
+        "Blue Win Now (%)": immediate[i] * 100,
+        "Blue Win Lookahead (%)": lookahead[candidates[i]] * 100 if candidates[i] in lookahead else np.nan,
+    } for i in ranked[:top_n]]
+    # Searched candidates first, best lookahead for the acting side on top
+    rows.sort(key=lambda r: (np.isnan(r["Blue Win Lookahead (%)"]), -sign * np.nan_to_num(r["Blue Win Lookahead (%)"])))
+    return pd.DataFrame(rows).round(2)
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from utils.prediction import draft_tables, draft_index_arrays, encode_drafts
+from utils.model_training import extract_games, dataset_fingerprint
+from utils.model_registry import get_model, get_model_metadata
+from utils.result_store import cached_result
+
+# Contributions are XGBoost's per-feature SHAP values in log-odds of a blue win. Every value is turned to the
+# point of view of the side that made the pick, so positive always means "helped the team that drafted it".
+def game_drafts(games):
+    """Draft dicts (blue side first) for games with known sides and winner, plus their games."""
+    drafts, kept = [], []
+    for g in games:
+        if sorted(g["sides"]) != ["blue", "red"] or g["winner"] not in ("1", "2"): continue
+        blue = g["sides"].index("blue")
+        drafts.append({
+            "blue": g["picks"][blue], "red": g["picks"][1 - blue],
+            "blue_bans": g["bans"][blue], "red_bans": g["bans"][1 - blue],
+            "blue_team": g["teams"][blue], "red_team": g["teams"][1 - blue],
+        })
+        kept.append(g)
+    return drafts, kept
+
+def draft_contributions(drafts):
+    """SHAP contributions for every draft from one batched pred_contribs call: (n_drafts, n_features + 1), bias last."""
+    bundle = get_model("draft")
+    if getattr(bundle["model"], "compiled", False):
+        raise RuntimeError("Contribution analysis needs the xgboost model backend (MLBB_MODEL_BACKEND=xgboost).")
+    import xgboost
+    tables = draft_tables()
+    arrays = draft_index_arrays(drafts, tables)
+    X = encode_drafts(arrays, tables)
+    if bundle.get("sparse_input"):
+        from scipy import sparse
+        X = sparse.csr_matrix(X)
+    return bundle["model"].get_booster().predict(xgboost.DMatrix(X), pred_contribs=True), arrays, tables
+
+def to_points(log_odds):
+    """Win-probability swing in percentage points for a contribution applied at even odds."""
+    return (1 / (1 + np.exp(-np.asarray(log_odds, dtype=float))) - 0.5) * 100
+
+def summarize_contributions(phi, arrays, tables, games):
+    """Mean contribution per hero (picks and bans, by side), per team and per side."""
+    n, heroes = len(games), list(tables["hero_idx"])
+    rows = np.arange(n)[:, None]
+    tag_cols = {"blue": tables["blue_tag_col"], "red": tables["red_tag_col"]}
+    hero_sum = {k: np.zeros(len(heroes)) for k in ("blue", "red", "blue_ban", "red_ban")}
+    hero_cnt = {k: np.zeros(len(heroes)) for k in hero_sum}
+    side_parts = {}
+    for side, sign in (("blue", 1.0), ("red", -1.0)):
+        picks, roles = arrays[side], arrays[f"{side}_role"]
+        cols = tables["hero_role_col"][np.where(picks >= 0, picks, 0), np.where(roles >= 0, roles, 0)]
+        valid = (picks >= 0) & (cols >= 0)
+        pick_phi = np.where(valid, phi[rows, np.where(valid, cols, 0)], 0) * sign
+        hero_sum[side] += np.bincount(picks[valid], weights=pick_phi[valid], minlength=len(heroes))
+        hero_cnt[side] += np.bincount(picks[valid], minlength=len(heroes))
+        bans = arrays[f"{side}_bans"]
+        ban_cols = tables["ban_col"][np.where(bans >= 0, bans, 0)]
+        valid_b = (bans >= 0) & (ban_cols >= 0)
+        ban_phi = np.where(valid_b, phi[rows, np.where(valid_b, ban_cols, 0)], 0) * sign
+        hero_sum[f"{side}_ban"] += np.bincount(bans[valid_b], weights=ban_phi[valid_b], minlength=len(heroes))
+        hero_cnt[f"{side}_ban"] += np.bincount(bans[valid_b], minlength=len(heroes))
+        team = arrays[f"{side}_team"]
+        side_parts[side] = {
+            "Picks": pick_phi.sum(axis=1), "Bans": ban_phi.sum(axis=1),
+            "Composition": phi[:, tag_cols[side]].sum(axis=1) * sign,
+            "Team Identity": np.where(team >= 0, phi[np.arange(n), np.where(team >= 0, team, 0)], 0) * sign,
+        }
+
+    def mean(s, c): return np.divide(s, c, out=np.full_like(s, np.nan), where=c > 0)
+    picks_total = hero_cnt["blue"] + hero_cnt["red"]
+    bans_total = hero_cnt["blue_ban"] + hero_cnt["red_ban"]
+    pick_mean = mean(hero_sum["blue"] + hero_sum["red"], picks_total)
+    by_hero = pd.DataFrame({
+        "Hero": heroes, "Picks": picks_total.astype(int),
+        "Mean Pick Contribution": pick_mean, "Pick Swing (pp)": to_points(pick_mean),
+        "Blue Pick Contribution": mean(hero_sum["blue"], hero_cnt["blue"]), "Red Pick Contribution": mean(hero_sum["red"], hero_cnt["red"]),
+        "Bans": bans_total.astype(int), "Mean Ban Contribution": mean(hero_sum["blue_ban"] + hero_sum["red_ban"], bans_total),
+    })
+    by_hero = by_hero[(by_hero["Picks"] > 0) | (by_hero["Bans"] > 0)].sort_values("Mean Pick Contribution", ascending=False).reset_index(drop=True)
+
+    blue_idx = np.array([g["sides"].index("blue") for g in games])
+    team_rows = []
+    for side in ("blue", "red"):
+        idx = blue_idx if side == "blue" else 1 - blue_idx
+        parts = side_parts[side]
+        team_rows.append(pd.DataFrame({"Team": [g["teams"][i] for g, i in zip(games, idx)], "Side": side.title(), **parts}))
+    per_team_game = pd.concat(team_rows, ignore_index=True)
+    per_team_game["Draft Total"] = per_team_game[["Picks", "Bans", "Composition"]].sum(axis=1)
+    agg = {"Games": ("Picks", "size"), "Picks": ("Picks", "mean"), "Bans": ("Bans", "mean"), "Composition": ("Composition", "mean"),
+           "Team Identity": ("Team Identity", "mean"), "Draft Total": ("Draft Total", "mean")}
+    by_team = per_team_game.groupby("Team").agg(**agg).reset_index()
+    by_team["Draft Swing (pp)"] = to_points(by_team["Draft Total"])
+    by_team = by_team.sort_values("Draft Total", ascending=False).reset_index(drop=True)
+    by_side = per_team_game.groupby("Side").agg(**agg).reset_index()
+    by_side["Baseline (log-odds)"] = phi[:, -1].mean()
+    return {"heroes": by_hero, "teams": by_team, "sides": by_side, "games": n}
+
+def hero_contribution_report(pooled_matches):
+    """Per-hero, per-team and per-side contribution tables, cached by model version plus dataset fingerprint."""
+    games = extract_games(pooled_matches)
+    metadata = get_model_metadata("draft")
+    def compute():
+        drafts, kept = game_drafts(games)
+        if not drafts: return None
+        phi, arrays, tables = draft_contributions(drafts)
+        return summarize_contributions(phi, arrays, tables, kept)
+    key = (metadata["version"], metadata["artifact_sha256"], dataset_fingerprint(games))
+    return cached_result("draft_contributions", key, compute)
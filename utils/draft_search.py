@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from utils.hero_index import hero_index
+from utils.model_training import extract_games, dataset_fingerprint
+from utils.result_store import cached_result
+
+# --- SETTINGS ---
+# 64 MinHash values in bands of 2: two sides sharing 3 of 5 heroes (Jaccard 3/7) collide in at least one
+# band with probability > 99.8%, sides sharing 2 heroes (Jaccard 1/4) with ~87%.
+NUM_PERM = 64
+ROWS_PER_BAND = 2
+EXACT_LIMIT = 50_000  # 'auto' scans every side exactly below this many indexed sides
+INDEX_VERSION = 2  # bump when the hashing changes so cached indexes are rebuilt
+
+def _popcount(words):
+    """Set bits per uint64 word."""
+    if hasattr(np, "bitwise_count"): return np.bitwise_count(words)
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    return table[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1)
+
+def hero_bitsets(hero_ids, n_words):
+    """(n_sides, n_words) uint64 bitsets from padded (n_sides, 5) hero id arrays (-1 = empty)."""
+    bits = np.zeros((hero_ids.shape[0], n_words), dtype=np.uint64)
+    rows, slots = np.nonzero(hero_ids >= 0)
+    ids = hero_ids[rows, slots]
+    np.bitwise_or.at(bits, (rows, ids // 64), np.left_shift(np.uint64(1), (ids % 64).astype(np.uint64)))
+    return bits
+
+def minhash_signatures(hero_ids, hash_table):
+    """(n_sides, NUM_PERM) MinHash signatures: the smallest hash of any hero on the side, per hash function."""
+    hashed = hash_table[:, np.where(hero_ids >= 0, hero_ids, 0)]  # (NUM_PERM, n_sides, 5)
+    hashed = np.where(hero_ids[None] >= 0, hashed, np.iinfo(np.int64).max)
+    return hashed.min(axis=2).T
+
+def band_keys(signatures, multipliers):
+    """One uint64 key per band: rows of a band folded together with wrapping multiplication."""
+    n_bands = NUM_PERM // ROWS_PER_BAND
+    bands = signatures.reshape(signatures.shape[0], n_bands, ROWS_PER_BAND).astype(np.uint64)
+    return (bands * multipliers).sum(axis=2)  # (n_sides, n_bands)
+
+# --- INDEX ---
+def build_draft_index(pooled_matches, seed=7):
+    """Bitsets, MinHash band tables and game details for both sides of every played game, cached by dataset fingerprint."""
+    games = extract_games(pooled_matches)
+    def build():
+        heroes = sorted(set(hero_index()["profiles"]) | {h for g in games for side in g["picks"] for h in side})
+        hero_idx = {h: i for i, h in enumerate(heroes)}
+        n_words = (len(heroes) + 63) // 64
+        rows, hero_ids = [], []
+        for g in games:
+            for idx in range(2):
+                ids = [hero_idx[h] for h in g["picks"][idx][:5]]
+                hero_ids.append(ids + [-1] * (5 - len(ids)))
+                won = g["winner"] == str(idx + 1) if g["winner"] in ("1", "2") else None
+                rows.append({
+                    "Date": g["date"], "Tournament": g["tournament"], "Team": g["teams"][idx], "Opponent": g["teams"][1 - idx],
+                    "Side": g["sides"][idx].title() or "-", "Heroes": ", ".join(g["picks"][idx]),
+                    "Opponent Heroes": ", ".join(g["picks"][1 - idx]), "Won": won,
+                })
+        hero_ids = np.array(hero_ids, dtype=np.int64).reshape(-1, 5)
+        rng = np.random.default_rng(seed)
+        # An independent random value per hash function and hero. A linear hash a * id + b over the few hundred
+        # hero ids never wraps its modulus, so every function would order the heroes the same way.
+        hash_table = rng.integers(0, 1 << 62, (NUM_PERM, len(heroes)), dtype=np.int64)
+        multipliers = rng.integers(1, 1 << 62, ROWS_PER_BAND, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+        keys = band_keys(minhash_signatures(hero_ids, hash_table), multipliers)
+        order = np.argsort(keys, axis=0, kind="stable")
+        return {
+            "heroes": heroes, "hero_idx": hero_idx, "n_words": n_words,
+            "bits": hero_bitsets(hero_ids, n_words), "hash_table": hash_table, "multipliers": multipliers,
+            "band_order": order, "band_sorted": np.take_along_axis(keys, order, axis=0),
+            "sides": pd.DataFrame(rows, columns=["Date", "Tournament", "Team", "Opponent", "Side", "Heroes", "Opponent Heroes", "Won"]),
+        }
+    return cached_result("draft_index", (dataset_fingerprint(games), NUM_PERM, ROWS_PER_BAND, seed, INDEX_VERSION), build)
+
+# --- SEARCH ---
+def lsh_candidates(index, query_ids):
+    """Indexed sides that share at least one MinHash band with the query."""
+    keys = band_keys(minhash_signatures(query_ids[None], index["hash_table"]), index["multipliers"])[0]
+    found = []
+    for band, key in enumerate(keys):
+        column = index["band_sorted"][:, band]
+        lo, hi = np.searchsorted(column, key, side="left"), np.searchsorted(column, key, side="right")
+        if hi > lo: found.append(index["band_order"][lo:hi, band])
+    return np.unique(np.concatenate(found)) if found else np.array([], dtype=np.int64)
+
+def find_similar_drafts(index, heroes, k=10, method="auto"):
+    """
+    Top-k historical sides by Jaccard similarity to a set of heroes. 'exact' scans every side with
+    popcounts; 'lsh' only re-ranks the MinHash candidates; 'auto' picks exact for small indexes.
+    """
+    ids = [index["hero_idx"][h] for h in dict.fromkeys(heroes) if h in index["hero_idx"]]
+    if not ids or index["bits"].shape[0] == 0: return pd.DataFrame()
+    query_ids = np.array(ids[:5] + [-1] * (5 - len(ids[:5])), dtype=np.int64)
+    query = hero_bitsets(query_ids[None], index["n_words"])[0]
+    if method == "auto": method = "exact" if index["bits"].shape[0] <= EXACT_LIMIT else "lsh"
+    candidates = lsh_candidates(index, query_ids) if method == "lsh" else np.arange(index["bits"].shape[0])
+    if len(candidates) == 0: return pd.DataFrame()
+    bits = index["bits"][candidates]
+    shared = _popcount(bits & query).sum(axis=1)
+    union = _popcount(bits | query).sum(axis=1)
+    similarity = shared / np.maximum(union, 1)
+    top = np.argsort(-similarity, kind="stable")[:k] if len(candidates) <= k else np.argpartition(-similarity, k - 1)[:k]
+    top = top[np.argsort(-similarity[top], kind="stable")]
+    result = index["sides"].iloc[candidates[top]].reset_index(drop=True)
+    result.insert(0, "Shared Heroes", shared[top].astype(int))
+    result.insert(0, "Similarity (%)", (similarity[top] * 100).round(1))
+    result["Result"] = result.pop("Won").map({True: "Win", False: "Loss"}).fillna("-")
+    return result
@@ -0,0 +1,80 @@
+import os
+import json
+from functools import lru_cache
+
+# --- HERO METADATA INDEX ---
+# Hero builds and damage types are stored in hero_index.json instead of Python literals. Vocabularies are
+# written once and builds refer to them by position; the per-role, sub-role, tag and damage-type hero lists
+# are precomputed when the file is written. The file is parsed once per process, on first use.
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hero_index.json")
+INDEX_VERSION = 1
+
+def build_hero_index(profiles, damage_types):
+    """Serializable index from HERO_PROFILES-shaped builds and HERO_DAMAGE_TYPE-shaped damage lists."""
+    heroes = list(dict.fromkeys(list(profiles) + list(damage_types)))
+    builds = {h: profiles.get(h, []) for h in heroes}
+    roles = sorted({b["primary_role"] for bs in builds.values() for b in bs})
+    sub_roles = sorted({s for bs in builds.values() for b in bs for s in b["sub_role"]})
+    tags = sorted({t for bs in builds.values() for b in bs for t in b["tags"]})
+    damage = sorted({d for h in heroes for d in damage_types.get(h, [])})
+    pos = {name: {v: i for i, v in enumerate(vocab)} for name, vocab in (("role", roles), ("sub_role", sub_roles), ("tag", tags), ("damage", damage))}
+    def heroes_by(vocab, values_of): return {v: [h for h in heroes if v in values_of(h)] for v in vocab}
+    return {
+        "version": INDEX_VERSION, "roles": roles, "sub_roles": sub_roles, "tags": tags, "damage_types": damage,
+        "heroes": {h: {
+            "builds": [[b["build_name"], pos["role"][b["primary_role"]], [pos["sub_role"][s] for s in b["sub_role"]], [pos["tag"][t] for t in b["tags"]]] for b in builds[h]],
+            "damage": [pos["damage"][d] for d in damage_types.get(h, [])],
+        } for h in heroes},
+        "by_role": heroes_by(roles, lambda h: {b["primary_role"] for b in builds[h]}),
+        "by_sub_role": heroes_by(sub_roles, lambda h: {s for b in builds[h] for s in b["sub_role"]}),
+        "by_tag": heroes_by(tags, lambda h: {t for b in builds[h] for t in b["tags"]}),
+        "by_damage_type": heroes_by(damage, lambda h: set(damage_types.get(h, []))),
+    }
+
+def write_hero_index(profiles, damage_types, path=INDEX_PATH):
+    """Write the index with one hero per line so edits to a single hero stay reviewable."""
+    index = build_hero_index(profiles, damage_types)
+    def dump(v): return json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+    lines = []
+    for key, value in index.items():
+        if isinstance(value, dict):
+            body = ",\n".join(f"    {dump(k)}: {dump(v)}" for k, v in value.items())
+            lines.append(f"  {dump(key)}: {{\n{body}\n  }}")
+        else:
+            lines.append(f"  {dump(key)}: {dump(value)}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{\n" + ",\n".join(lines) + "\n}\n")
+    hero_index.cache_clear()
+
+@lru_cache(maxsize=1)
+def hero_index(path=INDEX_PATH):
+    """
+    Decoded hero metadata: 'profiles' and 'damage_types' in the HERO_PROFILES / HERO_DAMAGE_TYPE shapes,
+    the precomputed by_* hero lists, and 'role_build' mapping (hero, role) to the build played in that role.
+    """
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    if raw.get("version") != INDEX_VERSION:
+        raise ValueError(f"{path} has index version {raw.get('version')}, expected {INDEX_VERSION}.")
+    roles, sub_roles, tags, damage = raw["roles"], raw["sub_roles"], raw["tags"], raw["damage_types"]
+    profiles, damage_types, role_build = {}, {}, {}
+    for hero, entry in raw["heroes"].items():
+        if entry["builds"]:
+            profiles[hero] = [
+                {"build_name": name, "primary_role": roles[r], "sub_role": [sub_roles[s] for s in subs], "tags": [tags[t] for t in ts]}
+                for name, r, subs, ts in entry["builds"]
+            ]
+            role_build[(hero, None)] = profiles[hero][0]
+            for build in profiles[hero]: role_build.setdefault((hero, build["primary_role"]), build)
+        damage_types[hero] = [damage[d] for d in entry["damage"]]
+    return {
+        "profiles": profiles, "damage_types": damage_types, "role_build": role_build,
+        "roles": roles, "sub_roles": sub_roles, "tags": tags, "damage_type_names": damage,
+        "primary_role": {h: builds[0]["primary_role"] for h, builds in profiles.items()},
+        "by_role": raw["by_role"], "by_sub_role": raw["by_sub_role"], "by_tag": raw["by_tag"], "by_damage_type": raw["by_damage_type"],
+    }
+
+def hero_build(hero, role=None):
+    """Build for a hero, preferring the one played in 'role'; None for unknown heroes."""
+    builds = hero_index()["role_build"]
+    return builds.get((hero, role)) or builds.get((hero, None))
@@ -0,0 +1,146 @@
+import streamlit as st
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.result_store import scenario_key
+
+# --- BACKGROUND JOBS ---
+# Heavy computations run on a process-wide thread pool instead of the script thread, so a page keeps rendering
+# (and reacting to widgets) while they work. Jobs are keyed by their inputs: every session asking for the same
+# key shares one job. A session holds at most one job per named slot; submitting different inputs to the slot
+# releases the old job, which is cancelled once no session holds it. Threads rather than processes, so jobs read
+# the shared datasets in place; the simulations spend most of their time in NumPy.
+JOB_WORKERS = 2
+POLL_S = 0.5  # refresh interval of a page section waiting on a job
+FINISHED_JOB_TTL_S = 600  # finished jobs are kept this long so reruns and other sessions pick up the result
+FINISHED_JOBS_MAX = 64
+
+class JobCancelled(Exception):
+    """Raised inside a job's function by progress reporting once the job has been cancelled."""
+
+class Job:
+    """One background computation; 'state' is queued, running, done, failed or cancelled."""
+    def __init__(self, key, label):
+        self.key, self.label = key, label
+        self.state, self.progress, self.partial, self.result, self.error = "queued", 0.0, None, None, None
+        self.submitted_at, self.finished_at = time.time(), None
+        self.owners, self.future = set(), None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.state in ("done", "failed", "cancelled")
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def report(self, progress, partial=None):
+        """Progress callback for the job's function: fraction done and, optionally, a usable partial result."""
+        if self._cancel.is_set(): raise JobCancelled()
+        self.progress = progress
+        if partial is not None: self.partial = partial
+
+    def cancel(self):
+        """Stop the job: a queued job never starts, a running one stops at its next progress report."""
+        self._cancel.set()
+        if self.future is not None and self.future.cancel(): self._finish("cancelled")
+
+    def _finish(self, state, result=None, error=None):
+        self.result, self.error, self.state, self.finished_at = result, error, state, time.time()
+
+@st.cache_resource(show_spinner=False)
+def _runner():
+    return {"lock": threading.Lock(), "pool": ThreadPoolExecutor(JOB_WORKERS, thread_name_prefix="mlbb-job"), "jobs": {}, "slots": {}}
+
+def _execute(job, fn, args, kwargs, reports_progress):
+    if job.cancelled:
+        job._finish("cancelled"); return
+    job.state = "running"
+    try:
+        result = fn(*args, progress=job.report, **kwargs) if reports_progress else fn(*args, **kwargs)
+    except JobCancelled:
+        job._finish("cancelled")
+    except Exception as e:
+        job._finish("failed", error=f"{type(e).__name__}: {e}")
+    else:
+        job.progress = 1.0
+        job._finish("done", result=result)
+
+def _prune(runner):
+    """Forget finished jobs past their TTL, and the oldest ones beyond FINISHED_JOBS_MAX. Caller holds the lock."""
+    now = time.time()
+    finished = sorted((j for j in runner["jobs"].values() if j.finished), key=lambda j: j.finished_at)
+    for i, job in enumerate(finished):
+        if now - job.finished_at > FINISHED_JOB_TTL_S or len(finished) - i > FINISHED_JOBS_MAX:
+            del runner["jobs"][job.key]
+    runner["slots"] = {owner: key for owner, key in runner["slots"].items() if key in runner["jobs"]}
+
+def job_key(fn, key_parts):
+    return scenario_key("job", f"{fn.__module__}.{fn.__qualname__}", *key_parts)
+
+def submit_job(key_parts, fn, *args, label=None, owner=None, reports_progress=False, **kwargs):
+    """
+    The job computing fn(*args, **kwargs), identified by fn and key_parts (which must determine the result, since
+    the arguments themselves are not hashed). An unfinished or successful job with the same key is reused.
+    With reports_progress, fn is also passed progress=job.report.
+    """
+    runner, key = _runner(), job_key(fn, key_parts)
+    with runner["lock"]:
+        _prune(runner)
+        job = runner["jobs"].get(key)
+        if job is None or job.cancelled or job.state == "failed":
+            job = Job(key, label or fn.__name__)
+            runner["jobs"][key] = job
+            job.future = runner["pool"].submit(_execute, job, fn, args, kwargs, reports_progress)
+        if owner is not None:
+            previous = runner["slots"].get(owner)
+            runner["slots"][owner] = key
+            job.owners.add(owner)
+            stale = runner["jobs"].get(previous) if previous not in (None, key) else None
+            if stale is not None:
+                stale.owners.discard(owner)
+                if not stale.owners and not stale.finished: stale.cancel()
+    return job
+
+def run_in_background(slot, key_parts, fn, *args, label=None, reports_progress=False, **kwargs):
+    """
+    submit_job for the current session's 'slot' (e.g. "season_sim"): the job the session held in that slot before
+    is released, and cancelled if no other session is waiting on it.
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    owner = (ctx.session_id, slot) if ctx is not None else None
+    return submit_job(key_parts, fn, *args, label=label, owner=owner, reports_progress=reports_progress, **kwargs)
+
+def active_jobs():
+    """One row per job the runner knows about, newest first."""
+    runner = _runner()
+    with runner["lock"]:
+        jobs = sorted(runner["jobs"].values(), key=lambda j: -j.submitted_at)
+    return [{"Job": j.label, "State": j.state, "Progress (%)": round(j.progress * 100), "Sessions": len(j.owners),
+             "Age (s)": round(time.time() - j.submitted_at, 1)} for j in jobs]
+
+# --- PAGE INTEGRATION ---
+def show_job(job, render, poll=POLL_S):
+    """
+    render(job) now and, while the job is unfinished, every 'poll' seconds in a fragment, so only this section
+    refreshes and the rest of the page stays interactive. When the job finishes, the whole script reruns once so
+    sections that need the final result can draw it.
+    """
+    waiting = not job.finished
+
+    @st.fragment(run_every=poll if waiting else None)
+    def view():
+        if waiting and job.finished: st.rerun()
+        render(job)
+    view()
+
+def job_status(job):
+    """Progress bar or failure message for an unfinished or failed job; nothing once it is done."""
+    if job.state == "failed":
+        st.error(f"{job.label} failed: {job.error}")
+    elif job.state == "cancelled":
+        st.info(f"{job.label} was cancelled.")
+    elif job.state != "done":
+        st.progress(job.progress, text=f"{job.label}... {job.progress:.0%}" if job.state == "running" else f"{job.label} (queued)")
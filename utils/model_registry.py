@@ -0,0 +1,110 @@
+import streamlit as st
+import os
+import hashlib
+import threading
+
+# --- REGISTERED MODELS ---
+# Shipped model bundles, relative to the repository root. Nothing is unpickled until a page asks for a model.
+# The shipped files are never written; retraining saves versioned bundles under models/ (see
+# utils/model_training.py) and the newest of those is served instead.
+MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACT_DIR = os.path.join(MODEL_DIR, "models")
+MODEL_FILES = {
+    "draft": "draft_predictor.joblib",
+    "series": "series_predictor.joblib",
+}
+# "numpy" serves the compiled .trees.npz exports (see utils/tree_export.py) so a process can predict without
+# importing xgboost, scikit-learn or joblib; "xgboost" loads the joblib bundles.
+MODEL_BACKEND = os.environ.get("MLBB_MODEL_BACKEND", "xgboost")
+
+@st.cache_resource(show_spinner=False)
+def _registry():
+    """Process-wide holder shared by every session: loaded bundles plus the file signature they came from."""
+    return {"lock": threading.Lock(), "entries": {}}
+
+def versioned_artifacts(name):
+    """Retrained bundles for a model, oldest first (versions start with a UTC timestamp, so names sort by age)."""
+    prefix = MODEL_FILES[name][:-len(".joblib")] + "_"
+    try:
+        names = os.listdir(ARTIFACT_DIR)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(ARTIFACT_DIR, f) for f in sorted(names) if f.startswith(prefix) and f.endswith(".joblib")]
+
+def model_path(name, backend=None):
+    """The newest retrained bundle of a model if there is one, otherwise the shipped file."""
+    paths = [os.path.join(MODEL_DIR, MODEL_FILES[name])] + versioned_artifacts(name)
+    paths.reverse()
+    if (backend or MODEL_BACKEND) != "numpy": return paths[0]
+    from utils.tree_export import compiled_path
+    # A retrained bundle is only served by this backend once its compiled export exists
+    compiled = [compiled_path(p) for p in paths]
+    return next((p for p in compiled[:-1] if os.path.exists(p)), compiled[-1])
+
+def _load_bundle(path):
+    if path.endswith(".npz"):
+        from utils.tree_export import load_compiled
+        return load_compiled(path)
+    import joblib
+    return joblib.load(path)
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""): h.update(chunk)
+    return h.hexdigest()
+
+def get_model(name):
+    """
+    Return the loaded bundle for a registered model, loading it on first use.
+    If the file on disk has changed since it was loaded, or a newer retrained bundle has appeared, the new
+    bundle is loaded completely and then swapped in, so callers never see a half-loaded model.
+    """
+    registry = _registry()
+    path = model_path(name)
+    signature = _file_signature(path)
+    entry = registry["entries"].get(name)
+    if entry is not None and entry["signature"] == signature:
+        return entry["bundle"]
+    with registry["lock"]:
+        entry = registry["entries"].get(name)
+        if entry is None or entry["signature"] != signature:
+            bundle = _load_bundle(path)
+            registry["entries"][name] = {"bundle": bundle, "signature": signature, "metadata": _describe(name, bundle, path)}
+        return registry["entries"][name]["bundle"]
+
+def get_model_metadata(name):
+    """Feature names, class labels, artifact hash and training-data fingerprint of a registered model."""
+    get_model(name)
+    return _registry()["entries"][name]["metadata"]
+
+def loaded_models():
+    """Names of the models this process has loaded so far."""
+    return sorted(_registry()["entries"])
+
+def _describe(name, bundle, path):
+    model = bundle["model"]
+    if "feature_list" in bundle:
+        feature_names = list(bundle["feature_list"])
+    elif name == "series":
+        feature_names = [f"{block}_{h}_share" for block in ("teamA", "teamB", "league") for h in bundle["all_heroes"]]
+    else:
+        feature_names = []
+    if "label_encoder" in bundle:
+        class_labels = [str(c) for c in bundle["label_encoder"].classes_]
+    else:
+        class_labels = [str(c) for c in getattr(model, "classes_", [])]
+    return {
+        "name": name,
+        "path": path,
+        "feature_names": feature_names,
+        "n_features": getattr(model, "n_features_in_", len(feature_names)),
+        "class_labels": class_labels,
+        "artifact_sha256": _file_sha256(path),
+        "data_fingerprint": bundle.get("data_fingerprint"),
+        "version": bundle.get("version"),
+    }
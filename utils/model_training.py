@@ -0,0 +1,235 @@
+import os
+import json
+import hashlib
+import datetime
+import numpy as np
+import pandas as pd
+from utils.data_processing import normalize_team, match_dates
+from utils.hero_index import hero_index
+from utils.prediction import hero_role_lookup, SERIES_BLOCKS, SERIES_GAME_LABELS, SERIES_NO_RESULT
+from utils.model_registry import ARTIFACT_DIR, MODEL_FILES
+from utils.tree_export import save_compiled, compiled_path
+from utils.result_store import load_feature_rows, save_feature_rows, cached_result
+
+# Bump when the per-game feature encoding or the cached row format changes so cached rows are rebuilt.
+FEATURE_VERSION = 2
+ROLES = ["EXP", "Jungle", "Mid", "Gold", "Roam"]
+SERIES_WINDOW_DAYS = 45
+DRAFT_PARAMS = {"objective": "binary:logistic", "n_estimators": 200, "max_depth": 6, "learning_rate": 0.05, "tree_method": "hist"}
+SERIES_PARAMS = {"objective": "multi:softprob", "n_estimators": 150, "max_depth": 5, "learning_rate": 0.1, "tree_method": "hist"}
+
+# --- GAME EXTRACTION ---
+def extract_games(pooled_matches):
+    """One record per played game: a stable key, date, teams, picks, bans, sides and winner."""
+    games = []
+    for match, dt in zip(pooled_matches, match_dates(pooled_matches)):
+        if pd.isnull(dt): continue
+        names = [normalize_team(opp.get("name", "")) for opp in match.get("match2opponents", [])]
+        if len(names) != 2: continue
+        match_id = match.get("match2id") or match.get("matchid") or f"{match.get('pagename', '')}|{dt.isoformat()}|{names[0]}|{names[1]}"
+        for g, game in enumerate(match.get("match2games", [])):
+            opps, extradata = game.get("opponents", []), game.get("extradata") or {}
+            if len(opps) < 2: continue
+            picks = [[p["champion"] for p in opps[i].get("players", []) if isinstance(p, dict) and "champion" in p] for i in range(2)]
+            if not all(picks): continue
+            games.append({
+                "key": f"{match_id}#{g}", "date": dt.date(), "teams": names, "picks": picks,
+                "bans": [[extradata[f"team{i+1}ban{b}"] for b in range(1, 6) if extradata.get(f"team{i+1}ban{b}")] for i in range(2)],
+                "sides": [str(extradata.get("team1side", "")).lower(), str(extradata.get("team2side", "")).lower()],
+                "winner": str(game.get("winner", "")), "tournament": match.get("tournament", ""),
+            })
+    return sorted(games, key=lambda g: (g["date"], g["key"]))
+
+def _game_record(g):
+    return json.dumps([g["key"], g["date"].isoformat(), g["teams"], g["picks"], g["bans"], g["sides"], g["winner"]]).encode("utf-8")
+
+def dataset_fingerprint(games):
+    """Content hash of the extracted games; identical data always gives the same fingerprint."""
+    h = hashlib.sha256()
+    for g in games: h.update(_game_record(g))
+    return h.hexdigest()
+
+def window_bounds(games, window_days):
+    """Index range [lo, hi) of the games in the 'window_days' before each game of a date-sorted list."""
+    dates = np.array([g["date"] for g in games], dtype="datetime64[D]")
+    return np.searchsorted(dates, dates - np.timedelta64(window_days, "D"), side="left"), np.searchsorted(dates, dates, side="left")
+
+def series_window_tags(games, window_days):
+    """
+    Per game key, a fingerprint of everything its series row depends on: the game and the games in its window.
+    Window fingerprints are differences of prefix sums of per-game digests, so tagging every game is one pass.
+    """
+    modulus = 1 << 128
+    digests = [int(hashlib.sha256(_game_record(g)).hexdigest()[:32], 16) for g in games]
+    prefix = np.cumsum([0] + digests, dtype=object) % modulus
+    lo, hi = window_bounds(games, window_days)
+    return {g["key"]: f"{digests[i]:032x}:{(prefix[hi[i]] - prefix[lo[i]]) % modulus:032x}:{hi[i] - lo[i]}" for i, g in enumerate(games)}
+
+# --- PER-GAME FEATURE ROWS ---
+# Rows are stored by feature name, not column index, so cached rows stay valid when new heroes or teams widen the matrix.
+def draft_row(game):
+    """Signed draft features (+1 blue, -1 red) and label (blue won) for one game, or None if sides are unknown."""
+    if sorted(game["sides"]) != ["blue", "red"] or game["winner"] not in ("1", "2"): return None
+    blue = game["sides"].index("blue")
+    entries = {}
+    for idx, side, sign in ((blue, "blue", 1.0), (1 - blue, "red", -1.0)):
+        for hero in game["picks"][idx]:
+            build = hero_role_lookup(hero)
+            role = build["primary_role"] if build else "EXP"
+            entries[f"{hero}_{role}"] = entries.get(f"{hero}_{role}", 0) + sign
+            for tag in (build or {}).get("tags", []):
+                entries[f"{side}_{tag}_count"] = entries.get(f"{side}_{tag}_count", 0) + 1
+        for hero in game["bans"][idx]:
+            entries[f"{hero}_Ban"] = entries.get(f"{hero}_Ban", 0) + sign
+        entries[game["teams"][idx]] = entries.get(game["teams"][idx], 0) + sign
+    return {"entries": entries, "label": int(game["winner"] == str(blue + 1))}
+
+def series_rows(games, window_days, keys=None):
+    """
+    Team A / team B / league hero pick shares over the window before each game, labelled '1-0', '0-1' or '0-0'.
+    'games' must be date-sorted; only games whose key is in 'keys' are encoded when it is given.
+    Window counts are differences of prefix sums over the per-side pick counts: league-wide over all games, and
+    per team over the games it played, so a row costs two lookups per block whatever the window holds.
+    """
+    lo, hi = window_bounds(games, window_days)
+    heroes = sorted({h for g in games for side in g["picks"] for h in side})
+    hero_idx = {h: i for i, h in enumerate(heroes)}
+    side_counts = np.zeros((2 * len(games), len(heroes)), dtype=np.int32)
+    side_teams = {}
+    for i, game in enumerate(games):
+        for idx in range(2):
+            for hero in game["picks"][idx]: side_counts[2 * i + idx, hero_idx[hero]] += 1
+            side_teams.setdefault(game["teams"][idx], []).append(2 * i + idx)
+    prefix = lambda counts: np.vstack([np.zeros((1, len(heroes)), dtype=np.int64), np.cumsum(counts, axis=0, dtype=np.int64)])
+    league = prefix(side_counts[0::2] + side_counts[1::2])
+    # Per team: the games it played (ascending) and prefix counts of its own picks in them
+    by_team = {team: (np.array(sides) // 2, prefix(side_counts[sides])) for team, sides in side_teams.items()}
+    rows = {}
+    for i, game in enumerate(games):
+        if keys is not None and game["key"] not in keys: continue
+        blocks = []
+        for team in game["teams"]:
+            played, counts = by_team[team]
+            blocks.append(counts[np.searchsorted(played, hi[i])] - counts[np.searchsorted(played, lo[i])])
+        blocks.append(league[hi[i]] - league[lo[i]])
+        entries = {}
+        for block, c in zip(SERIES_BLOCKS, blocks):
+            total = int(c.sum())
+            for h in np.flatnonzero(c): entries[f"{block}_{heroes[h]}_share"] = int(c[h]) / total
+        label = SERIES_GAME_LABELS.get(game["winner"], SERIES_NO_RESULT)
+        rows[game["key"]] = {"entries": entries, "label": label}
+    return rows
+
+def cached_feature_rows(kind, games, build_rows, tags=None):
+    """
+    Per-game rows from the result store; only games not seen before are encoded, and only their rows are written.
+    build_rows(new_games) returns {game key: row or None}; None (a game that gives no row) is stored too, so the
+    game is not re-encoded next time. 'tags' maps game keys to a fingerprint of whatever else a row depends on;
+    a stored row with a different tag is encoded again and replaced.
+    """
+    kind = f"{kind}:v{FEATURE_VERSION}"
+    stored = load_feature_rows(kind, [g["key"] for g in games])
+    tag = (tags or {}).get
+    new_games = [g for g in games if g["key"] not in stored or stored[g["key"]][0] != tag(g["key"])]
+    rows = {k: row for k, (_, row) in stored.items()}
+    if new_games:
+        built = build_rows(new_games)
+        save_feature_rows(kind, [(k, tag(k), row) for k, row in built.items()])
+        rows.update(built)
+    return {k: row for k, row in rows.items() if row is not None}, len(new_games)
+
+def rows_to_matrix(rows, keys, feature_list):
+    """Assemble cached rows into a CSR matrix in 'feature_list' order."""
+    col = {f: i for i, f in enumerate(feature_list)}
+    indptr, indices, data = [0], [], []
+    for k in keys:
+        for name, value in rows[k]["entries"].items():
+            if name in col: indices.append(col[name]); data.append(value)
+        indptr.append(len(indices))
+    from scipy import sparse
+    return sparse.csr_matrix((np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr)), shape=(len(keys), len(feature_list)))
+
+# --- FEATURE LAYOUTS ---
+def draft_layout(games):
+    heroes = sorted(set(hero_index()["profiles"]) | {h for g in games for side in g["picks"] + g["bans"] for h in side})
+    teams = sorted({t for g in games for t in g["teams"] if t})
+    tags = hero_index()["tags"]
+    features = [f"{h}_{r}" for h in heroes for r in ROLES] + [f"{h}_Ban" for h in heroes] + teams
+    features += [f"blue_{t}_count" for t in tags] + [f"red_{t}_count" for t in tags]
+    return {"feature_list": features, "all_heroes": heroes, "roles": ROLES, "all_tags": tags}
+
+def series_layout(games):
+    heroes = sorted(set(hero_index()["profiles"]) | {h for g in games for side in g["picks"] for h in side})
+    teams = sorted({t for g in games for t in g["teams"] if t})
+    return {"feature_list": [f"{block}_{h}_share" for block in SERIES_BLOCKS for h in heroes], "all_heroes": heroes, "all_teams": teams}
+
+LAYOUTS = {"draft": draft_layout, "series": series_layout}
+
+def feature_rows(games, target):
+    """Cached per-game rows for 'draft' or 'series'; games not seen before are encoded and added to the cache."""
+    if target == "draft":
+        return cached_feature_rows("draft", games, lambda new: {g["key"]: draft_row(g) for g in new})[0]
+    # Series rows look back over earlier games, so they are tagged with their window's content: a different
+    # tournament selection or backfilled history re-encodes exactly the rows whose window changed
+    return cached_feature_rows(f"series_{SERIES_WINDOW_DAYS}", games, lambda new: series_rows(games, SERIES_WINDOW_DAYS, {g["key"] for g in new}),
+                               tags=series_window_tags(games, SERIES_WINDOW_DAYS))[0]
+
+# --- TRAINING ---
+def build_training_sets(pooled_matches):
+    """Draft and series matrices for the loaded matches, cached by dataset fingerprint."""
+    games = extract_games(pooled_matches)
+    fingerprint = dataset_fingerprint(games)
+    def build():
+        sets = {}
+        for target in ("draft", "series"):
+            rows, layout = feature_rows(games, target), LAYOUTS[target](games)
+            keys = [g["key"] for g in games if g["key"] in rows]
+            sets[target] = {"X": rows_to_matrix(rows, keys, layout["feature_list"]), "y": np.array([rows[k]["label"] for k in keys]), "keys": keys, "layout": layout}
+        return sets
+    return fingerprint, cached_result("training_matrices", (fingerprint, FEATURE_VERSION, SERIES_WINDOW_DAYS), build)
+
+def save_versioned_artifact(name, bundle):
+    """
+    Write models/<name>_predictor_<version>.joblib and its compiled NumPy export. The registry serves the newest
+    version from then on; the shipped files are left untouched. Both files appear atomically, compiled export
+    first, so a reader never picks up a half-written bundle.
+    """
+    import joblib
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    versioned = os.path.join(ARTIFACT_DIR, f"{MODEL_FILES[name][:-len('.joblib')]}_{bundle['version']}.joblib")
+    save_compiled(bundle, f"{compiled_path(versioned)}.tmp")
+    os.replace(f"{compiled_path(versioned)}.tmp", compiled_path(versioned))
+    joblib.dump(bundle, f"{versioned}.tmp")
+    os.replace(f"{versioned}.tmp", versioned)
+    return versioned
+
+def train_and_save_prediction_model(pooled_matches, n_jobs=-1):
+    """
+    Rebuild both shipped predictors from the loaded matches with multi-threaded histogram XGBoost.
+    The matrices are sparse, so absent features are missing values to the trees ('sparse_input' in the bundle).
+    Returns a summary of the saved artifacts.
+    """
+    from xgboost import XGBClassifier
+    from sklearn.preprocessing import LabelEncoder
+    fingerprint, sets = build_training_sets(pooled_matches)
+    version = f"{datetime.datetime.now(datetime.timezone.utc):%Y%m%d%H%M%S}-{fingerprint[:8]}"
+    summary = {"version": version, "data_fingerprint": fingerprint}
+
+    draft = sets["draft"]
+    if draft["X"].shape[0] and len(set(draft["y"])) == 2:
+        model = XGBClassifier(**DRAFT_PARAMS, n_jobs=n_jobs)
+        model.fit(draft["X"], draft["y"])
+        layout = draft["layout"]
+        bundle = {"model": model, **layout, "feature_to_idx": {f: i for i, f in enumerate(layout["feature_list"])}, "data_fingerprint": fingerprint, "version": version, "sparse_input": True}
+        summary["draft"] = {"games": int(draft["X"].shape[0]), "path": save_versioned_artifact("draft", bundle)}
+
+    series = sets["series"]
+    if series["X"].shape[0] and len(set(series["y"])) >= 2:
+        encoder = LabelEncoder().fit(series["y"])
+        model = XGBClassifier(**SERIES_PARAMS, num_class=len(encoder.classes_), n_jobs=n_jobs)
+        model.fit(series["X"], encoder.transform(series["y"]))
+        layout = series["layout"]
+        bundle = {"model": model, "label_encoder": encoder, "all_heroes": layout["all_heroes"], "all_teams": layout["all_teams"],
+                  "time_window_days": SERIES_WINDOW_DAYS, "data_fingerprint": fingerprint, "version": version, "sparse_input": True}
+        summary["series"] = {"games": int(series["X"].shape[0]), "path": save_versioned_artifact("series", bundle)}
+    return summary
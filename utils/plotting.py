@@ -1,9 +1,87 @@
 # beruangbatubata/mlbb-new/MLBB-new-44d3b1513eb1b302f1f96286fcccc3d4374561ec/utils/plotting.py
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
+import pandas as pd
 import base64
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from utils.tracing import traced, mark_cache
+
+# --- RENDERED FIGURE CACHE ---
+# Figures are rendered once to PNG/SVG bytes and closed immediately; reruns with the same data and
+# parameters are served from a process-wide LRU, so no matplotlib figure outlives the call that drew it.
+# matplotlib and seaborn are imported by the plot functions, so a cache hit never loads them.
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+FIGURE_CACHE_MAX_ENTRIES = 256
+MAX_RENDER_PIXELS = 6_000_000  # large figures are rendered at a lower dpi instead of producing huge PNGs
+
+@st.cache_resource(show_spinner=False)
+def _figure_cache():
+    return {"lock": threading.Lock(), "entries": OrderedDict(), "bytes": 0, "hits": 0, "misses": 0}
+
+def figure_key(plot_fn, df, fmt, args, kwargs):
+    """Hash of the plot function, the DataFrame contents and every plot parameter."""
+    h = hashlib.sha256()
+    h.update(f"{plot_fn.__module__}.{plot_fn.__qualname__}|{fmt}".encode())
+    h.update(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes)), args, kwargs], default=str, sort_keys=True).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+@traced("render")
+def render_figure(fig, fmt="png", dpi=200):
+    """Encode a figure to image bytes and close it, whatever happens while saving."""
+    try:
+        buffer = io.BytesIO()
+        width, height = fig.get_size_inches()
+        dpi = max(50, min(dpi, int(np.sqrt(MAX_RENDER_PIXELS / (width * height)))))
+        # A tight bounding box costs a second full draw; figures that set their own margins skip it
+        tight = None if getattr(fig, "fixed_margins", False) else "tight"
+        extra = {"pil_kwargs": {"compress_level": 1}} if fmt == "png" else {}
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches=tight, **extra)
+        return buffer.getvalue()
+    finally:
+        import matplotlib.pyplot as plt
+        plt.close(fig)
+
+@traced("cache")
+def cached_plot(plot_fn, df, *args, fmt="png", **kwargs):
+    """
+    Rendered image bytes for plot_fn(df, *args, **kwargs), or None when the plot function draws nothing.
+    Results are kept in an LRU bounded by FIGURE_CACHE_MAX_BYTES and FIGURE_CACHE_MAX_ENTRIES.
+    """
+    cache = _figure_cache()
+    key = figure_key(plot_fn, df, fmt, args, kwargs)
+    with cache["lock"]:
+        if key in cache["entries"]:
+            cache["entries"].move_to_end(key); cache["hits"] += 1
+            mark_cache("hit")
+            return cache["entries"][key] or None
+        cache["misses"] += 1
+    mark_cache("miss")
+    fig = plot_fn(df, *args, **kwargs)
+    image = render_figure(fig, fmt) if fig is not None else b""
+    with cache["lock"]:
+        if key not in cache["entries"]:
+            cache["entries"][key] = image; cache["bytes"] += len(image)
+        while cache["entries"] and (cache["bytes"] > FIGURE_CACHE_MAX_BYTES or len(cache["entries"]) > FIGURE_CACHE_MAX_ENTRIES):
+            _, evicted = cache["entries"].popitem(last=False); cache["bytes"] -= len(evicted)
+    return image or None
+
+def show_figure(image, fmt="png"):
+    """Display bytes from cached_plot."""
+    if not image: return
+    if fmt == "svg":
+        st.markdown(f'<img src="data:image/svg+xml;base64,{base64.b64encode(image).decode()}" style="width:100%"/>', unsafe_allow_html=True)
+    else:
+        st.image(image, use_container_width=True)
+
+def figure_cache_stats():
+    cache = _figure_cache()
+    with cache["lock"]:
+        return {"entries": len(cache["entries"]), "bytes": cache["bytes"], "hits": cache["hits"], "misses": cache["misses"]}
 
 # REMOVED: render_strictly_sticky_table - Use st.dataframe() instead.
 # REMOVED: render_paired_tables - Use st.columns() and st.dataframe() instead.
@@ -20,10 +98,13 @@ def offer_csv_download(df, filename="data.csv", label="Download CSV"):
         mime='text/csv',
     )
 
+@traced("render")
 def plot_synergy_bar(df, title, focus_hero=None):
     """
     Generates and returns a matplotlib bar chart for synergy stats.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     if df.empty:
         return None
     
@@ -57,12 +138,18 @@ def plot_synergy_bar(df, title, focus_hero=None):
     plt.subplots_adjust(left=0.26, right=0.98, bottom=0.13, top=0.93)
     return fig
 
+@traced("render")
 def plot_counter_heatmap(df, title, max_heroes=10):
     """
     Generates and returns a matplotlib heatmap for counter stats.
+    max_heroes=None draws the whole hero pool with plot_counter_heatmap_full.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     if df.empty:
         return None
+    if max_heroes is None:
+        return plot_counter_heatmap_full(df, title)
         
     mat = df.pivot(index="Ally Hero", columns="Enemy Hero", values="Win Rate (%)")
     n_rows, n_cols = mat.shape
@@ -109,3 +196,82 @@ def plot_counter_heatmap(df, title, max_heroes=10):
     
     fig.tight_layout()
     return fig
+
+def _annotate_cells(ax, rows, cols, values, fmt, size):
+    """
+    Bold cell values as two filled paths (white on strong colours, black near 50%) instead of one text artist
+    per cell: each distinct label is laid out once and its outline is copied to every cell showing it.
+    'size' is the font size in data units (cells).
+    """
+    from matplotlib.textpath import TextPath
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.path import Path
+    from matplotlib.patches import PathPatch
+    labels = np.array([fmt.format(v) for v in values], dtype=object)
+    light = (values < 47) | (values > 53)
+    prop = FontProperties(weight="bold")
+    for color, mask in (("white", light), ("black", ~light)):
+        vertices, codes = [], []
+        for label in set(labels[mask]):
+            glyph = TextPath((0, 0), label, size=size, prop=prop)
+            extents = glyph.get_extents()
+            outline = (glyph.vertices - [(extents.x0 + extents.x1) / 2, (extents.y0 + extents.y1) / 2]) * [1, -1]  # y points down
+            at = mask & (labels == label)
+            offsets = np.column_stack([cols[at], rows[at]]).astype(float)
+            vertices.append((outline[None] + offsets[:, None]).reshape(-1, 2))
+            codes.append(np.tile(glyph.codes, len(offsets)))
+        if vertices:
+            # add_artist, not add_patch: the image already fixes the limits, and refitting them walks every curve
+            ax.add_artist(PathPatch(Path(np.concatenate(vertices), np.concatenate(codes)), facecolor=color, edgecolor="none", linewidth=0))
+
+@traced("render")
+def plot_counter_heatmap_full(df, title, max_annotations=250):
+    """
+    Counter heatmap for the whole hero pool. All cells are drawn as a single image, and when there are
+    too many cells to label, only the 'max_annotations' matchups furthest from 50% get a value.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    if df.empty:
+        return None
+
+    mat = df.pivot_table(index="Ally Hero", columns="Enemy Hero", values="Win Rate (%)", aggfunc="mean")
+    mat = mat.sort_index().sort_index(axis=1)
+    n_rows, n_cols = mat.shape
+    if n_rows <= 1 or n_cols <= 1:
+        return None
+    values = mat.to_numpy(dtype=float)
+
+    # Cell size shrinks with the pool so the figure stays readable, from 0.55in down to 0.12in
+    cell = min(max(12 / max(n_rows, n_cols), 0.12), 0.55)
+    font_size = min(max(cell * 72 * 0.45, 4), 11)
+    # Margins are sized from the label font so the renderer can skip the tight-bbox pass
+    label_pt = max(len(str(h)) for h in list(mat.index) + list(mat.columns)) * font_size * 0.62
+    label_in = label_pt / 72 + 0.45
+    width, height = n_cols * cell + label_in + 1.6, n_rows * cell + label_in + 0.8
+    fig, ax = plt.subplots(figsize=(width, height))
+    fig.subplots_adjust(left=label_in / width, right=1 - 1.4 / width, bottom=label_in / height, top=1 - 0.6 / height)
+    fig.fixed_margins = True
+    cmap = sns.color_palette("crest", as_cmap=True)
+    image = ax.imshow(np.ma.masked_invalid(values), cmap=cmap, aspect="equal", interpolation="nearest")
+    fig.colorbar(image, ax=ax, label="Win Rate (%)", shrink=0.6, pad=0.01)
+
+    rows, cols = np.nonzero(np.isfinite(values))
+    if len(rows) > max_annotations:
+        keep = np.argpartition(-np.abs(values[rows, cols] - 50), max_annotations - 1)[:max_annotations]
+        rows, cols = rows[keep], cols[keep]
+    _annotate_cells(ax, rows, cols, values[rows, cols], "{:.0f}" if cell < 0.3 else "{:.1f}", font_size * 0.85 / 72 / cell)
+
+    # Hero names are plain text artists rather than ticks: a hundred-odd Tick objects per axis cost more
+    # to build and draw than the rest of the figure
+    ax.set_xticks([]); ax.set_yticks([])
+    offset = -4 / 72 / (n_rows * cell)  # 4pt gap below the bottom edge, in axes units
+    for x, hero in enumerate(mat.columns):
+        ax.text(x, offset, hero, transform=ax.get_xaxis_transform(), rotation=90, ha='center', va='top', fontsize=font_size)
+    offset = -4 / 72 / (n_cols * cell)
+    for y, hero in enumerate(mat.index):
+        ax.text(offset, y, hero, transform=ax.get_yaxis_transform(), ha='right', va='center', fontsize=font_size)
+    ax.set_title(title, fontsize=15, fontweight='bold', pad=13)
+    ax.set_xlabel("Enemy Hero", fontsize=font_size + 2, fontweight='bold', labelpad=label_pt + 8)
+    ax.set_ylabel("Ally Hero", fontsize=font_size + 2, fontweight='bold', labelpad=label_pt + 8)
+    return fig
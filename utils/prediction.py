@@ -0,0 +1,209 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+from math import comb
+from utils.data_processing import normalize_team, match_dates
+from utils.hero_index import hero_build
+from utils.simulation import get_series_outcome_options, parse_outcome_code
+from utils.model_registry import get_model, get_model_metadata
+
+def model_proba(bundle, X):
+    """predict_proba with the input layout the bundle was trained on: models fitted on sparse matrices treat zeros as missing."""
+    model = bundle["model"]
+    if bundle.get("sparse_input") and not getattr(model, "compiled", False):
+        from scipy import sparse
+        X = sparse.csr_matrix(X)
+    elif hasattr(X, "toarray"):
+        X = X.toarray()
+    return model.predict_proba(X)
+
+# --- SERIES MODEL FEATURES ---
+# series_predictor.joblib classifies one game slot of a series from team A's, team B's and the league's hero pick
+# shares (three blocks of len(all_heroes) columns, in that order). Its labels are the game score from team A's
+# side; '0-0' marks a slot without a recorded winner, such as the unplayed third game of a 2-0 Bo3.
+# model_training.series_rows writes the same layout and labels when the model is retrained.
+SERIES_BLOCKS = ("teamA", "teamB", "league")
+SERIES_GAME_LABELS = {"1": "1-0", "2": "0-1"}  # game winner -> label
+SERIES_NO_RESULT = "0-0"
+
+def check_series_bundle(bundle):
+    """The bundle's class labels, after checking its feature width and labels match this layout; raises ValueError otherwise."""
+    classes = [str(c) for c in bundle["label_encoder"].classes_]
+    expected = len(SERIES_BLOCKS) * len(bundle["all_heroes"])
+    n_features = getattr(bundle["model"], "n_features_in_", expected)
+    if n_features != expected:
+        raise ValueError(f"Series model takes {n_features} features, but {len(bundle['all_heroes'])} heroes x {len(SERIES_BLOCKS)} pick-share blocks give {expected}.")
+    known = set(SERIES_GAME_LABELS.values()) | {SERIES_NO_RESULT}
+    if not set(SERIES_GAME_LABELS.values()) <= set(classes) or not set(classes) <= known:
+        raise ValueError(f"Series model classes {classes} are not the per-game labels {sorted(known)}.")
+    return classes
+
+def collect_hero_picks(pooled_matches):
+    """Flatten raw matches into parallel arrays of pick date, team and hero."""
+    dates, teams, heroes = [], [], []
+    for match, dt in zip(pooled_matches, match_dates(pooled_matches)):
+        if pd.isnull(dt): continue
+        names = [normalize_team(opp.get("name", "")) for opp in match.get("match2opponents", [])]
+        for game in match.get("match2games", []):
+            for idx, opp in enumerate(game.get("opponents", [])[:2]):
+                if idx >= len(names): continue
+                for p in opp.get("players", []):
+                    if isinstance(p, dict) and "champion" in p:
+                        dates.append(dt.date()); teams.append(names[idx]); heroes.append(p["champion"])
+    return {"date": np.array(dates, dtype="datetime64[D]"), "team": np.array(teams, dtype=object), "hero": np.array(heroes, dtype=object)}
+
+def build_series_features(picks, matchups, all_heroes, window_days):
+    """
+    One feature row per (teamA, teamB, date): team A's and team B's hero pick shares and the
+    league-wide pick shares over the 'window_days' before the match, in the model's hero order.
+    """
+    hero_idx = {h: i for i, h in enumerate(all_heroes)}
+    pick_hero = np.array([hero_idx.get(h, -1) for h in picks["hero"]], dtype=np.int32)
+    known = pick_hero >= 0
+    n_heroes = len(all_heroes)
+    X = np.zeros((len(matchups), 3 * n_heroes), dtype=np.float32)
+    for row, (a, b, dt) in enumerate(matchups):
+        end = np.datetime64(dt, "D")
+        in_window = known & (picks["date"] < end) & (picks["date"] >= end - np.timedelta64(window_days, "D"))
+        for block, mask in enumerate((in_window & (picks["team"] == a), in_window & (picks["team"] == b), in_window)):
+            counts = np.bincount(pick_hero[mask], minlength=n_heroes)
+            if counts.sum(): X[row, block * n_heroes:(block + 1) * n_heroes] = counts / counts.sum()
+    return X
+
+def series_outcome_probs(p_game, codes):
+    """Probability of each series outcome code when team A wins each game with probability p_game."""
+    probs = []
+    for code in codes:
+        side, w, l = parse_outcome_code(code)
+        if side is None:
+            probs.append(2 * p_game * (1 - p_game))  # Bo2 split 1-1
+        else:
+            p = p_game if side == "A" else 1 - p_game
+            # The winner takes the last game, the other l games can fall anywhere before it
+            probs.append(comb(w - 1 + l, l) * p ** w * (1 - p) ** l)
+    probs = np.array(probs)
+    return tuple(probs / probs.sum()) if probs.sum() > 0 else tuple(np.full(len(codes), 1 / len(codes)))
+
+def predict_series_outcome_probs(pooled_matches, unplayed_matches):
+    """
+    Outcome probability vectors for every unplayed (teamA, teamB, date, bestof) match, aligned with
+    get_series_outcome_options, from a single batched call to the shipped series model.
+    Team A's chance of winning a game is its share of the probability that the game is played at all.
+    """
+    if not unplayed_matches: return {}
+    bundle = get_model("series")
+    classes = check_series_bundle(bundle)
+    X = build_series_features(collect_hero_picks(pooled_matches), [(a, b, dt) for a, b, dt, _ in unplayed_matches], bundle["all_heroes"], bundle["time_window_days"])
+    proba = model_proba(bundle, X)
+    proba = proba / np.maximum(proba.sum(axis=1, keepdims=True), 1e-12)
+    a_share, b_share = proba[:, classes.index(SERIES_GAME_LABELS["1"])], proba[:, classes.index(SERIES_GAME_LABELS["2"])]
+    played = 1 - (proba[:, classes.index(SERIES_NO_RESULT)] if SERIES_NO_RESULT in classes else 0)
+    p_game = np.where(played > 1e-9, a_share / np.maximum(played, 1e-12), 0.5)
+    result = {}
+    for (a, b, dt, bo), p in zip(unplayed_matches, p_game):
+        codes = [c for _, c in get_series_outcome_options(a, b, bo) if c != "random"]
+        if codes: result[(a, b, dt)] = series_outcome_probs(float(p), codes)
+    return result
+
+# --- DRAFT MODEL ---
+# draft_predictor.joblib scores a finished draft from the blue side's point of view (class 1 = blue win).
+# Its features are signed one-hots (+1 blue, -1 red) for every hero/role pick, every ban and both teams,
+# followed by per-side counts of each hero tag.
+def hero_role_lookup(hero, role=None):
+    """HERO_PROFILES build for a hero, preferring the one played in 'role'."""
+    return hero_build(hero, role)
+
+@st.cache_resource(show_spinner=False)
+def draft_encoder_tables(artifact_sha256):
+    """Column lookups for the draft model's feature layout, built once per model artifact."""
+    bundle = get_model("draft")
+    f2i, heroes, roles, tags = bundle["feature_to_idx"], bundle["all_heroes"], bundle["roles"], bundle["all_tags"]
+    hero_role_col = np.array([[f2i.get(f"{h}_{r}", -1) for r in roles] for h in heroes], dtype=np.int32)
+    ban_col = np.array([f2i.get(f"{h}_Ban", -1) for h in heroes], dtype=np.int32)
+    tag_idx = {t: i for i, t in enumerate(tags)}
+    tag_matrix = np.zeros((len(heroes), len(roles), len(tags)), dtype=np.float32)
+    for i, h in enumerate(heroes):
+        for j, r in enumerate(roles):
+            build = hero_role_lookup(h, r)
+            for t in (build or {}).get("tags", []):
+                if t in tag_idx: tag_matrix[i, j, tag_idx[t]] = 1
+    used = set(hero_role_col.ravel()) | set(ban_col) | {f2i[f"{side}_{t}_count"] for side in ("blue", "red") for t in tags}
+    return {
+        "n_features": len(bundle["feature_list"]),
+        "hero_idx": {h: i for i, h in enumerate(heroes)}, "role_idx": {r: i for i, r in enumerate(roles)},
+        "hero_role_col": hero_role_col, "ban_col": ban_col, "tag_matrix": tag_matrix,
+        "team_col": {f: i for f, i in f2i.items() if i not in used},
+        "blue_tag_col": np.array([f2i[f"blue_{t}_count"] for t in tags]), "red_tag_col": np.array([f2i[f"red_{t}_count"] for t in tags]),
+        "default_role": np.array([roles.index(b["primary_role"]) if (b := hero_role_lookup(h)) and b["primary_role"] in roles else 0 for h in heroes], dtype=np.int32),
+    }
+
+def draft_tables():
+    return draft_encoder_tables(get_model_metadata("draft")["artifact_sha256"])
+
+def draft_index_arrays(drafts, tables, n_picks=5, n_bans=5):
+    """
+    Turn draft dicts into padded index arrays (-1 = empty). A draft has 'blue'/'red' pick lists
+    (hero names or (hero, role) pairs), optional 'blue_bans'/'red_bans' and 'blue_team'/'red_team'.
+    Picks without a role use the hero's primary role.
+    """
+    hero_idx, role_idx = tables["hero_idx"], tables["role_idx"]
+    arrays = {k: np.full((len(drafts), n), -1, dtype=np.int32) for k, n in (("blue", n_picks), ("red", n_picks), ("blue_role", n_picks), ("red_role", n_picks), ("blue_bans", n_bans), ("red_bans", n_bans))}
+    arrays["blue_team"] = np.full(len(drafts), -1, dtype=np.int32); arrays["red_team"] = np.full(len(drafts), -1, dtype=np.int32)
+    for row, draft in enumerate(drafts):
+        for side in ("blue", "red"):
+            for k, pick in enumerate(draft.get(side, [])[:n_picks]):
+                hero, role = pick if isinstance(pick, (tuple, list)) else (pick, None)
+                if hero in hero_idx:
+                    arrays[side][row, k] = hero_idx[hero]
+                    arrays[f"{side}_role"][row, k] = role_idx.get(role, tables["default_role"][hero_idx[hero]])
+            for k, hero in enumerate(draft.get(f"{side}_bans", [])[:n_bans]):
+                arrays[f"{side}_bans"][row, k] = hero_idx.get(hero, -1)
+            arrays[f"{side}_team"][row] = tables["team_col"].get(draft.get(f"{side}_team"), -1)
+    return arrays
+
+def encode_drafts(arrays, tables):
+    """Vectorised encoder: padded index arrays -> dense feature matrix in the draft model's column order."""
+    n = arrays["blue"].shape[0]
+    X = np.zeros((n, tables["n_features"]), dtype=np.float32)
+    for side, sign in (("blue", 1.0), ("red", -1.0)):
+        heroes, roles = arrays[side], arrays[f"{side}_role"]
+        valid = heroes >= 0
+        cols = tables["hero_role_col"][np.where(valid, heroes, 0), np.where(roles >= 0, roles, 0)]
+        rows = np.broadcast_to(np.arange(n)[:, None], heroes.shape)
+        keep = valid & (cols >= 0)
+        np.add.at(X, (rows[keep], cols[keep]), sign)
+        tag_counts = (tables["tag_matrix"][np.where(valid, heroes, 0), np.where(roles >= 0, roles, 0)] * valid[..., None]).sum(axis=1)
+        X[:, tables[f"{side}_tag_col"]] = tag_counts
+        bans = arrays[f"{side}_bans"]
+        ban_cols = tables["ban_col"][np.where(bans >= 0, bans, 0)]
+        keep = (bans >= 0) & (ban_cols >= 0)
+        np.add.at(X, (np.broadcast_to(np.arange(n)[:, None], bans.shape)[keep], ban_cols[keep]), sign)
+        team = arrays[f"{side}_team"]
+        X[np.flatnonzero(team >= 0), team[team >= 0]] += sign
+    return X
+
+def score_drafts(drafts):
+    """Blue-side win probability for many drafts with a single predict call."""
+    if not drafts: return np.array([])
+    tables = draft_tables()
+    X = encode_drafts(draft_index_arrays(drafts, tables), tables)
+    return model_proba(get_model("draft"), X)[:, 1]
+
+def historical_drafts(pooled_matches):
+    """One draft dict per played game with known sides, plus whether blue won."""
+    drafts, blue_won = [], []
+    for match in pooled_matches:
+        names = [normalize_team(opp.get("name", "")) for opp in match.get("match2opponents", [])]
+        for game in match.get("match2games", []):
+            opps, extradata = game.get("opponents", []), game.get("extradata") or {}
+            sides = [str(extradata.get("team1side", "")).lower(), str(extradata.get("team2side", "")).lower()]
+            winner = str(game.get("winner", ""))
+            if len(opps) < 2 or sorted(sides) != ["blue", "red"] or winner not in ("1", "2"): continue
+            blue = sides.index("blue")
+            draft = {}
+            for idx, side in ((blue, "blue"), (1 - blue, "red")):
+                draft[side] = [p["champion"] for p in opps[idx].get("players", []) if isinstance(p, dict) and "champion" in p]
+                draft[f"{side}_bans"] = [extradata[f"team{idx+1}ban{i}"] for i in range(1, 6) if extradata.get(f"team{idx+1}ban{i}")]
+                draft[f"{side}_team"] = names[idx] if idx < len(names) else ""
+            drafts.append(draft); blue_won.append(winner == str(blue + 1))
+    return drafts, np.array(blue_won, dtype=bool)
@@ -0,0 +1,130 @@
+import streamlit as st
+import datetime
+import numpy as np
+import pandas as pd
+from math import comb
+from utils.result_store import load_rating_state, save_rating_changes
+
+# --- RATING SYSTEM ---
+# Game-based Elo: a series moves both teams by K * (games won - games expected), so a 2-0 counts more than a 2-1.
+# Teams that have not played for 'gap_days' are pulled 'regress' of the way back to the initial rating first,
+# which handles roster changes between seasons.
+RATING_PARAMS = {"initial": 1500.0, "k": 24.0, "scale": 400.0, "gap_days": 60, "regress": 0.25}
+
+def match_key(m):
+    return m.get("match_id") or f"{m['date']}|{m['teamA']}|{m['teamB']}|{m.get('pagename', '')}"
+
+def is_finished(m):
+    return (m.get("scoreA", 0) or 0) + (m.get("scoreB", 0) or 0) > 0
+
+def new_rating_state(params=None):
+    return {"params": dict(params or RATING_PARAMS), "ratings": {}, "games": {}, "last_played": {}, "seen": set(), "last_date": None, "history": []}
+
+def _load_state(name, params):
+    stored = load_rating_state(name)
+    if stored is None: return None
+    header, teams, seen, history = stored
+    if header.get("params") != params: return None
+    state = new_rating_state(params)
+    for team, rating, games, last_played in teams:
+        state["ratings"][team], state["games"][team], state["last_played"][team] = rating, games, last_played
+    state["seen"], state["history"], state["last_date"] = set(seen), history, header.get("last_date")
+    return state
+
+def game_win_probability(rating_a, rating_b, scale=400.0):
+    """Elo expectation that A wins a single game."""
+    return 1 / (1 + 10 ** (-(rating_a - rating_b) / scale))
+
+def series_win_probability(p_game, bestof):
+    """P(A wins the series) from a per-game probability; an even best-of split counts as half a win."""
+    n = int(bestof)
+    probs = [comb(n, k) * p_game ** k * (1 - p_game) ** (n - k) for k in range(n + 1)]
+    return sum(p for k, p in enumerate(probs) if 2 * k > n) + 0.5 * sum(p for k, p in enumerate(probs) if 2 * k == n)
+
+def _current_rating(state, team, date):
+    params = state["params"]
+    rating = state["ratings"].get(team, params["initial"])
+    last = state["last_played"].get(team)
+    if last and (date - datetime.date.fromisoformat(last)).days > params["gap_days"]:
+        rating += params["regress"] * (params["initial"] - rating)
+    return rating
+
+def apply_match(state, m):
+    """Update the state with one finished match; O(1)."""
+    params, date = state["params"], m["date"]
+    a, b = m["teamA"], m["teamB"]
+    ra, rb = _current_rating(state, a, date), _current_rating(state, b, date)
+    games = m["scoreA"] + m["scoreB"]
+    delta = params["k"] * (m["scoreA"] - games * game_win_probability(ra, rb, params["scale"]))
+    state["ratings"][a], state["ratings"][b] = ra + delta, rb - delta
+    for team in (a, b):
+        state["games"][team] = state["games"].get(team, 0) + games
+        state["last_played"][team] = date.isoformat()
+    state["history"].append([date.isoformat(), a, round(ra + delta, 2)])
+    state["history"].append([date.isoformat(), b, round(rb - delta, 2)])
+    state["seen"].add(match_key(m))
+    state["last_date"] = date.isoformat()
+
+def update_ratings(parsed_matches, name="all", params=None):
+    """
+    Bring the stored rating state up to date with the date-sorted parse_matches output, applying only
+    matches it has not seen. A match dated before the last applied one triggers a full rebuild.
+    Only the teams the new matches moved, their match keys and the new history points are written back.
+    """
+    params = dict(params or RATING_PARAMS)
+    state = _load_state(name, params)
+    reset = state is None
+    if reset: state = new_rating_state(params)
+    new = [m for m in parsed_matches if is_finished(m) and match_key(m) not in state["seen"]]
+    if not new: return state
+    if state["last_date"] and min(m["date"] for m in new) < datetime.date.fromisoformat(state["last_date"]):
+        state, reset = new_rating_state(params), True
+        new = [m for m in parsed_matches if is_finished(m)]
+    first_seq = len(state["history"])
+    for m in sorted(new, key=lambda m: m["date"]): apply_match(state, m)
+    moved = {team for m in new for team in (m["teamA"], m["teamB"])}
+    save_rating_changes(name, {"params": params, "last_date": state["last_date"]},
+                        [(t, state["ratings"][t], state["games"][t], state["last_played"][t]) for t in moved],
+                        [match_key(m) for m in new], state["history"][first_seq:], first_seq, reset)
+    return state
+
+@st.cache_data(show_spinner="Updating team ratings...")
+def cached_ratings(_parsed_matches, tournament_names, fingerprint):
+    """Ratings kept per tournament selection; the dataset 'fingerprint' stands in for the unhashed matches in the cache key."""
+    return update_ratings(_parsed_matches, name=" | ".join(sorted(tournament_names)))
+
+# --- VIEWS ---
+def rating_table(state):
+    teams = sorted(state["ratings"], key=lambda t: -state["ratings"][t])
+    return pd.DataFrame({
+        "Rank": np.arange(1, len(teams) + 1), "Team": teams,
+        "Rating": [round(state["ratings"][t], 1) for t in teams],
+        "Games": [state["games"][t] for t in teams], "Last Played": [state["last_played"][t] for t in teams],
+    })
+
+def rating_history(state, teams=None):
+    """Long DataFrame of (Date, Team, Rating) after every match."""
+    history = pd.DataFrame(state["history"], columns=["Date", "Team", "Rating"])
+    history["Date"] = pd.to_datetime(history["Date"])
+    return history[history["Team"].isin(teams)] if teams is not None else history
+
+def series_win_prob_matrix(state, teams, bestof=5):
+    """(T, T) matrix of P(row team beats column team) in a best-of series, for simulate_playoffs."""
+    params = state["params"]
+    r = np.array([state["ratings"].get(t, params["initial"]) for t in teams])
+    p_game = 1 / (1 + 10 ** (-(r[:, None] - r[None, :]) / params["scale"]))
+    n = int(bestof)
+    k = np.arange(n + 1)
+    weights = np.array([comb(n, int(i)) for i in k]) * ((2 * k > n) + 0.5 * (2 * k == n))
+    return (weights * p_game[..., None] ** k * (1 - p_game[..., None]) ** (n - k)).sum(axis=-1)
+
+def rating_outcome_probs(state, unplayed_matches):
+    """Outcome probability vectors for (teamA, teamB, date, bestof) matches, in the format simulate_season_batch takes."""
+    from utils.simulation import get_series_outcome_options
+    from utils.prediction import series_outcome_probs
+    params, result = state["params"], {}
+    for a, b, dt, bo in unplayed_matches:
+        p = game_win_probability(state["ratings"].get(a, params["initial"]), state["ratings"].get(b, params["initial"]), params["scale"])
+        codes = [c for _, c in get_series_outcome_options(a, b, bo) if c != "random"]
+        if codes: result[(a, b, dt)] = series_outcome_probs(p, codes)
+    return result
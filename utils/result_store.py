@@ -0,0 +1,210 @@
+import sqlite3
+import hashlib
+import pickle
+import zlib
+import json
+import time
+import os
+import datetime
+import logging
+import threading
+from utils.tracing import span, mark_cache
+
+logger = logging.getLogger(__name__)
+
+# --- STORE LOCATION AND LIMITS ---
+# One SQLite file holds tournament configs and computed results, so they survive restarts
+# and are shared by every session and worker process on the machine.
+STORE_PATH = os.environ.get("MLBB_STORE_PATH", ".mlbb_store.sqlite")
+MAX_RESULT_BYTES = int(os.environ.get("MLBB_STORE_MAX_MB", "256")) * 1024 * 1024
+
+# Bump when a stored result format or the engine that produces it changes, so old entries stop matching.
+RESULT_VERSION = 1
+
+# One connection per thread, opened on first use; the schema is created once per process and store file.
+# A connection is never used across a fork: a child process opens its own and leaves the inherited one alone.
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+_inherited = []
+
+def _connect():
+    owner = (os.getpid(), STORE_PATH)
+    if getattr(_local, "owner", None) != owner:
+        previous = getattr(_local, "conn", None)
+        if previous is not None:
+            if _local.owner[0] == owner[0]: previous.close()
+            else: _inherited.append(previous)  # closing it here could release the parent's locks
+        conn = sqlite3.connect(STORE_PATH, timeout=30)
+        with _schema_lock:
+            if owner not in _schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""CREATE TABLE IF NOT EXISTS configs (
+                    kind TEXT, tournament TEXT, value TEXT, updated_at REAL, PRIMARY KEY (kind, tournament))""")
+                conn.execute("""CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY, kind TEXT, payload BLOB, size INTEGER, created_at REAL, last_used REAL)""")
+                conn.execute("""CREATE TABLE IF NOT EXISTS feature_rows (
+                    kind TEXT, game TEXT, tag TEXT, row BLOB, PRIMARY KEY (kind, game))""")
+                conn.execute("""CREATE TABLE IF NOT EXISTS rating_teams (
+                    state TEXT, team TEXT, rating REAL, games INTEGER, last_played TEXT, PRIMARY KEY (state, team))""")
+                conn.execute("""CREATE TABLE IF NOT EXISTS rating_seen (
+                    state TEXT, match_key TEXT, PRIMARY KEY (state, match_key))""")
+                conn.execute("""CREATE TABLE IF NOT EXISTS rating_history (
+                    state TEXT, seq INTEGER, date TEXT, team TEXT, rating REAL, PRIMARY KEY (state, seq))""")
+                conn.commit()
+                _schema_ready.add(owner)
+        _local.conn, _local.owner = conn, owner
+    return _local.conn
+
+# --- CANONICAL SCENARIO KEYS ---
+def _canonical(obj):
+    """Reduce nested inputs to plain JSON types with a stable order."""
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(obj, (set, frozenset)):
+        return sorted((_canonical(v) for v in obj), key=lambda v: json.dumps(v, sort_keys=True))
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    if hasattr(obj, "item"):  # NumPy scalars
+        return obj.item()
+    return obj
+
+def scenario_key(kind, *parts):
+    """Hash of the inputs that fully determine a result, e.g. standings, unplayed matches, forced outcomes and sim size."""
+    blob = json.dumps([kind, RESULT_VERSION, _canonical(parts)], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+# --- RESULTS ---
+def load_result(key):
+    """Return a stored result, or None if it was never computed or has been evicted."""
+    try:
+        with _connect() as conn:
+            row = conn.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None: return None
+            conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(zlib.decompress(row[0]))
+    except Exception as e:
+        logger.warning("Result store read failed: %s", e)
+        return None
+
+def save_result(key, kind, value):
+    """Store a result and evict least recently used entries beyond MAX_RESULT_BYTES."""
+    try:
+        payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 3)
+        now = time.time()
+        with _connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", (key, kind, payload, len(payload), now, now))
+            _evict(conn)
+        return True
+    except Exception as e:
+        logger.warning("Result store write failed: %s", e)
+        return False
+
+def _evict(conn):
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+    if total <= MAX_RESULT_BYTES: return
+    for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used ASC").fetchall():
+        if total <= MAX_RESULT_BYTES: break
+        conn.execute("DELETE FROM results WHERE key = ?", (key,)); total -= size
+
+def cached_result(kind, key_parts, compute):
+    """Serve a result from disk if this exact scenario was computed before, otherwise compute and store it."""
+    with span(f"result_store.{kind}", "cache"):
+        key = scenario_key(kind, *key_parts)
+        value = load_result(key)
+        mark_cache("hit" if value is not None else "miss")
+        if value is None:
+            value = compute()
+            save_result(key, kind, value)
+        return value
+
+def store_stats():
+    """Entry count and stored bytes per result kind."""
+    with _connect() as conn:
+        return conn.execute("SELECT kind, COUNT(*), SUM(size) FROM results GROUP BY kind").fetchall()
+
+# --- TOURNAMENT CONFIGS ---
+def load_config(kind, tournament_name):
+    """Load a config ('brackets', 'format', 'groups', ...) for a tournament, or None."""
+    try:
+        with _connect() as conn:
+            row = conn.execute("SELECT value FROM configs WHERE kind = ? AND tournament = ?", (kind, tournament_name)).fetchone()
+        return json.loads(row[0]) if row else None
+    except Exception:
+        return None
+
+def save_config(kind, tournament_name, value):
+    try:
+        with _connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO configs VALUES (?, ?, ?, ?)", (kind, tournament_name, json.dumps(value), time.time()))
+        return True
+    except Exception:
+        return False
+
+# --- FEATURE ROWS ---
+# Encoded training rows, one per game and feature kind, outside the size-bounded results table: a retrain reads
+# the rows of the games it trains on and writes only the ones it had to encode.
+def load_feature_rows(kind, keys):
+    """{game key: (tag, row)} for the stored rows among 'keys'."""
+    keys, found = list(keys), {}
+    try:
+        with _connect() as conn:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                query = f"SELECT game, tag, row FROM feature_rows WHERE kind = ? AND game IN ({','.join('?' * len(chunk))})"
+                for game, tag, row in conn.execute(query, (kind, *chunk)):
+                    found[game] = (tag, pickle.loads(row))
+        return found
+    except Exception as e:
+        logger.warning("Feature row read failed: %s", e)
+        return {}
+
+def save_feature_rows(kind, rows):
+    """Store (game key, tag, row) triples, replacing earlier rows of the same games."""
+    try:
+        with _connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO feature_rows VALUES (?, ?, ?, ?)",
+                             [(kind, game, tag, pickle.dumps(row, protocol=pickle.HIGHEST_PROTOCOL)) for game, tag, row in rows])
+        return True
+    except Exception as e:
+        logger.warning("Feature row write failed: %s", e)
+        return False
+
+# --- RATING STATES ---
+# A rating state is a small header in configs ('ratings', name) plus one row per team, applied match and history
+# point, so an update writes only the teams it moved and the matches it added.
+def load_rating_state(name):
+    """(header, team rows, seen match keys, history rows) of a stored rating state, or None."""
+    try:
+        with _connect() as conn:
+            row = conn.execute("SELECT value FROM configs WHERE kind = 'ratings' AND tournament = ?", (name,)).fetchone()
+            if row is None: return None
+            teams = conn.execute("SELECT team, rating, games, last_played FROM rating_teams WHERE state = ?", (name,)).fetchall()
+            seen = [r[0] for r in conn.execute("SELECT match_key FROM rating_seen WHERE state = ?", (name,))]
+            history = [list(r) for r in conn.execute("SELECT date, team, rating FROM rating_history WHERE state = ? ORDER BY seq", (name,))]
+        return json.loads(row[0]), teams, seen, history
+    except Exception as e:
+        logger.warning("Rating state read failed: %s", e)
+        return None
+
+def save_rating_changes(name, header, teams, seen, history, first_seq, reset=False):
+    """
+    Write the changed part of a rating state in one transaction: upsert 'teams' rows, add 'seen' match keys and
+    the 'history' rows numbered from 'first_seq'. 'reset' drops the stored rows first (a full rebuild).
+    """
+    try:
+        with _connect() as conn:
+            if reset:
+                for table in ("rating_teams", "rating_seen", "rating_history"):
+                    conn.execute(f"DELETE FROM {table} WHERE state = ?", (name,))
+            conn.executemany("INSERT OR REPLACE INTO rating_teams VALUES (?, ?, ?, ?, ?)", [(name, *t) for t in teams])
+            conn.executemany("INSERT OR IGNORE INTO rating_seen VALUES (?, ?)", [(name, k) for k in seen])
+            conn.executemany("INSERT OR REPLACE INTO rating_history VALUES (?, ?, ?, ?, ?)",
+                             [(name, first_seq + i, *h) for i, h in enumerate(history)])
+            conn.execute("INSERT OR REPLACE INTO configs VALUES (?, ?, ?, ?)", ("ratings", name, json.dumps(header), time.time()))
+        return True
+    except Exception as e:
+        logger.warning("Rating state write failed: %s", e)
+        return False
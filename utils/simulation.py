@@ -1,103 +1,97 @@
 import pandas as pd
-import random
+import numpy as np
 import json
 import os
 from collections import defaultdict
+from utils.result_store import load_config, save_config, cached_result, scenario_key, load_result, save_result
+from utils.tracing import traced
 
 # --- BRACKET CONFIGURATION FUNCTIONS ---
-def get_bracket_cache_key(tournament_name):
-    """Generate a unique filename for a tournament's bracket config."""
-    return f".playoff_config_{tournament_name.replace(' ', '_')}.json"
-
-def load_bracket_config(tournament_name):
-    """Load a saved bracket configuration from a local JSON file."""
-    cache_file = get_bracket_cache_key(tournament_name)
+# Configs live in the result store; the old per-tournament dotfiles are still read once and migrated.
+def load_legacy_config(cache_file):
+    """Read a pre-store JSON dotfile, or None."""
     if os.path.exists(cache_file):
         try:
             with open(cache_file, 'r') as f:
                 return json.load(f)
         except Exception:
             pass
+    return None
+
+def load_stored_config(kind, tournament_name, legacy_file):
+    config = load_config(kind, tournament_name)
+    if config is None:
+        config = load_legacy_config(legacy_file)
+        if config is not None: save_config(kind, tournament_name, config)
+    return config
+
+def get_bracket_cache_key(tournament_name):
+    """Generate the legacy filename for a tournament's bracket config."""
+    return f".playoff_config_{tournament_name.replace(' ', '_')}.json"
+
+DEFAULT_BRACKETS = [
+    {"start": 1, "end": 2, "name": "Top 2 Seed"},
+    {"start": 3, "end": 6, "name": "Playoff (3-6)"},
+    {"start": 7, "end": None, "name": "Unqualified"}
+]
+
+def load_bracket_config(tournament_name):
+    """Load a saved bracket configuration."""
+    config = load_stored_config("brackets", tournament_name, get_bracket_cache_key(tournament_name))
+    if config: return config
     # Return a default configuration if none is found
-    return {
-        "brackets": [
-            {"start": 1, "end": 2, "name": "Top 2 Seed"},
-            {"start": 3, "end": 6, "name": "Playoff (3-6)"},
-            {"start": 7, "end": None, "name": "Unqualified"}
-        ]
-    }
+    return {"brackets": [dict(b) for b in DEFAULT_BRACKETS]}
 
 def save_bracket_config(tournament_name, config):
-    """Save a bracket configuration to a local JSON file."""
-    cache_file = get_bracket_cache_key(tournament_name)
-    try:
-        with open(cache_file, 'w') as f:
-            json.dump(config, f)
-        return True
-    except Exception:
-        return False
+    """Save a bracket configuration."""
+    return save_config("brackets", tournament_name, config)
 
 # --- TOURNAMENT FORMAT CONFIGURATION FUNCTIONS ---
 def get_format_cache_key(tournament_name):
-    """Generate a unique filename for a tournament's format choice."""
+    """Generate the legacy filename for a tournament's format choice."""
     return f".tournament_format_{tournament_name.replace(' ', '_')}.json"
 
 def load_tournament_format(tournament_name):
-    """Load a saved format choice from a local JSON file."""
-    cache_file = get_format_cache_key(tournament_name)
-    if os.path.exists(cache_file):
-        try:
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-                return data.get("format")
-        except Exception:
-            pass
-    return None
+    """Load a saved format choice."""
+    data = load_stored_config("format", tournament_name, get_format_cache_key(tournament_name))
+    return data.get("format") if isinstance(data, dict) else None
 
 def save_tournament_format(tournament_name, format_choice):
-    """Save a format choice to a local JSON file."""
-    cache_file = get_format_cache_key(tournament_name)
-    try:
-        with open(cache_file, 'w') as f:
-            json.dump({"format": format_choice}, f)
-        return True
-    except Exception:
-        return False
+    """Save a format choice."""
+    return save_config("format", tournament_name, {"format": format_choice})
 
-# --- GROUP CONFIGURATION FUNCTIONS (The Missing Piece) ---
+# --- GROUP CONFIGURATION FUNCTIONS ---
 def get_group_cache_key(tournament_name):
-    """Generate a unique filename for a tournament's group config."""
+    """Generate the legacy filename for a tournament's group config."""
     return f".group_config_{tournament_name.replace(' ', '_')}.json"
 
 def load_group_config(tournament_name):
-    """Load a saved group configuration from a local JSON file."""
-    cache_file = get_group_cache_key(tournament_name)
-    if os.path.exists(cache_file):
-        try:
-            with open(cache_file, 'r') as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return None
+    """Load a saved group configuration."""
+    return load_stored_config("groups", tournament_name, get_group_cache_key(tournament_name))
 
 def save_group_config(tournament_name, config):
-    """Save a group configuration to a local JSON file."""
-    cache_file = get_group_cache_key(tournament_name)
-    try:
-        with open(cache_file, 'w') as f:
-            json.dump(config, f)
-        return True
-    except Exception:
-        return False
+    """Save a group configuration."""
+    return save_config("groups", tournament_name, config)
 
 # --- HELPER FUNCTIONS ---
 def get_series_outcome_options(teamA, teamB, bo: int):
     opts = [("Random", "random")]
     if bo == 3:
         opts += [(f"{teamA} 2–0", "A20"), (f"{teamA} 2–1", "A21"), (f"{teamB} 2–1", "B21"), (f"{teamB} 2–0", "B20")]
-    # Add other bo formats if necessary
+    elif bo == 2:
+        opts += [(f"{teamA} 2–0", "A20"), ("Draw 1–1", "DRAW"), (f"{teamB} 2–0", "B20")]
+    elif bo % 2 == 1:
+        need = bo // 2 + 1
+        opts += [(f"{teamA} {need}–{l}", f"A{need}{l}") for l in range(need)]
+        opts += [(f"{teamB} {need}–{l}", f"B{need}{l}") for l in reversed(range(need))]
     return opts
 
+def parse_outcome_code(code):
+    """Split an outcome code like 'A21' into (winner side, winner games, loser games)."""
+    if code == "DRAW": return None, 0, 0
+    num = code[1:]; w, l = (int(num[0]), int(num[1])) if len(num) == 2 else (int(num), 0)
+    return code[0], w, l
+
 def build_standings_table(teams, played_matches):
     stats = {team: {'match_wins': 0, 'match_count': 0, 'game_wins': 0, 'game_losses': 0} for team in teams}
     for m in played_matches:
@@ -125,78 +119,625 @@ def build_week_blocks(dates):
         else: blocks.append([curr])
     return blocks
 
+
 # --- SIMULATION ENGINES ---
-def run_monte_carlo_simulation(teams, current_wins, current_diff, unplayed_matches, forced_outcomes, brackets, n_sim):
-    finish_counter = {t: {b["name"]: 0 for b in brackets} for t in teams}
-    for _ in range(n_sim):
-        sim_wins = defaultdict(int, current_wins); sim_diff = defaultdict(int, current_diff)
-        for a, b, dt, bo in unplayed_matches:
-            code = forced_outcomes.get((a, b, dt), "random")
-            outcome = random.choice([c for _, c in get_series_outcome_options(a, b, bo) if c != "random"]) if code == "random" else code
-            if outcome == "DRAW": continue
-            winner, loser = (a, b) if outcome.startswith("A") else (b, a)
-            num = outcome[1:]; w, l = (int(num[0]), int(num[1])) if len(num) == 2 else (int(num), 0)
-            sim_wins[winner] += 1; sim_diff[winner] += w - l; sim_diff[loser] += l - w
-        ranked = sorted(teams, key=lambda t: (sim_wins[t], sim_diff[t], random.random()), reverse=True)
-        for pos, t in enumerate(ranked):
-            rank = pos + 1
-            for bracket in brackets:
-                start, end = bracket["start"], bracket.get("end") or len(teams)
-                if start <= rank <= end: finish_counter[t][bracket["name"]] += 1; break
+@traced("simulation")
+def simulate_season_batch(teams, current_wins, current_diff, unplayed_matches, forced_outcomes, n_sim, groups=None, seed=None, played_results=(), tiebreakers=(), outcome_probs=None):
+    """
+    Samples every unplayed series for all simulations at once and ranks the final tables.
+    Returns a dict of NumPy arrays (one row per simulation) that the summary functions work from:
+    'outcomes' holds the index of the sampled result for each match in 'outcome_codes'.
+    'played_results' are (teamA, teamB, winner, scoreA, scoreB) tuples, only needed for head-to-head tiebreakers.
+    'outcome_probs' optionally maps (teamA, teamB, date) to probabilities aligned with get_series_outcome_options;
+    matches without an entry are sampled uniformly.
+    """
+    rng = np.random.default_rng(seed)
+    team_idx = {t: i for i, t in enumerate(teams)}
+    wins = np.zeros((n_sim, len(teams)), dtype=np.int32)
+    diff = np.zeros((n_sim, len(teams)), dtype=np.int32)
+    for t, i in team_idx.items():
+        wins[:, i] = current_wins.get(t, 0); diff[:, i] = current_diff.get(t, 0)
+    h2h = build_head_to_head(team_idx, played_results) if tiebreakers else None
+
+    outcome_codes, outcome_labels = [], []
+    outcomes = np.zeros((n_sim, len(unplayed_matches)), dtype=np.int16)
+    for j, (a, b, dt, bo) in enumerate(unplayed_matches):
+        options = [(label, c) for label, c in get_series_outcome_options(a, b, bo) if c != "random"]
+        codes = [c for _, c in options]
+        forced = forced_outcomes.get((a, b, dt), "random")
+        if forced != "random" and forced not in codes:
+            options.append((forced, forced)); codes.append(forced)
+        outcome_codes.append(codes); outcome_labels.append([label for label, _ in options])
+        if not codes: continue
+        probs = (outcome_probs or {}).get((a, b, dt))
+        if forced != "random":
+            outcomes[:, j] = codes.index(forced)
+        elif probs is not None and len(probs) == len(codes):
+            cdf = np.cumsum(probs); outcomes[:, j] = np.minimum(np.searchsorted(cdf / cdf[-1], rng.random(n_sim), side="right"), len(codes) - 1)
+        else:
+            outcomes[:, j] = rng.integers(len(codes), size=n_sim)
+        if a not in team_idx or b not in team_idx: continue
+        # Per-option deltas from team A's point of view, gathered by the sampled index
+        a_win, b_win, a_diff = np.zeros(len(codes), dtype=np.int32), np.zeros(len(codes), dtype=np.int32), np.zeros(len(codes), dtype=np.int32)
+        for k, c in enumerate(codes):
+            side, w, l = parse_outcome_code(c)
+            if side == "A": a_win[k], a_diff[k] = 1, w - l
+            elif side == "B": b_win[k], a_diff[k] = 1, l - w
+        picked = outcomes[:, j]
+        ia, ib = team_idx[a], team_idx[b]
+        wins[:, ia] += a_win[picked]; wins[:, ib] += b_win[picked]
+        diff[:, ia] += a_diff[picked]; diff[:, ib] -= a_diff[picked]
+        if h2h is not None: h2h["series"].append((j, ia, ib, a_win, b_win, a_diff))
+
+    if groups:
+        table_of = {t: g for g, g_teams in groups.items() for t in g_teams}
+        tables = {g: [team_idx[t] for t in g_teams if table_of.get(t) == g] for g, g_teams in groups.items()}
+    else:
+        tables = {None: list(range(len(teams)))}
+    positions = np.zeros((n_sim, len(teams)), dtype=np.int16)
+    table_size = np.full(len(teams), len(teams), dtype=np.int16)
+    for cols in tables.values():
+        if not cols: continue
+        cols = np.array(cols)
+        table_h2h = table_head_to_head(h2h, cols, outcomes) if h2h is not None else None
+        positions[:, cols] = rank_simulated_table(wins[:, cols], diff[:, cols], rng, table_h2h, tiebreakers)
+        table_size[cols] = len(cols)
+
+    return {
+        "teams": list(teams), "matches": list(unplayed_matches), "groups": groups,
+        "outcome_codes": outcome_codes, "outcome_labels": outcome_labels, "outcomes": outcomes,
+        "wins": wins, "diff": diff, "positions": positions, "table_size": table_size,
+    }
+
+def build_head_to_head(team_idx, played_results):
+    """
+    Head-to-head inputs for the tiebreakers: series won and game diff of row team against column team in played
+    series, plus a 'series' list that simulate_season_batch fills with (match column, team A, team B, per-outcome
+    A wins, B wins, A game diff) for every unplayed series, so per-simulation results are read from the sampled
+    outcomes only where teams end up tied.
+    """
+    base_wins = np.zeros((len(team_idx), len(team_idx)), dtype=np.int32)
+    base_diff = np.zeros((len(team_idx), len(team_idx)), dtype=np.int32)
+    for a, b, winner, score_a, score_b in played_results:
+        if a not in team_idx or b not in team_idx: continue
+        ia, ib = team_idx[a], team_idx[b]
+        if winner == "1": base_wins[ia, ib] += 1
+        elif winner == "2": base_wins[ib, ia] += 1
+        base_diff[ia, ib] += score_a - score_b; base_diff[ib, ia] += score_b - score_a
+    return {"wins": base_wins, "diff": base_diff, "series": []}
+
+def table_head_to_head(h2h, cols, outcomes):
+    """Head-to-head inputs restricted to one table's teams ('cols'), re-indexed to their position in the table."""
+    local = {int(c): i for i, c in enumerate(cols)}
+    series = [(j, local[ia], local[ib], a_win, b_win, a_diff) for j, ia, ib, a_win, b_win, a_diff in h2h["series"] if ia in local and ib in local]
+    return {"wins": h2h["wins"][np.ix_(cols, cols)], "diff": h2h["diff"][np.ix_(cols, cols)], "series": series, "outcomes": outcomes}
+
+def head_to_head_points(h2h, group_ids, rows, stat):
+    """
+    Series won (stat "wins") or game diff (stat "diff") of every team against the teams sharing its tie group,
+    for the simulations in 'rows' ('group_ids' holds those rows). Works pair by pair, so memory stays O(rows x T).
+    """
+    points = np.zeros(group_ids.shape, dtype=np.int32)
+    base = h2h[stat]
+    for i, k in zip(*np.nonzero(base)):
+        points[:, i] += base[i, k] * (group_ids[:, i] == group_ids[:, k])
+    for j, ia, ib, a_win, b_win, a_diff in h2h["series"]:
+        tied = group_ids[:, ia] == group_ids[:, ib]
+        if not tied.any(): continue
+        picked = h2h["outcomes"][rows, j]
+        if stat == "wins":
+            points[:, ia] += a_win[picked] * tied; points[:, ib] += b_win[picked] * tied
+        else:
+            delta = a_diff[picked] * tied
+            points[:, ia] += delta; points[:, ib] -= delta
+    return points
+
+# --- TIEBREAK RULES ---
+# Each rule scores every team against the other teams it is still tied with (a mini-table). It is called only
+# for the simulations that still have a tie ('rows'), with their tie group ids; higher scores rank first.
+def h2h_record_rule(h2h, group_ids, rows):
+    """Series won against the other tied teams."""
+    return head_to_head_points(h2h, group_ids, rows, "wins")
+
+def h2h_game_diff_rule(h2h, group_ids, rows):
+    """Game difference in series against the other tied teams."""
+    return head_to_head_points(h2h, group_ids, rows, "diff")
+
+TIEBREAK_RULES = {
+    "Head-to-head record": h2h_record_rule,
+    "Head-to-head game diff": h2h_game_diff_rule,
+}
+
+def label_tie_groups(keys):
+    """Give teams that are level on every key the same group id, per simulation."""
+    order = np.lexsort(tuple(-k for k in reversed(keys)), axis=1)
+    new_group = np.zeros(order.shape, dtype=bool); new_group[:, 0] = True
+    for k in keys:
+        k_sorted = np.take_along_axis(k, order, axis=1)
+        new_group[:, 1:] |= k_sorted[:, 1:] != k_sorted[:, :-1]
+    group_ids = np.empty_like(order)
+    np.put_along_axis(group_ids, order, np.cumsum(new_group, axis=1), axis=1)
+    return group_ids
+
+def rank_simulated_table(wins, diff, rng, h2h=None, tiebreakers=()):
+    """
+    Rank one table for every simulation by (wins, diff), then by each tiebreak rule in order
+    among the teams still level, and finally at random. Returns 1-based positions.
+    """
+    keys = [wins, diff]
+    for rule in tiebreakers:
+        group_ids = label_tie_groups(keys)
+        # Group ids run 1..T, so a simulation has a tie exactly when it has fewer than T groups
+        rows = np.flatnonzero(group_ids.max(axis=1) < wins.shape[1])
+        key = np.zeros(wins.shape, dtype=np.int32)
+        if rows.size: key[rows] = TIEBREAK_RULES[rule](h2h, group_ids[rows], rows)
+        keys.append(key)
+    order = np.lexsort((rng.random(wins.shape),) + tuple(-k for k in reversed(keys)), axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, wins.shape[1] + 1)[None, :], axis=1)
+    return positions
+
+def assign_brackets(samples, brackets):
+    """Index of the first bracket each team's finishing position falls into, per simulation (-1 if none)."""
+    positions, table_size = samples["positions"], samples["table_size"]
+    assigned = np.full(positions.shape, -1, dtype=np.int16)
+    for k, bracket in enumerate(brackets):
+        end = table_size if not bracket.get("end") else bracket["end"]
+        hit = (assigned < 0) & (positions >= bracket["start"]) & (positions <= end)
+        assigned[hit] = k
+    return assigned
+
+@traced("simulation")
+def summarize_bracket_odds(samples, brackets):
+    """Turn a simulation batch into the per-team bracket probability table shown on the odds page."""
+    assigned = assign_brackets(samples, brackets)
+    n_sim = assigned.shape[0]
     rows = []
-    for t in teams:
+    for i, t in enumerate(samples["teams"]):
         row = {"Team": t}
-        for bracket in brackets: row[f"{bracket['name']} (%)"] = (finish_counter[t][bracket["name"]] / n_sim) * 100
+        if samples["groups"]:
+            row["Group"] = next((g for g, g_teams in samples["groups"].items() if t in g_teams), None)
+        for k, bracket in enumerate(brackets):
+            row[f"{bracket['name']} (%)"] = (np.count_nonzero(assigned[:, i] == k) / n_sim) * 100
         rows.append(row)
     return pd.DataFrame(rows).round(2)
 
+@traced("simulation")
+def build_leverage_report(samples, brackets, qualify_brackets):
+    """
+    Qualification probability of every team conditional on each result of every unplayed match,
+    taken from one simulation batch. 'Swing (pp)' is the spread between a team's best and worst case.
+    """
+    qualify_idx = [k for k, b in enumerate(brackets) if b["name"] in qualify_brackets]
+    qualified = np.isin(assign_brackets(samples, brackets), qualify_idx).astype(np.int32)
+    outcomes, codes, labels = samples["outcomes"], samples["outcome_codes"], samples["outcome_labels"]
+    if outcomes.shape[1] == 0: return pd.DataFrame()
+
+    # One-hot every (match, outcome) pair so all conditional counts come from a single product
+    offsets = np.concatenate([[0], np.cumsum([len(c) for c in codes])])
+    onehot = np.zeros((outcomes.shape[0], offsets[-1]), dtype=np.int32)
+    for j in range(outcomes.shape[1]):
+        if codes[j]: onehot[np.arange(outcomes.shape[0]), offsets[j] + outcomes[:, j]] = 1
+    samples_per_outcome = onehot.sum(axis=0)
+    qualify_counts = onehot.T @ qualified
+
+    rows = []
+    for j, (a, b, dt, bo) in enumerate(samples["matches"]):
+        seen = [k for k in range(len(codes[j])) if samples_per_outcome[offsets[j] + k] > 0]
+        if len(seen) < 2: continue
+        for i, t in enumerate(samples["teams"]):
+            for k in seen:
+                n = samples_per_outcome[offsets[j] + k]
+                rows.append({"Match": f"{a} vs {b} ({dt})", "Team": t, "Outcome": labels[j][k], "Samples": int(n), "Qualify (%)": qualify_counts[offsets[j] + k, i] / n * 100})
+    if not rows: return pd.DataFrame()
+    df = pd.DataFrame(rows)
+    df["Swing (pp)"] = df.groupby(["Match", "Team"])["Qualify (%)"].transform(lambda s: s.max() - s.min())
+    return df.sort_values(["Swing (pp)", "Match", "Qualify (%)"], ascending=[False, True, False]).reset_index(drop=True).round(2)
+
+@traced("simulation")
+def run_monte_carlo_simulation(teams, current_wins, current_diff, unplayed_matches, forced_outcomes, brackets, n_sim):
+    samples = simulate_season_batch(teams, current_wins, current_diff, unplayed_matches, forced_outcomes, n_sim)
+    return summarize_bracket_odds(samples, brackets)
+
+@traced("simulation")
 def run_monte_carlo_simulation_groups(groups, current_wins, current_diff, unplayed_matches, forced_outcomes, brackets, n_sim):
     """
-    Corrected simulation for group stage tournaments.
-    This version ranks teams WITHIN their groups before applying brackets.
+    Simulation for group stage tournaments.
+    Teams are ranked WITHIN their groups before applying brackets.
     """
     teams = [t for g_teams in groups.values() for t in g_teams]
-    finish_counter = {t: {b["name"]: 0 for b in brackets} for t in teams}
-
-    for _ in range(n_sim):
-        sim_wins = defaultdict(int, current_wins)
-        sim_diff = defaultdict(int, current_diff)
-
-        for a, b, dt, bo in unplayed_matches:
-            code = forced_outcomes.get((a, b, dt), "random")
-            outcome = random.choice([c for _, c in get_series_outcome_options(a, b, bo) if c != "random"]) if code == "random" else code
-            if outcome == "DRAW": continue
-            
-            winner, loser = (a, b) if outcome.startswith("A") else (b, a)
-            num = outcome[1:]
-            w, l = (int(num[0]), int(num[1])) if len(num) == 2 else (int(num), 0)
-            
-            sim_wins[winner] += 1
-            sim_diff[winner] += w - l
-            sim_diff[loser] += l - w
-        
-        for group_name, group_teams in groups.items():
-            ranked_in_group = sorted(group_teams, key=lambda t: (sim_wins[t], sim_diff[t], random.random()), reverse=True)
-            for pos, team in enumerate(ranked_in_group):
-                rank_in_group = pos + 1
-                for bracket in brackets:
-                    start = bracket["start"]
-                    end = bracket.get("end") or len(group_teams) 
-                    if start <= rank_in_group <= end:
-                        finish_counter[team][bracket["name"]] += 1
-                        break
-    
-    # --- THIS IS THE CORRECTED SECTION ---
-    prob_data = [] # The list is correctly named 'prob_data'
-    for t in teams:
+    samples = simulate_season_batch(teams, current_wins, current_diff, unplayed_matches, forced_outcomes, n_sim, groups=groups)
+    return summarize_bracket_odds(samples, brackets)
+
+# --- SEASON SCENARIOS ---
+# The playoff odds page and the batch report engine (utils/batch_reports.py) both build scenario keys here,
+# so a precomputed batch is exactly the entry the page looks up in the result store.
+def split_played(regular_season_matches, cutoff_dates):
+    """(played, unplayed) in one pass: a match counts as played if it falls on a cutoff date and has a winner."""
+    played, unplayed = [], []
+    for m in regular_season_matches:
+        (played if m["date"] in cutoff_dates and m.get("winner") in ("1", "2") else unplayed).append(m)
+    return played, unplayed
+
+def season_scenario(teams_or_groups, played, unplayed, forced_outcomes=None, n_sim=10000, tiebreakers=tuple(TIEBREAK_RULES), outcome_probs=()):
+    """
+    Standings from the played matches and the scenario key for run_season_scenario. 'teams_or_groups' is the
+    team tuple of a single table or the {group: teams} dict of a group stage; forced_outcomes defaults to
+    every unplayed match left random.
+    """
+    if forced_outcomes is None: forced_outcomes = {(m["teamA"], m["teamB"], m["date"]): "random" for m in unplayed}
+    current_wins, current_diff = defaultdict(int), defaultdict(int)
+    for m in played:
+        winner_idx = int(m["winner"]) - 1
+        teams_in_match = [m["teamA"], m["teamB"]]
+        winner, loser = teams_in_match[winner_idx], teams_in_match[1 - winner_idx]
+        current_wins[winner] += 1
+        s_w, s_l = (m["scoreA"], m["scoreB"]) if winner_idx == 0 else (m["scoreB"], m["scoreA"])
+        current_diff[winner] += s_w - s_l
+        current_diff[loser] += s_l - s_w
+    key = (teams_or_groups, tuple(sorted(current_wins.items())), tuple(sorted(current_diff.items())), tuple((m["teamA"], m["teamB"], m["date"], m["bestof"]) for m in unplayed),
+           tuple(sorted(forced_outcomes.items())), n_sim, tuple((m["teamA"], m["teamB"], m["winner"], m["scoreA"], m["scoreB"]) for m in played), tuple(tiebreakers), outcome_probs)
+    return {"current_wins": current_wins, "current_diff": current_diff, "forced_outcomes": forced_outcomes, "key": key}
+
+def _scenario_runner(key):
+    """(result kind, n_sim, simulate(n)) for a season_scenario key; simulate draws n fresh simulations of the scenario."""
+    teams_or_groups, current_wins, current_diff, unplayed_matches, forced_outcomes, n_sim, played_results, tiebreakers, outcome_probs = key
+    if isinstance(teams_or_groups, dict):
+        kind, groups, teams = "group_sim", teams_or_groups, [t for g_teams in teams_or_groups.values() for t in g_teams]
+    else:
+        kind, groups, teams = "season_sim", None, list(teams_or_groups)
+    return kind, n_sim, lambda n: simulate_season_batch(teams, dict(current_wins), dict(current_diff), list(unplayed_matches), dict(forced_outcomes), n,
+                                                         groups=groups, played_results=played_results, tiebreakers=tiebreakers, outcome_probs=dict(outcome_probs))
+
+def run_season_scenario(key):
+    """Sampled season for a season_scenario key, served from the result store when it was simulated before."""
+    kind, n_sim, simulate = _scenario_runner(key)
+    return cached_result(kind, key, lambda: simulate(n_sim))
+
+SIM_CHUNK = 2000  # simulations per step of a chunked run
+
+def merge_samples(batches):
+    """Stack sample batches of the same scenario into one, as if drawn together."""
+    if len(batches) == 1: return batches[0]
+    merged = dict(batches[0])
+    for k in ("outcomes", "wins", "diff", "positions"): merged[k] = np.concatenate([b[k] for b in batches])
+    return merged
+
+def run_season_scenario_chunked(key, progress=None, chunk=SIM_CHUNK):
+    """
+    run_season_scenario in steps of 'chunk' simulations, calling progress(fraction_done, samples_so_far) after each
+    step (the background job runner uses it for partial results and cancellation). The finished batch is stored
+    under the same key as run_season_scenario's, so either path serves the other's results.
+    """
+    kind, n_sim, simulate = _scenario_runner(key)
+    store_key = scenario_key(kind, *key)
+    samples = load_result(store_key)
+    if samples is not None: return samples
+    batches = []
+    for done in range(0, n_sim, chunk):
+        batches.append(simulate(min(chunk, n_sim - done)))
+        if progress is not None: progress(min(done + chunk, n_sim) / n_sim, merge_samples(batches))
+    samples = merge_samples(batches)
+    save_result(store_key, kind, samples)
+    return samples
+
+# --- PLAYOFF BRACKET SIMULATION ---
+def resolve_seed_teams(samples, seeding):
+    """
+    Team index holding each playoff seed in every simulation (-1 if the slot is empty).
+    'seeding' lists (group name or None, finishing position) slots in seed order.
+    """
+    positions, teams = samples["positions"], samples["teams"]
+    group_cols = {g: np.array([teams.index(t) for t in g_teams if t in teams]) for g, g_teams in (samples["groups"] or {}).items()}
+    seed_teams = np.full((positions.shape[0], len(seeding)), -1, dtype=np.int32)
+    for s, (group, pos) in enumerate(seeding):
+        cols = group_cols.get(group) if group is not None else np.arange(len(teams))
+        if cols is None or not len(cols): continue
+        hit = positions[:, cols] == pos
+        seed_teams[:, s] = np.where(hit.any(axis=1), cols[hit.argmax(axis=1)], -1)
+    return seed_teams
+
+def bracket_seed_order(size):
+    """Standard bracket placement so top seeds meet as late as possible, e.g. 8 -> [1, 8, 4, 5, 2, 7, 3, 6]."""
+    order = [1]
+    while len(order) < size:
+        order = [x for s in order for x in (s, 2 * len(order) + 1 - s)]
+    return order
+
+def play_series_batch(a, b, rng, win_prob=None):
+    """Play one bracket slot across all simulations. -1 is a bye; win_prob[i, j] is P(i beats j), default 50%."""
+    p = np.full(a.shape, 0.5)
+    both = (a >= 0) & (b >= 0)
+    if win_prob is not None: p[both] = win_prob[a[both], b[both]]
+    a_wins = np.where(b < 0, True, np.where(a < 0, False, rng.random(a.shape) < p))
+    return np.where(a_wins, a, b), np.where(a_wins, b, a)
+
+def play_round_batch(slots, rng, win_prob=None):
+    """Pair adjacent slots and return (winners, losers) lists."""
+    results = [play_series_batch(slots[i], slots[i + 1], rng, win_prob) for i in range(0, len(slots), 2)]
+    return [w for w, _ in results], [l for _, l in results]
+
+def elimination_round_name(n_slots):
+    return {2: "Final", 4: "Semifinals", 8: "Quarterfinals"}.get(n_slots, f"Round of {n_slots}")
+
+@traced("simulation")
+def simulate_playoffs(samples, seeding, bracket_format="single", win_prob=None, seed=None):
+    """
+    Play a single- or double-elimination bracket on top of a season simulation batch.
+    Returns each team's probability of making the playoffs, reaching every round and winning the title.
+    """
+    rng = np.random.default_rng(seed)
+    seed_teams = resolve_seed_teams(samples, seeding)
+    n_sim, n_teams = seed_teams.shape[0], len(samples["teams"])
+    size = 2 ** int(np.ceil(np.log2(max(len(seeding), 2))))
+    empty = np.full(n_sim, -1, dtype=np.int32)
+    slots = [seed_teams[:, s - 1] if s <= len(seeding) else empty for s in bracket_seed_order(size)]
+
+    stages = {}
+    def record(stage, alive):
+        stages[stage] = sum(np.bincount(t[t >= 0], minlength=n_teams) for t in alive)
+
+    record("Make Playoffs", slots)
+    if bracket_format == "single":
+        while len(slots) > 1:
+            if len(slots) < size: record(elimination_round_name(len(slots)), slots)
+            slots, _ = play_round_batch(slots, rng, win_prob)
+        champion = slots[0]
+    else:
+        upper, lower, ub_round, lb_round = slots, [], 1, 1
+        while len(upper) > 1:
+            if ub_round > 1: record("Upper Final" if len(upper) == 2 else f"Upper Round {ub_round}", upper)
+            upper, dropped = play_round_batch(upper, rng, win_prob); ub_round += 1
+            if lower:
+                # Drop-in round: reverse the incoming losers to avoid immediate rematches
+                lower = [x for pair in zip(lower, reversed(dropped)) for x in pair]
+                record("Lower Final" if len(upper) == 1 else f"Lower Round {lb_round}", lower)
+                lower, _ = play_round_batch(lower, rng, win_prob); lb_round += 1
+            else:
+                lower = dropped
+            if len(lower) > 1 and len(upper) > 1:
+                record(f"Lower Round {lb_round}", lower)
+                lower, _ = play_round_batch(lower, rng, win_prob); lb_round += 1
+        record("Grand Final", [upper[0], lower[0]])
+        champion, _ = play_series_batch(upper[0], lower[0], rng, win_prob)
+    record("Champion", [champion])
+
+    rows = []
+    for i, t in enumerate(samples["teams"]):
         row = {"Team": t}
-        for g_name, g_teams in groups.items():
-            if t in g_teams:
-                row["Group"] = g_name
-                break
-        for bracket in brackets:
-            row[f"{bracket['name']} (%)"] = (finish_counter[t][bracket["name"]] / n_sim) * 100
-        prob_data.append(row) # We correctly append to 'prob_data'
-        
-    return pd.DataFrame(prob_data).round(2) # We correctly use 'prob_data' to create the DataFrame
-    # --- END OF CORRECTION ---
+        for stage, counts in stages.items(): row[f"{stage} (%)"] = counts[i] / n_sim * 100
+        rows.append(row)
+    return pd.DataFrame(rows).round(2)
+
+# --- CLINCH / ELIMINATION (MAX-FLOW) ---
+# Exact answers from the current standings, without sampling. Only series wins are modelled:
+# a tie on wins counts in the team's favour when testing elimination and against it when
+# testing a clinch, so "Clinched" and "Eliminated" are always safe statements.
+def max_flow(capacity, source, sink):
+    """Edmonds-Karp on a dict-of-dicts residual graph. Meant for the small graphs built below."""
+    flow = 0
+    while True:
+        parent, queue = {source: None}, [source]
+        for u in queue:
+            for v, cap in capacity.get(u, {}).items():
+                if cap > 0 and v not in parent:
+                    parent[v] = u; queue.append(v)
+            if sink in parent: break
+        if sink not in parent: return flow
+        path, v = [], sink
+        while parent[v] is not None: path.append((parent[v], v)); v = parent[v]
+        push = min(capacity[u][v] for u, v in path)
+        for u, v in path:
+            capacity[u][v] -= push
+            capacity.setdefault(v, {}).setdefault(u, 0); capacity[v][u] += push
+        flow += push
+
+def _route_games(games, team_caps, hub_cap=None, hub_games=(), cut=False):
+    """
+    Max number of games whose win can be handed to a team with spare capacity (team_caps[t] = wins it may still take).
+    With cut=True also returns the teams on the source side of a minimum cut: when not every game can be routed,
+    those teams are over-subscribed (the games among them outnumber their combined capacity).
+    """
+    big = len(games) + len(hub_games) + 1  # game -> team edges never limit the flow, so the min cut is made of team caps
+    graph = {"src": {}}
+    for g, (a, b) in enumerate(games):
+        graph["src"][("g", g)] = 1; graph[("g", g)] = {("t", a): big, ("t", b): big}
+    if hub_games:
+        graph["src"]["hub"] = hub_cap; graph["hub"] = {}
+        for g, opp in enumerate(hub_games):
+            graph["hub"][("x", g)] = 1; graph[("x", g)] = {("t", opp): big}
+    for t, cap in team_caps.items():
+        graph.setdefault(("t", t), {})["sink"] = cap
+    flow = max_flow(graph, "src", "sink")
+    if not cut: return flow
+    reached, queue = {"src"}, ["src"]
+    for u in queue:
+        for v, cap in graph.get(u, {}).items():
+            if cap > 0 and v not in reached:
+                reached.add(v); queue.append(v)
+    return flow, {node[1] for node in reached if isinstance(node, tuple) and node[0] == "t"}
+
+def fewest_above(x, wins, games, table, allows_draw=(), check=None):
+    """
+    Fewest rivals in 'table' that must end with more series wins than x over all completions of 'games' (x wins out).
+    Rivals that can pass x are chosen by an exact hitting-set search: whenever the games cannot be routed with
+    every non-chosen rival kept at or below x, the min cut names an over-subscribed set of rivals, and one of them
+    has to be among those finishing above x. 'check' is called at every search node and may raise to abort.
+    """
+    own = [g for g in games if x in g]
+    W = wins.get(x, 0) + len(own)
+    rest = [g for g, draw in zip(games, allows_draw or [False] * len(games)) if x not in g and not draw]
+    left = defaultdict(int)
+    for a, b in rest: left[a] += 1; left[b] += 1
+    rivals = [t for t in table if t != x]
+    forced = [t for t in rivals if wins.get(t, 0) > W]
+    candidates = {t for t in rivals if t not in forced and wins.get(t, 0) + left[t] > W}
+    in_table = set(table)
+    # Freeing rivals with the most wins in reach first finds a solution sooner
+    reach = lambda t: (-(wins.get(t, 0) + left[t]), t)
+
+    def routable(free, budget, failed):
+        if free in failed: return False
+        if check is not None: check()
+        caps = {t: (len(rest) if t in free or t in forced or t not in in_table else W - wins.get(t, 0)) for t in left}
+        flow, over = _route_games(rest, caps, cut=True)
+        if flow == len(rest): return True
+        if budget > 0 and any(routable(free | {t}, budget - 1, failed) for t in sorted((over & candidates) - free, key=reach)): return True
+        failed.add(free)
+        return False
+
+    # Freeing every candidate always works: the others cannot pass x even if they win all their games
+    return len(forced) + next(k for k in range(len(candidates) + 1) if k == len(candidates) or routable(frozenset(), k, set()))
+
+def _greedy_routing(games, team_caps, hub_cap=0, hub_games=()):
+    """
+    Games routed to each team in turn when the teams of 'team_caps' (an ordered list of (team, cap)) are served
+    greedily, earlier teams first; the first k figures always sum to the most the first k teams can take together.
+    'hub_games' lists the opponent of each of x's series, of which at most 'hub_cap' may be handed to the opponent.
+    Augmenting paths run over teams (a team passes one of its games to the other side), which is far cheaper
+    than a general max flow on these small bipartite graphs.
+    """
+    HUB = object()
+    ends = [(a, b) for a, b in games] + [(opp, None) for opp in hub_games]
+    is_hub = [False] * len(games) + [True] * len(hub_games)
+    games_of = defaultdict(list)
+    for g, (a, b) in enumerate(ends):
+        games_of[a].append(g)
+        if b is not None: games_of[b].append(g)
+    holder, hub_used = [None] * len(ends), [0]
+
+    def augment(t):
+        # Search backwards from t for a chain of hand-overs that starts with an unrouted game
+        parent, queue = {t: None}, [t]
+        for v in queue:
+            if v is HUB:
+                for g, h in enumerate(holder):
+                    if is_hub[g] and h is not None and h not in parent: parent[h] = (HUB, g); queue.append(h)
+                continue
+            for g in games_of[v]:
+                h = holder[g]
+                if h is None:
+                    if not is_hub[g] or hub_used[0] < hub_cap:
+                        hub_used[0] += is_hub[g]; holder[g] = v
+                        break
+                    if HUB not in parent: parent[HUB] = (v, g); queue.append(HUB)
+                elif h != v and h not in parent:
+                    parent[h] = (v, g); queue.append(h)
+            else:
+                continue
+            # v took an unrouted game; pass the games along the chain towards t
+            while parent[v] is not None:
+                nxt, g = parent[v]
+                if nxt is HUB: holder[g] = None  # v gives x's series back, freeing hub capacity for the next hand-over
+                else: holder[g] = nxt
+                v = nxt
+            return True
+        return False
+
+    routed = []
+    for t, cap in team_caps:
+        got = 0
+        while got < cap and augment(t): got += 1
+        routed.append(got)
+    return routed
+
+def most_level_or_above(x, wins, games, table, extra_wins=0, limit=None, check=None):
+    """
+    Most rivals in 'table' that can end with at least as many series wins as x, when x wins only 'extra_wins' more
+    series. Branch and bound on the rivals that could catch x. Serving the chasers greedily, closest first, gives
+    both bounds at once: the rivals it lifts all the way form a valid set, and each game it hands out counts
+    1/demand of a rival, which can only overstate how many rivals fit (the LP relaxation). Stops at 'limit'.
+    'check' is called at every search node and may raise to abort.
+    """
+    own_opps = [b if a == x else a for a, b in games if x in (a, b)]
+    rest = [(a, b) for a, b in games if x not in (a, b)]
+    W = wins.get(x, 0) + extra_wins
+    left = defaultdict(int)
+    for a, b in rest: left[a] += 1; left[b] += 1
+    for t in own_opps: left[t] += 1
+    rivals = [t for t in table if t != x]
+    ahead = [t for t in rivals if wins.get(t, 0) >= W]
+    limit = len(rivals) if limit is None else limit
+    if len(ahead) >= limit: return len(ahead)
+    demand = {t: W - wins.get(t, 0) for t in rivals if t not in ahead and wins.get(t, 0) + left[t] >= W}
+    target = limit - len(ahead)
+    best = [0]
+
+    def search(chosen, pool):
+        if check is not None: check()
+        routed = _greedy_routing(rest, [(t, demand[t]) for t in chosen + pool], len(own_opps) - extra_wins, own_opps)
+        if any(r < demand[t] for t, r in zip(chosen, routed)): return  # the chosen rivals cannot all catch x
+        served = routed[len(chosen):]
+        best[0] = max(best[0], len(chosen) + sum(r == demand[t] for t, r in zip(pool, served)))
+        bound = len(chosen) + int(sum(r / demand[t] for t, r in zip(pool, served)) + 1e-9)
+        if best[0] >= min(bound, target): return
+        # Branch on the first rival the greedy pass left short: either it catches x too, or it is left out
+        k = next(k for k, (t, r) in enumerate(zip(pool, served)) if r < demand[t])
+        search(chosen + [pool[k]], pool[:k] + pool[k + 1:])
+        if best[0] < target: search(chosen, pool[:k] + pool[k + 1:])
+
+    search([], sorted(demand, key=lambda t: (demand[t], -left[t], t)))
+    return len(ahead) + min(best[0], target)
+
+def can_finish_top(x, c, wins, games, table, allows_draw=(), check=None):
+    """True if some completion of 'games' lets x finish in the top c of 'table' (x wins out)."""
+    return fewest_above(x, wins, games, table, allows_draw, check) < c
+
+def must_finish_top(x, c, wins, games, table, extra_wins=0, check=None):
+    """True if x finishes in the top c of 'table' in every completion, given only 'extra_wins' more series wins."""
+    return most_level_or_above(x, wins, games, table, extra_wins, limit=c, check=check) < c
+
+def magic_number(x, c, wins, games, table, check=None):
+    """Fewest further series wins that guarantee x a top-c finish, or None if winning out is not enough."""
+    # Each extra win only helps x, so the guarantee is monotone in the number of wins
+    lo, hi = 0, sum(1 for g in games if x in g)
+    if not must_finish_top(x, c, wins, games, table, hi, check): return None
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if must_finish_top(x, c, wins, games, table, mid, check): hi = mid
+        else: lo = mid + 1
+    return lo
+
+@traced("simulation")
+def build_clinch_table(teams, current_wins, unplayed_matches, forced_outcomes, brackets, groups=None, progress=None):
+    """
+    Clinched / Eliminated / Alive status and magic number for every team and bracket. progress(fraction_done) is
+    called after each team and inside the searches, so a background job can cancel the table midway.
+    """
+    wins = defaultdict(int, current_wins)
+    games, allows_draw = [], []
+    for a, b, dt, bo in unplayed_matches:
+        code = forced_outcomes.get((a, b, dt), "random")
+        if code == "random":
+            games.append((a, b)); allows_draw.append(any(c == "DRAW" for _, c in get_series_outcome_options(a, b, bo)))
+        else:
+            side, _, _ = parse_outcome_code(code)
+            if side: wins[a if side == "A" else b] += 1
+    tables = groups or {None: list(teams)}
+    n_teams, done = sum(len(t) for t in tables.values()), 0
+    check = (lambda: progress(done / n_teams)) if progress is not None else None
+    rows = []
+    for group, table in tables.items():
+        for x in table:
+            remaining = sum(1 for g in games if x in g)
+            best = fewest_above(x, wins, games, table, allows_draw, check) + 1
+            worst = most_level_or_above(x, wins, games, table, check=check) + 1
+            row = {"Team": x}
+            if groups: row["Group"] = group
+            row.update({"Wins": wins[x], "Left": remaining, "Best Finish": best, "Worst Finish": worst})
+            for bracket in brackets:
+                start, end = bracket["start"], bracket.get("end") or len(table)
+                if start <= best and worst <= end: status = "Clinched"
+                elif worst < start or best > end: status = "Eliminated"
+                else: status = "Alive"
+                row[bracket["name"]] = status
+            for end in sorted({b.get("end") or len(table) for b in brackets}):
+                if end < len(table):
+                    row[f"Top {end} Magic #"] = 0 if worst <= end else (magic_number(x, end, wins, games, table, check) if best <= end else None)
+            rows.append(row)
+            done += 1
+            if progress is not None: progress(done / n_teams)
+    df = pd.DataFrame(rows)
+    magic_cols = [c for c in df.columns if c.endswith("Magic #")]
+    df[magic_cols] = df[magic_cols].astype("Int64")
+    return df
@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import subprocess
+
+# --- COLD-START BUDGET ---
+# Seconds for a script's first run in a fresh interpreter, measured with Streamlit's AppTest after Streamlit
+# itself is imported, with no tournament data loaded. Pages stop at their "load data first" check, so this is
+# almost entirely the cost of their imports; heavy libraries belong inside the functions that need them.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_BUDGET_S = {
+    "app.py": 0.5,
+    "pages/1_Statistics_Breakdown.py": 0.9,
+    "pages/2_Hero_Detail_Drilldown.py": 0.9,
+    "pages/3_Head-to-Head.py": 0.9,
+    "pages/4_Synergy_Counter_Analysis.py": 0.9,
+    "pages/5_Playoff_Qualification_Odds.py": 1.2,
+    "pages/6_Draft_Assistant.py": 2.5,  # loads the draft model to list its teams
+    "pages/7_Model_Backtest.py": 1.2,
+    "pages/8_Draft_Impact.py": 1.2,
+    "pages/9_Team_Ratings.py": 0.9,
+    "pages/10_Team_Compositions.py": 0.9,
+}
+
+_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "error": at.exception[0].message if at.exception else None}))
+"""
+
+def measure_cold_start(script, runs=3):
+    """Fastest of 'runs' first runs of a script, each in a new interpreter: {'seconds', 'error'}."""
+    best = None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _PROBE, os.path.join(ROOT, script)], capture_output=True, text=True, cwd=ROOT)
+        if out.returncode != 0:
+            return {"seconds": None, "error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else f"exit code {out.returncode}"}
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]: best = result
+    return best
+
+def check_startup_budget(scripts=None, runs=3):
+    """Measured cold start against STARTUP_BUDGET_S for each script; rows of (script, seconds, budget, status)."""
+    rows = []
+    for script in scripts or STARTUP_BUDGET_S:
+        result, budget = measure_cold_start(script, runs), STARTUP_BUDGET_S.get(script)
+        if result["error"]: status = f"error: {result['error']}"
+        elif budget is None: status = "no budget"
+        else: status = "ok" if result["seconds"] <= budget else "over budget"
+        rows.append((script, result["seconds"], budget, status))
+    return rows
+
+if __name__ == "__main__":
+    rows = check_startup_budget(sys.argv[1:] or None)
+    for script, seconds, budget, status in rows:
+        shown = f"{seconds:6.2f}s" if seconds is not None else "     -"
+        limit = f"{budget}s" if budget is not None else "-"
+        print(f"{script:42} {shown}  (budget {limit})  {status}")
+    sys.exit(1 if any(status == "over budget" for *_, status in rows) else 0)
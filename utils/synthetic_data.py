@@ -0,0 +1,89 @@
+import datetime
+import numpy as np
+from utils.hero_index import hero_index
+
+# --- SYNTHETIC TOURNAMENT DATA ---
+# Deterministic Liquipedia-shaped match payloads for benchmarking beyond the size of the real archives.
+# Matches are double round-robin regular seasons of best-of series; each game has two five-hero sides, five bans
+# per team and blue/red sides. Hero popularity is Zipf-like and results follow team strength plus hero power,
+# so pick rates, synergies and counters have the skew of real data. The same arguments always give the same matches.
+DEFAULT_TEAMS = 16
+HERO_CHUNK = 8192  # games drafted per vectorised batch
+
+def _season_schedule(n_teams):
+    """Rounds of (home, away) pairs for a double round robin (circle method)."""
+    order = list(range(n_teams + (n_teams % 2)))
+    rounds = []
+    for _ in range(len(order) - 1):
+        half = len(order) // 2
+        rounds.append([(order[i], order[-1 - i]) for i in range(half)])
+        order = [order[0], order[-1]] + order[1:-1]
+    rounds += [[(b, a) for a, b in r] for r in rounds]
+    return [[(a, b) for a, b in r if a < n_teams and b < n_teams] for r in rounds]
+
+def _draft_batches(rng, heroes):
+    """Endless (picks, bans) index arrays of shape (HERO_CHUNK, 10): sides' picks then their bans, 20 distinct heroes per game."""
+    popularity = 1.0 / np.arange(1, len(heroes) + 1) ** 0.8
+    log_p = np.log(popularity[rng.permutation(len(heroes))] / popularity.sum())
+    while True:
+        # Gumbel top-k draws 20 distinct heroes per game with probability following popularity
+        keys = log_p + rng.gumbel(size=(HERO_CHUNK, len(heroes)))
+        top = np.argpartition(-keys, 19, axis=1)[:, :20]
+        top = top[np.arange(HERO_CHUNK)[:, None], rng.permuted(np.tile(np.arange(20), (HERO_CHUNK, 1)), axis=1)]
+        yield top[:, :10], top[:, 10:]
+
+def iter_matches(n_games, n_teams=DEFAULT_TEAMS, seed=0, bestof=3, league="Synthetic League", start_date=datetime.date(2024, 1, 5)):
+    """
+    Yields raw matches totalling exactly n_games games. Seasons of n_teams teams repeat until enough games
+    have been played; the last series is cut short if the game budget runs out mid-series. Drafts and results use
+    separate random streams, so a smaller dataset is always a prefix of a larger one with the same seed.
+    """
+    draft_rng, rng = (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(2))
+    heroes = sorted(hero_index()["profiles"])
+    hero_power = rng.normal(0, 0.08, len(heroes))
+    teams = [f"Team {i + 1:02d}" for i in range(n_teams)]
+    rosters = [[f"{t.split()[-1]}-P{p + 1}" for p in range(5)] for t in teams]
+    schedule = _season_schedule(n_teams)
+    wins_needed = bestof // 2 + 1
+    drafts = _draft_batches(draft_rng, heroes)
+    picks, bans, g_i = np.empty((0, 10), dtype=int), None, 0
+    games_left, season, match_id = n_games, 0, 0
+    while games_left > 0:
+        season_start = start_date + datetime.timedelta(weeks=season * (len(schedule) + 6))
+        strength = rng.normal(0, 0.6, n_teams)
+        for week, pairs in enumerate(schedule):
+            for slot, (a, b) in enumerate(pairs):
+                if games_left <= 0: return
+                match_id += 1
+                date = season_start + datetime.timedelta(weeks=week, days=slot * 3 // max(len(pairs), 1))
+                games, score = [], [0, 0]
+                while max(score) < wins_needed and games_left > 0:
+                    if g_i >= len(picks): (picks, bans), g_i = next(drafts), 0
+                    a_blue = rng.random() < 0.5
+                    p, bn = picks[g_i], bans[g_i]
+                    edge = strength[a] - strength[b] + hero_power[p[:5]].sum() - hero_power[p[5:]].sum()
+                    winner = 0 if rng.random() < 1 / (1 + np.exp(-edge)) else 1
+                    score[winner] += 1
+                    extradata = {"team1side": "blue" if a_blue else "red", "team2side": "red" if a_blue else "blue"}
+                    for t in range(2):
+                        for k in range(5): extradata[f"team{t + 1}ban{k + 1}"] = heroes[bn[5 * t + k]]
+                    games.append({
+                        "winner": str(winner + 1), "length": int(rng.integers(720, 1500)), "extradata": extradata,
+                        "opponents": [{"players": [{"name": rosters[team][k], "champion": heroes[p[5 * t + k]]} for k in range(5)]}
+                                      for t, team in enumerate((a, b))],
+                    })
+                    g_i += 1; games_left -= 1
+                winner = "1" if score[0] >= wins_needed else "2" if score[1] >= wins_needed else ""
+                yield {
+                    "match2id": f"SYN_{match_id:07d}", "date": f"{date} {12 + slot % 8:02d}:00:00", "bestof": bestof,
+                    "tournament": f"{league} Season {season + 1}", "section": "Regular Season",
+                    "pagename": f"{league.replace(' ', '_')}/Season_{season + 1}/Regular_Season",
+                    "winner": winner, "finished": bool(winner),
+                    "match2opponents": [{"name": teams[a], "score": score[0]}, {"name": teams[b], "score": score[1]}],
+                    "match2games": games,
+                }
+        season += 1
+
+def generate_matches(n_games, **kwargs):
+    """List of raw matches totalling n_games games; see iter_matches for the options."""
+    return list(iter_matches(n_games, **kwargs))
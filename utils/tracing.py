@@ -0,0 +1,227 @@
+import json
+import time
+import threading
+import functools
+import tracemalloc
+import weakref
+from collections import deque
+
+# --- TRACING ---
+# Spans around the hot paths (loading, parsing, analysis, simulation, rendering, caches), recorded per script rerun.
+# A trace is active only on the thread running a rerun with the performance panel switched on; everywhere else
+# (panel off, batch workers, the API server) a traced function costs one thread-local lookup.
+# Allocation peaks come from tracemalloc, which slows allocation-heavy code while it runs, so it is opt-in; it is
+# process-wide, so with several sessions tracing at once their allocations overlap.
+TRACE_HISTORY = 20  # reruns kept per session
+
+_local = threading.local()
+_alloc_lock = threading.Lock()
+_alloc_users = [0]
+
+def _release_allocations():
+    with _alloc_lock:
+        _alloc_users[0] -= 1
+        if _alloc_users[0] == 0 and tracemalloc.is_tracing(): tracemalloc.stop()
+
+class Span:
+    __slots__ = ("name", "category", "start", "duration", "depth", "child_time", "cache", "base_bytes", "peak_bytes", "error")
+
+    def __init__(self, name, category, start, depth, cache):
+        self.name, self.category, self.start, self.depth, self.cache = name, category, start, depth, cache
+        self.duration, self.child_time, self.base_bytes, self.peak_bytes, self.error = None, 0.0, 0, 0, None
+
+class Trace:
+    """Spans of one script rerun, in start order, with times relative to the start of the rerun."""
+    def __init__(self, label, allocations=False):
+        self.label, self.allocations = label, allocations
+        self.started_at, self._t0 = time.time(), time.perf_counter()
+        self.elapsed, self.spans, self.stack = None, [], []
+        self._release = None
+        if allocations:
+            with _alloc_lock:
+                if not tracemalloc.is_tracing(): tracemalloc.start()
+                _alloc_users[0] += 1
+            # Runs once: on finish, or when a session ends with the trace still open
+            self._release = weakref.finalize(self, _release_allocations)
+
+    def open(self, name, category, cache=None):
+        span = Span(name, category, time.perf_counter() - self._t0, len(self.stack), cache)
+        if self.allocations and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self.stack: self.stack[-1].peak_bytes = max(self.stack[-1].peak_bytes, peak)
+            tracemalloc.reset_peak()
+            span.base_bytes = span.peak_bytes = current
+        self.spans.append(span)
+        self.stack.append(span)
+        return span
+
+    def close(self, span, error=None):
+        span.duration = time.perf_counter() - self._t0 - span.start
+        span.error = error
+        if self.allocations and tracemalloc.is_tracing():
+            span.peak_bytes = max(span.peak_bytes, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self.stack.pop()
+        if self.stack:
+            self.stack[-1].child_time += span.duration
+            self.stack[-1].peak_bytes = max(self.stack[-1].peak_bytes, span.peak_bytes)
+
+    def finish(self, stopped=False):
+        """
+        Close the rerun. A rerun that stopped early (st.stop, an exception, a newer rerun) is closed later by
+        the panel with stopped=True and ends where its last span ended.
+        """
+        if self.elapsed is not None: return
+        while self.stack: self.close(self.stack[-1], error="interrupted")
+        now = time.perf_counter() - self._t0
+        self.elapsed = max((s.start + s.duration for s in self.spans), default=0.0) if stopped else now
+        if self._release is not None: self._release()
+
+def active_trace():
+    return getattr(_local, "trace", None)
+
+def start_trace(label, allocations=False):
+    """Begin tracing this thread's work; returns the Trace."""
+    _local.trace = Trace(label, allocations)
+    return _local.trace
+
+def stop_trace(stopped=False):
+    """End tracing on this thread and return the finished Trace, or None."""
+    trace, _local.trace = active_trace(), None
+    if trace is not None: trace.finish(stopped)
+    return trace
+
+class span:
+    """Context manager timing a block as one span of the active trace; a no-op when nothing is being traced."""
+    __slots__ = ("name", "category", "cache", "_trace", "_span")
+
+    def __init__(self, name, category, cache=None):
+        self.name, self.category, self.cache = name, category, cache
+
+    def __enter__(self):
+        self._trace = active_trace()
+        self._span = self._trace.open(self.name, self.category, self.cache) if self._trace is not None else None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._span is not None: self._trace.close(self._span, None if exc_type is None else exc_type.__name__)
+        return False
+
+def traced(category, name=None, cache=None):
+    """Decorator recording each call of the function as a span of the active trace."""
+    def wrap(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            trace = getattr(_local, "trace", None)
+            if trace is None: return fn(*args, **kwargs)
+            s = trace.open(label, category, cache)
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                trace.close(s, type(e).__name__); raise
+            trace.close(s)
+            return result
+        return inner
+    return wrap
+
+def traced_cached(category, cache_decorator, name=None):
+    """
+    traced() for a function memoised by cache_decorator (e.g. st.cache_data(ttl=3600)): a span starts as a
+    cache hit and is marked a miss when the wrapped function actually runs.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            mark_cache("miss")
+            return fn(*args, **kwargs)
+        return traced(category, name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}", cache="hit")(cache_decorator(compute))
+    return wrap
+
+def mark_cache(outcome):
+    """Record 'hit' or 'miss' on the innermost open span."""
+    trace = active_trace()
+    if trace is not None and trace.stack: trace.stack[-1].cache = outcome
+
+# --- SUMMARIES AND EXPORT ---
+def summarize_trace(trace):
+    """
+    Per-function rows (calls, total and self time, cache hits/misses, largest allocation peak) and per-category
+    self time; self time excludes traced callees, so categories add up to the traced part of the rerun.
+    """
+    by_name, by_category = {}, {}
+    for s in trace.spans:
+        duration = s.duration or 0.0
+        row = by_name.setdefault(s.name, {"Function": s.name, "Category": s.category, "Calls": 0, "Total (ms)": 0.0, "Self (ms)": 0.0,
+                                          "Cache Hits": 0, "Cache Misses": 0, "Peak Alloc (MB)": 0.0, "Errors": 0})
+        row["Calls"] += 1
+        row["Total (ms)"] += duration * 1000
+        row["Self (ms)"] += (duration - s.child_time) * 1000
+        row["Cache Hits"] += s.cache == "hit"
+        row["Cache Misses"] += s.cache == "miss"
+        row["Peak Alloc (MB)"] = max(row["Peak Alloc (MB)"], (s.peak_bytes - s.base_bytes) / 2**20)
+        row["Errors"] += s.error is not None
+        by_category[s.category] = by_category.get(s.category, 0.0) + (duration - s.child_time) * 1000
+    elapsed_ms = (trace.elapsed or 0.0) * 1000
+    categories = [{"Category": c, "Self (ms)": ms} for c, ms in sorted(by_category.items(), key=lambda kv: -kv[1])]
+    categories.append({"Category": "untraced (Streamlit, widgets, other code)", "Self (ms)": max(elapsed_ms - sum(by_category.values()), 0.0)})
+    functions = sorted(by_name.values(), key=lambda r: -r["Total (ms)"])
+    for r in functions + categories:
+        for k in ("Total (ms)", "Self (ms)"):
+            if k in r: r[k] = round(r[k], 2)
+        if "Peak Alloc (MB)" in r: r["Peak Alloc (MB)"] = round(r["Peak Alloc (MB)"], 2) if trace.allocations else None
+    return {"elapsed_ms": round(elapsed_ms, 2), "categories": categories, "functions": functions}
+
+def export_chrome_trace(traces):
+    """Trace Event Format JSON (chrome://tracing, Perfetto) with one track per rerun."""
+    events = []
+    for tid, trace in enumerate(traces, start=1):
+        origin = trace.started_at * 1e6
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": f"{trace.label} @ {time.strftime('%H:%M:%S', time.localtime(trace.started_at))}"}})
+        events.append({"name": trace.label, "cat": "rerun", "ph": "X", "pid": 1, "tid": tid, "ts": origin, "dur": (trace.elapsed or 0.0) * 1e6})
+        for s in trace.spans:
+            args = {k: v for k, v in (("cache", s.cache), ("error", s.error)) if v is not None}
+            if trace.allocations: args["peak_alloc_bytes"] = s.peak_bytes - s.base_bytes
+            events.append({"name": s.name, "cat": s.category, "ph": "X", "pid": 1, "tid": tid,
+                           "ts": origin + s.start * 1e6, "dur": (s.duration or 0.0) * 1e6, "args": args})
+    return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}).encode("utf-8")
+
+# --- PERFORMANCE PANEL ---
+class PerformancePanel:
+    """Sidebar panel for one rerun; finish() at the end of the script closes the trace and shows the breakdown."""
+    def __init__(self, label):
+        import streamlit as st
+        self.label = label
+        box = st.sidebar.expander("⏱️ Performance")
+        self.enabled = box.toggle("Trace reruns", key="perf_tracing", help="Time loading, parsing, analysis, simulation and rendering on every rerun.")
+        allocations = box.checkbox("Track allocation peaks (slower)", key="perf_allocations", disabled=not self.enabled)
+        self.body = box.container()
+        stop_trace(stopped=True)  # a rerun stopped early leaves its trace open on this thread
+        history = st.session_state.setdefault("perf_traces", deque(maxlen=TRACE_HISTORY))
+        for trace in history: trace.finish(stopped=True)
+        if self.enabled:
+            history.append(start_trace(label, allocations))
+
+    def finish(self):
+        import streamlit as st
+        trace = stop_trace()
+        history = list(st.session_state.get("perf_traces", ()))
+        if not self.enabled or trace is None or not history: return
+        import pandas as pd
+        # Reruns are chosen by start time, which stays valid while newer reruns are appended
+        by_start = {t.started_at: t for t in history}
+        describe = lambda t: f"{t.label} {time.strftime('%H:%M:%S', time.localtime(t.started_at))} ({t.elapsed * 1000:.0f} ms)"
+        with self.body:
+            choice = st.selectbox("Rerun:", [None] + [t.started_at for t in reversed(history)], key="perf_rerun_choice",
+                                  format_func=lambda k: f"Latest: {describe(trace)}" if k is None else describe(by_start[k]))
+            shown = by_start.get(choice, trace)
+            summary = summarize_trace(shown)
+            st.caption(f"{summary['elapsed_ms']:.0f} ms in total, {len(shown.spans)} spans.")
+            st.dataframe(pd.DataFrame(summary["categories"]), use_container_width=True, hide_index=True)
+            st.dataframe(pd.DataFrame(summary["functions"]), use_container_width=True, hide_index=True)
+            st.download_button("Download trace (.json)", export_chrome_trace(history), file_name="mlbb_trace.json", mime="application/json",
+                               help="Trace Event Format: open in chrome://tracing or ui.perfetto.dev.")
+
+def performance_panel(label):
+    """Call once at the top of a script, after st.set_page_config; call .finish() on the result at the end."""
+    return PerformancePanel(label)
@@ -0,0 +1,138 @@
+import json
+import numpy as np
+from types import SimpleNamespace
+
+# --- EXPORT ---
+# A compiled model is every boosted tree flattened into shared node arrays. Leaves point back at themselves,
+# so a batch of rows can step through all trees together for 'max_depth' steps without checking for leaves.
+def export_trees(xgb_model, n_features):
+    """Flatten an XGBClassifier (or Booster) into NumPy node arrays plus the model's base margin."""
+    import xgboost
+    booster = xgb_model.get_booster() if hasattr(xgb_model, "get_booster") else xgb_model
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    trees = learner["gradient_booster"]["model"]["trees"]
+    tree_info = learner["gradient_booster"]["model"]["tree_info"]
+    feature, threshold, left, right, missing, value, roots = [], [], [], [], [], [], []
+    max_depth, offset = 0, 0
+    for tree in trees:
+        l, r = np.array(tree["left_children"]), np.array(tree["right_children"])
+        cond = np.array(tree["split_conditions"], dtype=np.float32)
+        is_leaf = l == -1
+        own = np.arange(len(l)) + offset
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, tree["split_indices"]))
+        threshold.append(np.where(is_leaf, np.inf, cond))
+        left.append(np.where(is_leaf, own, l + offset)); right.append(np.where(is_leaf, own, r + offset))
+        missing.append(np.where(is_leaf, own, np.where(np.array(tree["default_left"], dtype=bool), l, r) + offset))
+        value.append(np.where(is_leaf, cond, 0))
+        # Children always come after their parent in XGBoost's node order
+        depth = np.zeros(len(l), dtype=np.int32)
+        for i in np.flatnonzero(~is_leaf): depth[l[i]] = depth[r[i]] = depth[i] + 1
+        max_depth = max(max_depth, int(depth.max()))
+        offset += len(l)
+    compiled = {
+        "feature": np.concatenate(feature).astype(np.int32), "threshold": np.concatenate(threshold).astype(np.float32),
+        "left": np.concatenate(left).astype(np.int32), "right": np.concatenate(right).astype(np.int32),
+        "missing": np.concatenate(missing).astype(np.int32), "value": np.concatenate(value).astype(np.float32),
+        "roots": np.array(roots, dtype=np.int32), "tree_group": np.array(tree_info, dtype=np.int32),
+        "max_depth": np.int32(max_depth), "objective": learner["objective"]["name"],
+    }
+    n_groups = int(compiled["tree_group"].max()) + 1 if len(trees) else 1
+    # The intercept format differs between XGBoost versions, so read it back as the margin of an all-missing row
+    probe = np.full((1, n_features), np.nan, dtype=np.float32)
+    xgb_margin = booster.predict(xgboost.DMatrix(probe), output_margin=True).reshape(1, -1)
+    compiled["base_margin"] = (xgb_margin - tree_margins(compiled, probe, n_groups)).ravel().astype(np.float32)
+    return compiled
+
+# --- EVALUATION ---
+def tree_margins(compiled, X, n_groups, chunk_rows=4096):
+    """Sum of leaf values per output group for every row, walking all trees for a chunk of rows at once."""
+    X = np.asarray(X, dtype=np.float32)
+    out = np.zeros((X.shape[0], n_groups), dtype=np.float64)
+    group_onehot = np.eye(n_groups, dtype=np.float64)[compiled["tree_group"]]
+    feature, threshold, left, right, missing = (compiled[k] for k in ("feature", "threshold", "left", "right", "missing"))
+    for start in range(0, X.shape[0], chunk_rows):
+        block = X[start:start + chunk_rows]
+        rows = np.arange(block.shape[0])[:, None]
+        node = np.broadcast_to(compiled["roots"], (block.shape[0], len(compiled["roots"]))).copy()
+        for _ in range(int(compiled["max_depth"])):
+            fv = block[rows, feature[node]]
+            node = np.where(np.isnan(fv), missing[node], np.where(fv < threshold[node], left[node], right[node]))
+        out[start:start + chunk_rows] = compiled["value"][node].astype(np.float64) @ group_onehot
+    return out
+
+class CompiledModel:
+    """Stand-in for the XGBClassifier in a model bundle, evaluated with NumPy only."""
+    compiled = True
+
+    def __init__(self, trees, classes, n_features, sparse_input=False):
+        self.trees = trees
+        self.classes_ = np.array(classes)
+        self.n_features_in_ = n_features
+        self.sparse_input = sparse_input
+        self.n_groups = len(trees["base_margin"])
+
+    def predict_margin(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        # Models fitted on sparse matrices never saw explicit zeros, only missing entries
+        if self.sparse_input: X = np.where(X == 0, np.nan, X)
+        return tree_margins(self.trees, X, self.n_groups) + self.trees["base_margin"]
+
+    def predict_proba(self, X):
+        margin = self.predict_margin(X)
+        if str(self.trees["objective"]).startswith("binary:"):
+            p = 1 / (1 + np.exp(-margin[:, 0]))
+            return np.column_stack([1 - p, p])
+        e = np.exp(margin - margin.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+
+# --- FILES ---
+def compiled_path(joblib_path):
+    return joblib_path[:-len(".joblib")] + ".trees.npz" if joblib_path.endswith(".joblib") else joblib_path + ".trees.npz"
+
+def save_compiled(bundle, path):
+    """Write a bundle's trees and its JSON-safe metadata to one .npz file that loads without xgboost or joblib."""
+    model = bundle["model"]
+    n_features = int(getattr(model, "n_features_in_", len(bundle.get("feature_list", []))))
+    trees = export_trees(model, n_features)
+    meta = {k: v for k, v in bundle.items() if k not in ("model", "label_encoder", "feature_to_idx")}
+    meta["n_features"] = n_features
+    meta["model_classes"] = [c.item() if hasattr(c, "item") else c for c in getattr(model, "classes_", [0, 1])]
+    if "label_encoder" in bundle: meta["label_classes"] = [str(c) for c in bundle["label_encoder"].classes_]
+    arrays = {k: v for k, v in trees.items() if k != "objective"}
+    with open(path, "wb") as f:
+        np.savez(f, **arrays, objective=np.array(trees["objective"]), meta=np.array(json.dumps(meta)))
+    return path
+
+def load_compiled(path):
+    """Load a compiled bundle in the same shape as the joblib bundle it was exported from."""
+    with np.load(path, allow_pickle=False) as data:
+        trees = {k: data[k] for k in data.files if k not in ("meta", "objective")}
+        trees["objective"] = str(data["objective"])
+        meta = json.loads(str(data["meta"]))
+    bundle = {k: v for k, v in meta.items() if k not in ("n_features", "model_classes", "label_classes")}
+    bundle["model"] = CompiledModel(trees, meta["model_classes"], meta["n_features"], meta.get("sparse_input", False))
+    if "feature_list" in bundle: bundle["feature_to_idx"] = {f: i for i, f in enumerate(bundle["feature_list"])}
+    if "label_classes" in meta: bundle["label_encoder"] = SimpleNamespace(classes_=np.array(meta["label_classes"], dtype=object))
+    return bundle
+
+def verify_compiled(bundle, compiled_bundle, n_rows=2000, seed=0):
+    """Largest absolute probability gap between XGBoost and the compiled evaluator on random rows."""
+    rng = np.random.default_rng(seed)
+    n_features = compiled_bundle["model"].n_features_in_
+    X = rng.choice(np.array([0, 0, 0, 1, -1, 0.05, 0.3], dtype=np.float32), size=(n_rows, n_features))
+    if compiled_bundle["model"].sparse_input:
+        from scipy import sparse
+        expected = bundle["model"].predict_proba(sparse.csr_matrix(X))
+    else:
+        expected = bundle["model"].predict_proba(X)
+    return float(np.abs(expected - compiled_bundle["model"].predict_proba(X)).max())
+
+if __name__ == "__main__":
+    # Compile the served models (the newest retrained ones, else the shipped files): python -m utils.tree_export
+    import joblib
+    from utils.model_registry import MODEL_FILES, model_path
+    for name in MODEL_FILES:
+        bundle = joblib.load(model_path(name))
+        out = save_compiled(bundle, compiled_path(model_path(name)))
+        print(f"{name}: {out} (max probability gap {verify_compiled(bundle, load_compiled(out)):.2e})")